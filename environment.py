@@ -1,11 +1,14 @@
 import sys
+import traceback
 
 from pc.ram import RAM
 from pc.register import Registers
 from pc.alu import Alu
 from pc.fpu import FPU
-from pc.cpu import CPU
+from pc.cpu import CPU, StopReason
 from pc.loader import Loader
+from pc.tracing import Tracer, TraceLevel, FileSink
+from pc.profiler import Profiler
 
 import os
 import sys as _sys
@@ -15,6 +18,44 @@ _sys.path.insert(0, os.path.dirname(__file__))
 from spl.linker_loader import LinkerLoader
 
 MAX_RAM = 2**16
+MAX_CYCLES = 1000   # limite de ciclos por seguridad
+
+
+def report_stop(result, indent=""):
+    """Muestra por que se detuvo la CPU (ver ``CPU.run``)."""
+    print(f"{indent}Detenida tras {result.cycles} ciclos (max {MAX_CYCLES}): "
+          f"{result.reason.value}, PC = {result.pc}")
+    if result.reason is StopReason.FAULT:
+        print(f"{indent}Error: {result.error!r}")
+        traceback.print_exception(result.error)
+
+
+def pop_option(name):
+    """Quita ``--name`` o ``--name=valor`` de sys.argv.
+
+    Returns:
+        None si no esta, True si no tiene valor, o el valor.
+    """
+    for arg in sys.argv[1:]:
+        if arg == f"--{name}":
+            sys.argv.remove(arg)
+            return True
+        if arg.startswith(f"--{name}="):
+            sys.argv.remove(arg)
+            return arg.split("=", 1)[1]
+    return None
+
+
+def run_cpu(cpu, profiler, profile_out):
+    """Ejecuta con el limite de ciclos, perfilando si se pidio --profile."""
+    if profiler is None:
+        return cpu.run(max_cycles=MAX_CYCLES)
+    result = cpu.run_profiled(profiler, max_cycles=MAX_CYCLES)
+    print(profiler.report())
+    if isinstance(profile_out, str):
+        profiler.write_collapsed(profile_out)
+        print(f"Pilas colapsadas guardadas en {profile_out}")
+    return result
 
 
 def main():
@@ -22,17 +63,31 @@ def main():
     Uso:
       - Enlazar estáticamente varios .o: python environment.py --link obj1.o obj2.o ...
       - Ejecutar un único .o o .bin: python environment.py archivo.o
+      - Con --trace se muestra cada LOADMEM/STOR (--trace=archivo lo guarda
+        en un archivo).
+      - Con --profile se muestra un perfil por opcode/etiqueta/PC
+        (--profile=archivo guarda ademas las pilas colapsadas).
     """
+    trace_level = TraceLevel.WARN
+    trace_sink = FileSink(sys.stdout)
+    trace = pop_option("trace")
+    if trace is not None:
+        trace_level = TraceLevel.MEM
+        if isinstance(trace, str):
+            trace_sink = FileSink(trace)
+    profile = pop_option("profile")
+
     if len(sys.argv) < 2:
-        print("Uso: python environment.py <archivo.o o archivo.bin> [--dir=direccion]")
-        print("     python environment.py --link obj1.o obj2.o ...")
+        print("Uso: python environment.py <archivo.o o archivo.bin> [--dir=direccion] [--trace[=archivo]] [--profile[=archivo]]")
+        print("     python environment.py --link obj1.o obj2.o ... [--trace[=archivo]] [--profile[=archivo]]")
         sys.exit(1)
 
     ram = RAM(word_size="64", positions=MAX_RAM)
     reg = Registers()
     fpu = FPU(reg)
     alu = Alu(reg, fpu)
-    cpu = CPU(ram, reg, alu)
+    tracer = Tracer(trace_level, trace_sink)
+    cpu = CPU(ram, reg, alu, tracer)
 
     # Enlazado estático entre varios .o usando spl/linker_loader
     if sys.argv[1] == "--link":
@@ -52,19 +107,12 @@ def main():
         reg.PC = entry
         reg.SP = MAX_RAM - 1
 
+        profiler = Profiler.from_linker(linker) if profile is not None else None
+
         # Limit cycles for safety
-        original_run = cpu.run
-
-        def limited_run():
-            cpu.running = True
-            cpu.cycle_count = 0
-            while cpu.running and cpu.cycle_count < 1000:
-                cpu.cycle_count += 1
-                cpu.fetch()
-                cpu.execute()
-            print(f"Detenida tras {cpu.cycle_count} ciclos (max 1000)")
-
-        limited_run()
+        result = run_cpu(cpu, profiler, profile)
+        report_stop(result)
+        tracer.close()
         cpu.dump_registers()
         return
 
@@ -89,30 +137,25 @@ def main():
         linker.resolve_data()
         entry_point = linker.load_to_ram(ram, start=base_addr)
         print(f"  Programa: {filename} (linked)")
+        labels = linker.text_labels
     else:
         # Use pc/loader for .bin files
         loader = Loader(start_address=base_addr)
         entry_point = loader.load(filename, ram)
         print(f"  Programa: {filename}")
+        labels = {}
 
     reg.PC = entry_point
     reg.SP = MAX_RAM - 1
 
     print(f"  PC: {entry_point}  |  SP: {reg.SP}")
 
+    profiler = Profiler(labels) if profile is not None else None
+
     # Limit cycles for safety
-    original_run = cpu.run
-
-    def limited_run():
-        cpu.running = True
-        cpu.cycle_count = 0
-        while cpu.running and cpu.cycle_count < 1000:
-            cpu.cycle_count += 1
-            cpu.fetch()
-            cpu.execute()
-        print(f"  Detenida tras {cpu.cycle_count} ciclos (max 1000)")
-
-    limited_run()
+    result = run_cpu(cpu, profiler, profile)
+    report_stop(result, indent="  ")
+    tracer.close()
     cpu.dump_registers()
 
 
@@ -52,6 +52,12 @@ class VIC_GUI(ctk.CTk):
         # Start periodic refresh loop to push PC state to the memory tab
         self.after(50, self._refresh_loop)
 
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        self.pc_bridge.close()
+        self.destroy()
+
     # Load program moved to memory tab; no inline method here
     def _refresh_loop(self):
         state = self.pc_bridge.get_state()
@@ -1,3 +1,5 @@
+from collections.abc import Mapping
+
 from spl.linker_loader import LinkerLoader
 
 MAX_RAM = 2**16
@@ -22,10 +24,15 @@ class PCBridge:
 
         self._base_addr = base_addr
 
-        # Disk
-        self.disk = Disk()
+        # Disk (journal; imports an existing disk.json the first time)
+        self.disk = Disk("disk.journal", legacy="disk.json")
         self.disk_device = DiskDevice(self.disk)
 
+    def close(self):
+        """Flush and release the sector image and the disk journal."""
+        self.disk_device.close()
+        self.disk.close()
+
     def get_state(self) -> dict:
         # PC and SP
         pc = getattr(self.reg, "PC", 0)
@@ -41,9 +48,9 @@ class PCBridge:
                         regs[name] = val
         except Exception:
             regs = {}
-        # General purpose registers stored in self.reg.general
+        # General purpose registers exposed by name through self.reg.general
         try:
-            if hasattr(self.reg, "general") and isinstance(self.reg.general, dict):
+            if hasattr(self.reg, "general") and isinstance(self.reg.general, Mapping):
                 regs.update(self.reg.general)
         except Exception:
             pass
@@ -104,16 +111,10 @@ class PCBridge:
         start = max(0, min(start, MAX_RAM - 1))
         length = min(length, MAX_RAM - start)
 
-        dump = []
-
-        if not hasattr(self.ram, "request"):
+        if not hasattr(self.ram, "read_block"):
             return [0] * length, start
 
-        for i in range(start, start + length):
-            try:
-                val = self.ram.request(0, i, 0)
-                dump.append(val if isinstance(val, int) else 0)
-            except Exception:
-                dump.append(0)
-
-        return dump, start
\ No newline at end of file
+        try:
+            return self.ram.read_block(start, length), start
+        except Exception:
+            return [0] * length, start
\ No newline at end of file
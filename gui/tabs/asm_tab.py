@@ -13,6 +13,8 @@ from spl.assembly import Assembler
 
 
 bin_box = None  # module-level reference to expose current binary textbox content
+current_object = None  # Builder del ultimo ensamblado
+current_text = None    # texto que se escribio en bin_box con current_object
 
 
 def get_bin_box_text():
@@ -50,38 +52,29 @@ def load_program(pc_bridge):
 
     try:
         # =========================
-        # 1. Crear archivo temporal (.o)
-        # =========================
-        import tempfile
-        import os
-
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".o", mode="w")
-        tmp_path = tmp.name
-        tmp.write(bin_text)
-        tmp.close()
-
-        # =========================
-        # 2. Usar LinkerLoader
+        # 1. Enlazar en memoria
         # =========================
         from spl.linker_loader import LinkerLoader
 
         linker = LinkerLoader()
-        linker.load_object([tmp_path])
+        if current_object is not None and bin_text == current_text:
+            # bin_box sigue mostrando el ultimo ensamblado: el Builder pasa
+            # directo al linker
+            linker.load_builder("<asm_tab>", current_object)
+        else:
+            linker.load_object_data("<asm_tab>", bin_text)
         linker.resolve(base_addr)
         linker.resolve_data()
 
         entry = linker.load_to_ram(pc_bridge.ram, start=base_addr)
 
         # =========================
-        # 3. Configurar CPU
+        # 2. Configurar CPU
         # =========================
         pc_bridge.reg.PC = entry
         pc_bridge.reg.SP = 2**16 - 1
         pc_bridge._loaded = True
 
-        # limpiar archivo temporal
-        os.remove(tmp_path)
-
     except Exception as e:
         print(f"Error loading program:\n{e}")
 
@@ -103,6 +96,7 @@ def build_asm_tab(parent, pc_bridge=None):
 
     # Local handlers capture asm_box/bin_box once created
     def on_assemble():
+        global current_object, current_text
         asm_text = ""
         try:
             asm_text = asm_box.get("1.0", "end-1c")
@@ -110,11 +104,13 @@ def build_asm_tab(parent, pc_bridge=None):
             asm_text = ""
 
         assembler = Assembler()
-        bin_lines = assembler.assemble_text_as_binary(asm_text)
+        current_object = assembler.assemble_text(asm_text)
+        bin_lines = assembler.binary_lines(current_object)
         bin_box.configure(state="normal")
         bin_box.delete("1.0", "end")
         bin_box.insert("1.0", "\n".join(bin_lines))
         bin_box.configure(state="disabled")
+        current_text = get_bin_box_text()
 
     def on_load():
         load_program(pc_bridge)
@@ -1,5 +1,7 @@
+import traceback
+
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, messagebox
 import customtkinter as ctk
 
 MAX_RAM = 2**16
@@ -37,8 +39,12 @@ def build_memory_tab(parent, pc_bridge=None):
     # ====================================#
     def on_run():
         if pc_bridge._loaded:
-            pc_bridge.cpu.run()
+            result = pc_bridge.cpu.run()
             pc_bridge._loaded = False
+            if result.error is not None:
+                traceback.print_exception(result.error)
+                messagebox.showerror(
+                    "Error", f"Error at PC = {result.pc}: {result.error!r}")
 
     # ====================================#
     #         Registers and Flags         #
@@ -6,65 +6,92 @@ MIN_INT = -(1 << 63)
 EPSILON = 1 / (1 << 32)
 
 
+# Evaluadores de FLAGS perezosos: reciben los operandos y el resultado de
+# la ultima operacion y retornan (N, Z, D, U). Ver Registers.flags.defer.
+
+def _int_flags(a, b, result):
+    # ADD / SUB / COMP: overflow si los operandos tienen el mismo signo y
+    # el resultado otro
+    a_sign = (a >> 63) & 1
+    r_sign = (result >> 63) & 1
+    overflow = int(a_sign == ((b >> 63) & 1) and a_sign != r_sign)
+    return r_sign, int(result == 0), overflow, 0
+
+
+def _range_flags(raw, result):
+    # MUL / DIV: overflow si el resultado exacto no cabe en 64 bits con signo
+    overflow = int(raw > MAX_INT or raw < MIN_INT)
+    return (result >> 63) & 1, int(result == 0), overflow, 0
+
+
+def _logic_flags(result):
+    # AND / OR / XOR / NOT / SHIFT R: sin overflow ni underflow
+    return (result >> 63) & 1, int(result == 0), 0, 0
+
+
+def _shift_left_flags(a, result):
+    # SHIFT L: overflow si cambia el bit de signo
+    overflow = int(((a >> 63) & 1) != ((result >> 63) & 1))
+    return (result >> 63) & 1, int(result == 0), overflow, 0
+
+
+def _sign_flags(result, previous, d, u):
+    # ABVAL / CHNG SIGN: solo cambian N y Z. D y U quedan como las dejo la
+    # operacion anterior: ``previous`` (evaluate, args) si aun estaba
+    # pendiente, o los valores ``d`` y ``u`` ya calculados
+    if previous is not None:
+        evaluate, args = previous
+        d, u = evaluate(*args)[2:]
+    return (result >> 63) & 1, int(result == 0), d, u
+
+
 class Alu:
     def __init__(self, registros, fpu):
         self.registros = registros
         self.fpu = fpu
 
     def update_flags(self, result):
-        self.registros.flags["Z"] = int(result == 0)
-        self.registros.flags["N"] = int((result >> 63) & 1)
-
-    def check_overflow_int(self, a, b, raw):
-        a_sign = (a >> 63) & 1
-        b_sign = (b >> 63) & 1
-        r_sign = (raw >> 63) & 1
-        if a_sign == b_sign and a_sign != r_sign:
-            self.registros.flags["D"] = 1
+        """N y Z de ``result``; D y U no cambian (sin calcular las
+        banderas pendientes de la operacion anterior)."""
+        flags = self.registros.flags
+        previous = flags.pending
+        if previous is None:
+            # Sin nada pendiente, leer D y U no calcula nada
+            args = (None, flags["D"], flags["U"])
+        elif previous[0] is _sign_flags:
+            # Otro ABVAL / CHNG SIGN pendiente: D y U vienen de lo que el tenia
+            args = previous[1][1:]
         else:
-            self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
+            args = (previous, 0, 0)
+        flags.defer(_sign_flags, result, *args)
 
     def add(self, a, b):
         result = (a + b) & WORD_MASK
-        self.check_overflow_int(a,b,result)
-        self.update_flags(result)
+        self.registros.flags.defer(_int_flags, a, b, result)
         return result
 
     def sub(self, a, b):
         result = (a - b) & WORD_MASK
-        self.check_overflow_int(a,b,result)
-        self.update_flags(result)
+        self.registros.flags.defer(_int_flags, a, b, result)
         return result
 
     def mul(self, a, b):
         raw = a * b
-        if raw > MAX_INT or raw < MIN_INT:
-            self.registros.flags["D"] = 1
-        else:
-            self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
         result = raw & WORD_MASK
-        self.update_flags(result)
+        self.registros.flags.defer(_range_flags, raw, result)
         return result
 
     def div(self, a, b):
         if b == 0:
             raise Exception("Divide by zero")
         raw = a // b
-        if raw > MAX_INT or raw < MIN_INT:
-            self.registros.flags["D"] = 1
-        else:
-            self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
         result = raw & WORD_MASK
-        self.update_flags(result)
+        self.registros.flags.defer(_range_flags, raw, result)
         return result
 
     def comp(self, a, b):
         result = (a - b) & WORD_MASK
-        self.check_overflow_int(a,b,result)
-        self.update_flags(result)
+        self.registros.flags.defer(_int_flags, a, b, result)
 
     def add_float(self, a, b):
         return self.fpu.fadd(a, b)
@@ -80,45 +107,30 @@ class Alu:
 
     def and_op(self, a, b):
         result = (a & b) & WORD_MASK
-        self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        self.registros.flags.defer(_logic_flags, result)
         return result
 
     def or_op(self, a, b):
         result = (a | b) & WORD_MASK
-        self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        self.registros.flags.defer(_logic_flags, result)
         return result
 
     def xor_op(self, a, b):
         result = (a ^ b) & WORD_MASK
-        self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        self.registros.flags.defer(_logic_flags, result)
         return result
 
     def not_op(self, a):
         result = (~a) & WORD_MASK
-        self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        self.registros.flags.defer(_logic_flags, result)
         return result
 
     def shift_left(self, a, n):
         a &= WORD_MASK
         raw = a << n
         result = raw & WORD_MASK
-        # Overflow:
-        original_sign = (a >> 63) & 1
-        result_sign = (result >> 63) & 1
-        if original_sign != result_sign:
-            self.registros.flags["D"] = 1
-        else:
-            self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        # Overflow: cambio del bit de signo (ver _shift_left_flags)
+        self.registros.flags.defer(_shift_left_flags, a, result)
         return result
 
     def shift_right(self, a, n):
@@ -128,9 +140,7 @@ class Alu:
             a_signed = a
         raw = a_signed >> n
         result = raw & WORD_MASK
-        self.registros.flags["D"] = 0
-        self.registros.flags["U"] = 0
-        self.update_flags(result)
+        self.registros.flags.defer(_logic_flags, result)
         return result
 
     def int_to_float(self, val):
@@ -1,13 +1,50 @@
+import time
+from enum import Enum
+from typing import NamedTuple
+
+if __package__:
+    from .tracing import TraceLevel, default_tracer
+else:
+    from tracing import TraceLevel, default_tracer
+
 WORD_BITS   = 64
 WORD_MASK   = (1 << WORD_BITS) - 1
 HLT_WORD    = WORD_MASK
 NOP_WORD    = 0
 
+# Codigos de 4 bits de los registros especiales
+REG_PC = 0b0001
+REG_SP = 0b0010
+REG_BP = 0b0011
+REG_IR = 0b0100
+
 # Señales del Bus de Control
 CTRL_MEM_READ  = 0   # par  -> lectura
 CTRL_MEM_WRITE = 1   # impar -> escritura
 
 
+class StopReason(Enum):
+    HLT        = "hlt"          # se ejecuto HLT
+    BUDGET     = "budget"       # se agoto max_cycles
+    BREAKPOINT = "breakpoint"   # PC llego a until_pc
+    FAULT      = "fault"        # la instruccion lanzo una excepcion
+
+
+class RunResult(NamedTuple):
+    """Resultado de ``CPU.run`` / ``CPU.run_blocks``."""
+    reason: StopReason
+    cycles: int
+    pc: int
+    error: Exception | None = None
+
+    def raise_error(self):
+        """Relanza ``error`` (con su traceback original) si la ejecucion
+        termino en ``StopReason.FAULT``: ``run`` atrapa cualquier excepcion,
+        incluidos los errores del propio emulador."""
+        if self.error is not None:
+            raise self.error
+
+
 class CPU:
 
     # Mapa de codigos de 4 bits -> nombre de registro
@@ -18,12 +55,45 @@ class CPU:
         0b1101: "R4",  0b1110: "R5",
     }
 
-    def __init__(self, ram, registers, alu):
+    def __init__(self, ram, registers, alu, tracer=None):
         self.ram = ram
         self.reg = registers
+        # Banco de registros indexado por codigo de 4 bits
+        self._bank = registers.bank
         self.alu = alu
         self.running = True
         self.cycle_count = 0
+        # Tabla palabra -> (handler, operandos) llenada por decode()
+        self._decoded = {}
+        # Cache de instrucciones: direccion -> (palabra, handler, operandos).
+        # Toda escritura en la RAM invalida la entrada de esa direccion.
+        self._icache = {}
+        self._fetched = None
+        self.icache_hits = 0
+        self.icache_misses = 0
+        # Bloques basicos traducidos: inicio -> funcion, y direccion ->
+        # inicios de los bloques que la contienen (para invalidar).
+        self._blocks = {}
+        self._block_owners = {}
+        ram.add_write_listener(self._invalidate_icache)
+        # Trazas (ver pc/tracing.py). Sin ``tracer`` los diagnosticos van a
+        # stderr (``default_tracer``); ``Tracer(TraceLevel.OFF)`` o
+        # ``set_tracer(None)`` las desactivan: las instrucciones solo
+        # comparan contra None y los bloques traducidos no incluyen ninguna
+        # llamada.
+        self.tracer = None
+        self._trace_mem = None
+        self._trace_warn = None
+        self.set_tracer(default_tracer() if tracer is None else tracer)
+
+    def set_tracer(self, tracer):
+        """Instala un ``Tracer`` (o ``None`` para desactivar las trazas)."""
+        self.tracer = tracer
+        self._trace_mem = tracer if tracer is not None and tracer.enabled(TraceLevel.MEM) else None
+        self._trace_warn = tracer if tracer is not None and tracer.enabled(TraceLevel.WARN) else None
+        # Los bloques traducidos llevan las trazas compiladas
+        self._blocks.clear()
+        self._block_owners.clear()
 
     # Simulacion del Bus de Direcciones + Bus de Control (MemRead)
     def read_memory(self, address):
@@ -49,121 +119,99 @@ class CPU:
         )
 
     # Bus interno del CPU — lectura/escritura de registros
+    # Los codigos 0 y 15 no son registros: se leen como 0 y no se escriben.
     def get_reg(self, code):
-        name = self.register_map.get(code)
-        if name is None:
-            return 0
-        if name in self.reg.general:
-            return self.reg.general[name]
-        return getattr(self.reg, name, 0)
+        return self._bank[code]
 
     def set_reg(self, code, value):
-        name = self.register_map.get(code)
-        if name is None:
-            return
-        value = value & WORD_MASK
-        if name in self.reg.general:
-            self.reg.general[name] = value
+        if 0 < code < 15:
+            self._bank[code] = value & WORD_MASK
+
+    # Cache de instrucciones decodificadas
+    def _invalidate_icache(self, address, count=1):
+        if count == 1:
+            self._icache.pop(address, None)
+            if address in self._block_owners:
+                self._invalidate_blocks(address)
+        elif count > len(self._icache) + len(self._block_owners):
+            # Escritura por bloques mas grande que la cache: vaciarla
+            self.flush_icache()
         else:
-            setattr(self.reg, name, value)
+            for addr in range(address, address + count):
+                self._invalidate_icache(addr)
+
+    def flush_icache(self):
+        """Descarta las instrucciones y bloques cacheados por direccion."""
+        self._icache.clear()
+        self._fetched = None
+        self._blocks.clear()
+        self._block_owners.clear()
+
+    def _decode_word(self, instr):
+        entry = self._decoded.get(instr)
+        if entry is None:
+            entry = self._decoded[instr] = self.decode(instr)
+        return entry
 
     # FETCH — busqueda de instruccion
     # IR <- MEM[PC], PC <- PC + 1
+    # Si la direccion esta en la cache se evita el acceso al bus y la
+    # decodificacion; MAR y MDR quedan igual que tras una lectura real.
     def fetch(self):
-        self.reg.MAR = self.reg.PC
-        instr = self.read_memory(self.reg.MAR)
-        self.reg.IR = instr
-        self.reg.PC += 1
-
-    # EXECUTE — decodificacion y ejecucion (41 instrucciones)
+        bank = self._bank
+        pc = bank[REG_PC]
+        entry = self._icache.get(pc)
+        if entry is None:
+            self.icache_misses += 1
+            instr = self.read_memory(pc)
+            entry = (instr,) + self._decode_word(instr)
+            if pc < self.ram.size:
+                self._icache[pc] = entry
+        else:
+            self.icache_hits += 1
+            instr = entry[0]
+            self.reg.MAR = pc
+            self.reg.MDR = instr
+        self._fetched = entry
+        bank[REG_IR] = instr
+        bank[REG_PC] = pc + 1
+
+    # DECODE — predecodificador dirigido por tabla
+    # Traduce una palabra de 64 bits a un par (handler, operandos).
     # Usa mascaras de bits (>>, &) para extraer opcodes y operandos.
     # Orden: mas especifico -> mas generico para evitar colisiones.
-    def execute(self):
-        instr = self.reg.IR
+    def decode(self, instr):
+        """Decodifica ``instr`` y retorna ``(handler, operandos)``.
+
+        El orden de las comparaciones es el mismo de la cadena original de
+        ``execute``, de modo que cada palabra se resuelve a la misma
+        instruccion. El resultado solo depende de la palabra.
+        """
+        alu = self.alu
 
         # 1. COINCIDENCIA EXACTA DE 64 BITS
-        # NOP: todo ceros — no hace nada
         if instr == NOP_WORD:
-            return
-
-        # HLT: todo unos — detiene la CPU
+            return self._op_nop, ()
         if instr == HLT_WORD:
-            self.running = False
-            return
+            return self._op_hlt, ()
 
         # 2. PREFIJO DE 8 BITS — bits [63:56]
         #    Saltos (formato J) y LOAD MEM
         opcode8 = (instr >> 56) & 0xFF
         jump_addr = instr & 0x00FFFFFFFFFFFFFF  # 56 bits de direccion
 
-        # JMP {dir} — salto incondicional, PC <- dir
-        if opcode8 == 0x01:
-            self.reg.PC = jump_addr
-            return
-
-        # JMPZ — salta si Z=1
-        if opcode8 == 0x02:
-            if self.reg.flags["Z"] == 1:
-                self.reg.PC = jump_addr
-            return
-
-        # JMPNZ — salta si Z=0
-        if opcode8 == 0x03:
-            if self.reg.flags["Z"] == 0:
-                self.reg.PC = jump_addr
-            return
-
-        # JMPN — salta si N=1 (negativo)
-        if opcode8 == 0x04:
-            if self.reg.flags["N"] == 1:
-                self.reg.PC = jump_addr
-            return
-
-        # JMPNN — salta si N=0 (no negativo)
-        if opcode8 == 0x05:
-            if self.reg.flags["N"] == 0:
-                self.reg.PC = jump_addr
-            return
-
-        # JMP OVR — salta si D=1 (overflow)
-        if opcode8 == 0x06:
-            if self.reg.flags["D"] == 1:
-                self.reg.PC = jump_addr
-            return
-
-        # JMP UND — salta si U=1 (underflow)
-        if opcode8 == 0x07:
-            if self.reg.flags["U"] == 1:
-                self.reg.PC = jump_addr
-            return
-
-        # JMP NORZ — salta si N=1 OR Z=1
-        if opcode8 == 0x08:
-            if self.reg.flags["N"] or self.reg.flags["Z"]:
-                self.reg.PC = jump_addr
-            return
-
-        # JMP NANDZ — salta si N=1 AND Z=1
-        if opcode8 == 0x09:
-            if self.reg.flags["N"] and self.reg.flags["Z"]:
-                self.reg.PC = jump_addr
-            return
-        
+        jump = self._jump_handlers.get(opcode8)
+        if jump is not None:
+            return getattr(self, jump), (jump_addr,)
+
         # JMP REG - salta a la direccion del registro
         if opcode8 == 0x11:
-            reg_x = (instr >> 52) & 0xF
-            self.reg.PC = self.get_reg(reg_x)
-            return
+            return self._op_jmpr, ((instr >> 52) & 0xF,)
 
         # LOAD MEM X, Y — X <- MEM[Y]
         # Binario: 0000 1010 xxxx yyyy 0...0
         if opcode8 == 0xA:
-            reg_x = (instr >> 52) & 0xF
-            reg_y = (instr >> 48) & 0xF
-            print(f"LOD {reg_y}: {self.get_reg(reg_y)}")
-            value = self.read_memory(self.get_reg(reg_y))
-            self.set_reg(reg_x, value)
-            return
+            return self._op_loadmem, ((instr >> 52) & 0xF, (instr >> 48) & 0xF)
 
         # 3. PREFIJO DE 4 BITS — bits [63:60]
         #    STOR, inmediatos, MOV, STOR FLOAT
@@ -172,243 +220,605 @@ class CPU:
         # STOR X, Y — MEM[Y] <- X
         # Binario: 1000 xxxx yyyy 0...0
         if opcode4 == 0x8:
-            reg_x = (instr >> 56) & 0xF
-            reg_y = (instr >> 52) & 0xF
-            print(f"STOR into {reg_y}: {self.get_reg(reg_y)} value {reg_x}: {self.get_reg(reg_x)}")
-            self.write_memory(self.get_reg(reg_y), self.get_reg(reg_x))
-            return
-
-        # LOAD INT X, VALUE — X <- VALUE (inmediato con signo)
-        # Binario: 1001 xxxx vvvv...vvvv (56 bits)
-        if opcode4 == 0x9:
-            reg_x = (instr >> 56) & 0xF
-            imm56 = instr & 0x00FFFFFFFFFFFFFF
-            if imm56 & (1 << 55):  # extension de signo
-                imm56 |= 0xFF00000000000000
-            self.set_reg(reg_x, imm56)
-            return
-
-        # STORI X, VALUE — MEM[X] <- VALUE (store inmediato)
-        # Binario: 1010 xxxx vvvv...vvvv
-        if opcode4 == 0xA:
-            reg_x = (instr >> 56) & 0xF
-            imm56 = instr & 0x00FFFFFFFFFFFFFF
-            if imm56 & (1 << 55):
-                imm56 |= 0xFF00000000000000
-            self.write_memory(self.get_reg(reg_x), imm56)
-            return
+            return self._op_stor, ((instr >> 56) & 0xF, (instr >> 52) & 0xF)
 
-        # LOAD FLOAT X, VALUE
-        # Binario: 1011 xxxx vvvv...vvvv
-        if opcode4 == 0xB:
+        # LOAD INT / LOAD FLOAT X, VALUE — X <- VALUE (inmediato con signo)
+        # STORI / STOR FLOAT X, VALUE — MEM[X] <- VALUE
+        # Binario: oooo xxxx vvvv...vvvv (56 bits)
+        if opcode4 in (0x9, 0xA, 0xB, 0xE):
             reg_x = (instr >> 56) & 0xF
             imm56 = instr & 0x00FFFFFFFFFFFFFF
-            if imm56 & (1 << 55):
+            if imm56 & (1 << 55):  # extension de signo
                 imm56 |= 0xFF00000000000000
-            self.set_reg(reg_x, imm56)
-            return
+            if opcode4 in (0x9, 0xB):
+                return self._op_load_imm, (reg_x, imm56)
+            return self._op_store_imm, (reg_x, imm56)
 
         # MOV X, Y — X <- Y
         # Binario: 1100 0...0 xxxx yyyy
         if opcode4 == 0xC:
-            reg_x = (instr >> 4) & 0xF
-            reg_y = instr & 0xF
-            self.set_reg(reg_x, self.get_reg(reg_y))
-            return
-
-        # STOR FLOAT — MEM[X] <- VALUE (float inmediato)
-        # Binario: 1110 xxxx vvvv...vvvv
-        if opcode4 == 0xE:
-            reg_x = (instr >> 56) & 0xF
-            imm56 = instr & 0x00FFFFFFFFFFFFFF
-            if imm56 & (1 << 55):
-                imm56 |= 0xFF00000000000000
-            self.write_memory(self.get_reg(reg_x), imm56)
-            return
+            return self._op_mov, ((instr >> 4) & 0xF, instr & 0xF)
 
         # SUBCODES EN BITS BAJOS (bits altos = 0)
+        reg_x = (instr >> 4) & 0xF
+        reg_y = instr & 0xF
+
         # UTILIDADES — byte [15:8] = 0x41..0x44
-        util_op = (instr >> 8) & 0xFF
-
-        if util_op == 0x41 and (instr >> 16) == 0:
-            # ABVAL X, Y — X <- |Y|
-            reg_x = (instr >> 4) & 0xF
-            reg_y = instr & 0xF
-            val = self.get_reg(reg_y)
-            if val & (1 << 63):
-                result = (-(val - (1 << 64))) & WORD_MASK
-            else:
-                result = val
-            self.alu.update_flags(result)
-            self.set_reg(reg_x, result)
-            return
-
-        if util_op == 0x42 and (instr >> 16) == 0:
-            # CHNG SIG X, Y — X <- -Y
-            reg_x = (instr >> 4) & 0xF
-            val = self.get_reg(instr & 0xF)
-            result = ((~val) + 1) & WORD_MASK
-            self.alu.update_flags(result)
-            self.set_reg(reg_x, result)
-            return
-
-        if util_op == 0x43 and (instr >> 16) == 0:
-            # CHNG INT X, Y — X <- int(Y) (float -> entero)
-            reg_x = (instr >> 4) & 0xF
-            val = self.get_reg(instr & 0xF)
-            result = self.alu.float_to_int(val)
-            self.set_reg(reg_x, result)
-            return
-
-        if util_op == 0x44 and (instr >> 16) == 0:
-            # CHNG FLOAT X, Y — X <- float(Y) (entero -> float)
-            reg_x = (instr >> 4) & 0xF
-            val = self.get_reg(instr & 0xF)
-            result = self.alu.int_to_float(val)
-            self.set_reg(reg_x, result)
-            return
-
-        # COMP X, Y — actualiza FLAGS, no guarda resultado
-        #     Byte [15:8] = 0x21
-        #     ANTES de aritmetica RRR (comparte bits [15:12]=0x2 con SUB)
-        if (instr >> 8) == 0x21 and (instr >> 16) == 0:
-            reg_x = (instr >> 4) & 0xF
-            reg_y = instr & 0xF
-            self.alu.comp(self.get_reg(reg_x), self.get_reg(reg_y))
-            return
+        if (instr >> 16) == 0:
+            util_op = (instr >> 8) & 0xFF
+            if util_op == 0x41:
+                return self._op_abval, (reg_x, reg_y)
+            if util_op == 0x42:
+                return self._op_chng_sign, (reg_x, reg_y)
+            if util_op == 0x43:
+                return self._op_unary, (alu.float_to_int, reg_x, reg_y)
+            if util_op == 0x44:
+                return self._op_unary, (alu.int_to_float, reg_x, reg_y)
+
+            # COMP X, Y — actualiza FLAGS, no guarda resultado
+            #     ANTES de aritmetica RRR (comparte bits [15:12]=0x2 con SUB)
+            if util_op == 0x21:
+                return self._op_comp, (reg_x, reg_y)
 
         # LOGICA + SHIFTS — nibble [19:16] = 0x3
         if (instr >> 16) & 0xF == 0x3 and ((instr >> 24) & 0xF) == 0:
             logic_id  = (instr >> 12) & 0xF
             marker_32 = (instr >> 28) & 0xF
+            rx = (instr >> 8) & 0xF
 
-            if logic_id == 0x1 and marker_32 == 0:
-                # AND X, W, Y
-                rx = (instr >> 8) & 0xF
-                result = self.alu.and_op(
-                    self.get_reg((instr >> 4) & 0xF), self.get_reg(instr & 0xF))
-                self.set_reg(rx, result)
-                return
- 
-            if logic_id == 0x2 and marker_32 == 0:
-                # OR X, W, Y
-                rx = (instr >> 8) & 0xF
-                result = self.alu.or_op(
-                    self.get_reg((instr >> 4) & 0xF), self.get_reg(instr & 0xF))
-                self.set_reg(rx, result)
-                return
-
-            if logic_id == 0x3 and marker_32 == 0:
-                # XOR X, W, Y
-                rx = (instr >> 8) & 0xF
-                result = self.alu.xor_op(
-                    self.get_reg((instr >> 4) & 0xF), self.get_reg(instr & 0xF))
-                self.set_reg(rx, result)
-                return
-
-            if logic_id == 0x4 and marker_32 == 0xF:
+            if marker_32 == 0:
+                # AND / OR / XOR X, W, Y
+                logic_rrr = {0x1: alu.and_op, 0x2: alu.or_op, 0x3: alu.xor_op}
+                if logic_id in logic_rrr:
+                    return self._op_binary, (logic_rrr[logic_id], rx, reg_x, reg_y)
+
+            if marker_32 == 0xF:
                 # NOT X, Y
-                rx = (instr >> 4) & 0xF
-                result = self.alu.not_op(self.get_reg(instr & 0xF))
-                self.set_reg(rx, result)
-                return
-
-            if logic_id == 0x5 and marker_32 == 0xF:
-                # SHIFT L X, Y — X <- Y << 1
-                rx = (instr >> 4) & 0xF
-                result = self.alu.shift_left(self.get_reg(instr & 0xF), 1)
-                self.set_reg(rx, result)
-                return
-
-            if logic_id == 0x6 and marker_32 == 0xF:
-                # SHIFT R X, Y — X <- Y >> 1
-                rx = (instr >> 4) & 0xF
-                result = self.alu.shift_right(self.get_reg(instr & 0xF), 1)
-                self.set_reg(rx, result)
-                return
+                if logic_id == 0x4:
+                    return self._op_unary, (alu.not_op, reg_x, reg_y)
+                # SHIFT L / SHIFT R X, Y — X <- Y << 1 / Y >> 1
+                if logic_id == 0x5:
+                    return self._op_shift, (alu.shift_left, reg_x, reg_y)
+                if logic_id == 0x6:
+                    return self._op_shift, (alu.shift_right, reg_x, reg_y)
 
         # ARITMETICA FLOTANTE — byte [23:16] = 0x01
         if (instr >> 16) & 0xFF == 0x01 and (instr >> 24) == 0:
-            sub_op = (instr >> 12) & 0xF
-            rx = (instr >> 8) & 0xF
-            a = self.get_reg((instr >> 4) & 0xF)
-            b = self.get_reg(instr & 0xF)
-
-            if sub_op == 0x1:
-                result = self.alu.add_float(a, b)
-            elif sub_op == 0x2:
-                result = self.alu.sub_float(a, b)
-            elif sub_op == 0x3:
-                result = self.alu.mul_float(a, b)
-            elif sub_op == 0x4:
-                result = self.alu.div_float(a, b)
-            else:
-                return
-            self.set_reg(rx, result)
-            return
+            float_ops = {
+                0x1: alu.add_float, 0x2: alu.sub_float,
+                0x3: alu.mul_float, 0x4: alu.div_float,
+            }
+            op = float_ops.get((instr >> 12) & 0xF)
+            if op is None:
+                return self._op_nop, ()
+            return self._op_binary, (op, (instr >> 8) & 0xF, reg_x, reg_y)
 
         # PUSH / POP — nibble [7:4]
-        lo_nib = (instr >> 4) & 0xF
-
-        if lo_nib == 0x9 and (instr >> 8) == 0:
-            # PUSH X — SP--, MEM[SP] <- X
-            rx = instr & 0xF
-            self.reg.SP = (self.reg.SP - 1) & WORD_MASK
-            self.write_memory(self.reg.SP, self.get_reg(rx))
-            return
-
-        if lo_nib == 0xA and (instr >> 8) == 0:
-            # POP X — X <- MEM[SP], SP++
-            rx = instr & 0xF
-            self.set_reg(rx, self.read_memory(self.reg.SP))
-            self.reg.SP = (self.reg.SP + 1) & WORD_MASK
-            return
+        if (instr >> 8) == 0:
+            if reg_x == 0x9:
+                return self._op_push, (reg_y,)
+            if reg_x == 0xA:
+                return self._op_pop, (reg_y,)
 
         # INC / DEC — byte [11:4]
-        lo_byte = (instr >> 4) & 0xFF
+        if (instr >> 12) == 0:
+            lo_byte = (instr >> 4) & 0xFF
+            if lo_byte == 0x11:
+                return self._op_dec, (reg_y,)
+            if lo_byte == 0x12:
+                return self._op_inc, (reg_y,)
 
-        if lo_byte == 0x11 and (instr >> 12) == 0:
-            # DEC X — X <- X - 1
-            rx = instr & 0xF
-            self.set_reg(rx, self.alu.sub(self.get_reg(rx), 1))
-            return
+        # ARITMETICA ENTERA RRR — nibble [15:12]
+        if (instr >> 16) == 0:
+            int_ops = {0x1: alu.add, 0x2: alu.sub, 0x3: alu.mul, 0x4: alu.div}
+            op = int_ops.get((instr >> 12) & 0xF)
+            if op is not None:
+                return self._op_binary, (op, (instr >> 8) & 0xF, reg_x, reg_y)
 
-        if lo_byte == 0x12 and (instr >> 12) == 0:
-            # INC X — X <- X + 1
-            rx = instr & 0xF
-            self.set_reg(rx, self.alu.add(self.get_reg(rx), 1))
-            return
+        return self._op_unknown, (instr,)
 
-        # ARITMETICA ENTERA RRR — nibble [15:12]
-        sub_op = (instr >> 12) & 0xF
+    # EXECUTE — despacho de la instruccion en IR
+    # Una sola busqueda en la tabla por ciclo; la decodificacion de cada
+    # palabra distinta se hace una unica vez.
+    def execute(self):
+        instr = self._bank[REG_IR]
+        entry = self._fetched
+        self._fetched = None
+        if entry is None or entry[0] != instr:
+            entry = (instr,) + self._decode_word(instr)
+        _, handler, operands = entry
+        handler(*operands)
+
+    # HANDLERS — uno por instruccion (o familia de instrucciones)
+
+    # Saltos condicionales por opcode de 8 bits
+    _jump_handlers = {
+        0x01: "_op_jmp",   0x02: "_op_jmpz",  0x03: "_op_jmpnz",
+        0x04: "_op_jmpn",  0x05: "_op_jmpnn", 0x06: "_op_jmpovr",
+        0x07: "_op_jmpund", 0x08: "_op_jmpnorz", 0x09: "_op_jmpnandz",
+    }
 
-        if sub_op in (0x1, 0x2, 0x3, 0x4) and (instr >> 16) == 0:
-            rx = (instr >> 8) & 0xF
-            a = self.get_reg((instr >> 4) & 0xF)
-            b = self.get_reg(instr & 0xF)
+    def _op_nop(self):
+        pass
+
+    def _op_hlt(self):
+        self.running = False
+
+    def _op_jmp(self, addr):
+        self._bank[REG_PC] = addr
+
+    def _op_jmpz(self, addr):
+        if self.reg.flags["Z"] == 1:
+            self._bank[REG_PC] = addr
+
+    def _op_jmpnz(self, addr):
+        if self.reg.flags["Z"] == 0:
+            self._bank[REG_PC] = addr
+
+    def _op_jmpn(self, addr):
+        if self.reg.flags["N"] == 1:
+            self._bank[REG_PC] = addr
+
+    def _op_jmpnn(self, addr):
+        if self.reg.flags["N"] == 0:
+            self._bank[REG_PC] = addr
+
+    def _op_jmpovr(self, addr):
+        if self.reg.flags["D"] == 1:
+            self._bank[REG_PC] = addr
 
-            if sub_op == 0x1:
-                result = self.alu.add(a, b)     # ADD
-            elif sub_op == 0x2:
-                result = self.alu.sub(a, b)     # SUB
-            elif sub_op == 0x3:
-                result = self.alu.mul(a, b)     # MUL
-            elif sub_op == 0x4:
-                result = self.alu.div(a, b)     # DIV
+    def _op_jmpund(self, addr):
+        if self.reg.flags["U"] == 1:
+            self._bank[REG_PC] = addr
 
-            self.set_reg(rx, result)
-            return
+    def _op_jmpnorz(self, addr):
+        if self.reg.flags["N"] or self.reg.flags["Z"]:
+            self._bank[REG_PC] = addr
 
-        print(f"  [WARN] Instruccion no reconocida: 0x{instr:016X}")
+    def _op_jmpnandz(self, addr):
+        if self.reg.flags["N"] and self.reg.flags["Z"]:
+            self._bank[REG_PC] = addr
 
-    # RUN — ciclo Fetch-Decode-Execute hasta HLT
-    def run(self):
+    def _op_jmpr(self, reg_x):
+        self._bank[REG_PC] = self._bank[reg_x]
+
+    def _op_loadmem(self, reg_x, reg_y):
+        if self._trace_mem is not None:
+            self._trace_mem.load(self._bank[REG_PC] - 1, reg_y, self.get_reg(reg_y))
+        self.set_reg(reg_x, self.read_memory(self.get_reg(reg_y)))
+
+    def _op_stor(self, reg_x, reg_y):
+        if self._trace_mem is not None:
+            self._trace_mem.store(self._bank[REG_PC] - 1, reg_y, self.get_reg(reg_y),
+                                  reg_x, self.get_reg(reg_x))
+        self.write_memory(self.get_reg(reg_y), self.get_reg(reg_x))
+
+    def _op_load_imm(self, reg_x, imm):
+        self.set_reg(reg_x, imm)
+
+    def _op_store_imm(self, reg_x, imm):
+        self.write_memory(self.get_reg(reg_x), imm)
+
+    def _op_mov(self, reg_x, reg_y):
+        self.set_reg(reg_x, self.get_reg(reg_y))
+
+    def _op_abval(self, reg_x, reg_y):
+        # ABVAL X, Y — X <- |Y|
+        val = self.get_reg(reg_y)
+        if val & (1 << 63):
+            result = (-(val - (1 << 64))) & WORD_MASK
+        else:
+            result = val
+        self.alu.update_flags(result)
+        self.set_reg(reg_x, result)
+
+    def _op_chng_sign(self, reg_x, reg_y):
+        # CHNG SIG X, Y — X <- -Y
+        result = ((~self.get_reg(reg_y)) + 1) & WORD_MASK
+        self.alu.update_flags(result)
+        self.set_reg(reg_x, result)
+
+    def _op_comp(self, reg_x, reg_y):
+        self.alu.comp(self.get_reg(reg_x), self.get_reg(reg_y))
+
+    def _op_unary(self, op, reg_x, reg_y):
+        # NOT, CHNG INT, CHNG FLOAT — X <- op(Y)
+        self.set_reg(reg_x, op(self.get_reg(reg_y)))
+
+    def _op_shift(self, op, reg_x, reg_y):
+        # SHIFT L / SHIFT R — X <- op(Y, 1)
+        self.set_reg(reg_x, op(self.get_reg(reg_y), 1))
+
+    def _op_binary(self, op, reg_x, reg_w, reg_y):
+        # Aritmetica entera/flotante y logica RRR — X <- op(W, Y)
+        self.set_reg(reg_x, op(self.get_reg(reg_w), self.get_reg(reg_y)))
+
+    def _op_push(self, reg_x):
+        # PUSH X — SP--, MEM[SP] <- X
+        bank = self._bank
+        bank[REG_SP] = (bank[REG_SP] - 1) & WORD_MASK
+        self.write_memory(bank[REG_SP], bank[reg_x])
+
+    def _op_pop(self, reg_x):
+        # POP X — X <- MEM[SP], SP++
+        bank = self._bank
+        self.set_reg(reg_x, self.read_memory(bank[REG_SP]))
+        bank[REG_SP] = (bank[REG_SP] + 1) & WORD_MASK
+
+    def _op_dec(self, reg_x):
+        self.set_reg(reg_x, self.alu.sub(self.get_reg(reg_x), 1))
+
+    def _op_inc(self, reg_x):
+        self.set_reg(reg_x, self.alu.add(self.get_reg(reg_x), 1))
+
+    def _op_unknown(self, instr):
+        if self._trace_warn is not None:
+            self._trace_warn.warn(self._bank[REG_PC] - 1, instr)
+
+    # RUN — ciclo Fetch-Decode-Execute
+    # Los metodos y el estado usados en cada ciclo se enlazan a variables
+    # locales; en un acierto de la cache de instrucciones el fetch se hace
+    # en linea, sin llamar a fetch()/execute().
+    def run(self, max_cycles=None, until_pc=None):
+        """Ejecuta hasta HLT, un limite de ciclos, un breakpoint o un fallo.
+
+        Args:
+            max_cycles (int | None): maximo de instrucciones a ejecutar.
+            until_pc   (int | None): se detiene cuando, tras una instruccion,
+                                     PC vale ``until_pc``.
+
+        Returns:
+            RunResult: motivo de parada, ciclos ejecutados, PC y el error si
+            la parada fue por ``StopReason.FAULT``.
+        """
         self.running = True
         self.cycle_count = 0
-        while self.running:
-            self.cycle_count += 1
-            self.fetch()
-            self.execute()
+        fetch = self.fetch
+        execute = self.execute
+        icache = self._icache
+        bank = self._bank
+        reg = self.reg
+        limit = -1 if max_cycles is None else max_cycles
+        cycles = 0
+        hits = 0
+        reason = StopReason.HLT
+        error = None
+        try:
+            while self.running:
+                if cycles == limit:
+                    reason = StopReason.BUDGET
+                    break
+                cycles += 1
+                pc = bank[REG_PC]
+                entry = icache.get(pc)
+                if entry is None:
+                    fetch()
+                    execute()
+                else:
+                    hits += 1
+                    instr, handler, operands = entry
+                    reg.MAR = pc
+                    reg.MDR = instr
+                    bank[REG_IR] = instr
+                    bank[REG_PC] = pc + 1
+                    handler(*operands)
+                if until_pc is not None and bank[REG_PC] == until_pc and self.running:
+                    reason = StopReason.BREAKPOINT
+                    break
+        except Exception as e:
+            reason = StopReason.FAULT
+            error = e
+        finally:
+            self.cycle_count = cycles
+            self.icache_hits += hits
+        return RunResult(reason, cycles, bank[REG_PC], error)
+
+    # RUN PROFILED — ciclo paso a paso que informa cada instruccion a un
+    # perfilador (ver pc/profiler.py). Separado de run() para no agregar
+    # costo al ciclo normal.
+    def run_profiled(self, profiler, max_cycles=None, until_pc=None):
+        """Como ``run()`` pero llamando ``profiler.record(pc, opcode, ns)``
+        tras cada instruccion. ``ns`` es el tiempo del host si
+        ``profiler.timing`` es verdadero, o 0.
+        """
+        self.running = True
+        self.cycle_count = 0
+        bank = self._bank
+        record = profiler.record
+        clock = time.perf_counter_ns if profiler.timing else None
+        names = {}
+        limit = -1 if max_cycles is None else max_cycles
+        cycles = 0
+        reason = StopReason.HLT
+        error = None
+        try:
+            while self.running:
+                if cycles == limit:
+                    reason = StopReason.BUDGET
+                    break
+                cycles += 1
+                pc = bank[REG_PC]
+                if clock is not None:
+                    start = clock()
+                self.fetch()
+                instr = bank[REG_IR]
+                self.execute()
+                elapsed = clock() - start if clock is not None else 0
+                name = names.get(instr)
+                if name is None:
+                    name = names[instr] = self.instruction_name(instr)
+                record(pc, name, elapsed)
+                if until_pc is not None and bank[REG_PC] == until_pc and self.running:
+                    reason = StopReason.BREAKPOINT
+                    break
+        except Exception as e:
+            reason = StopReason.FAULT
+            error = e
+        finally:
+            self.cycle_count = cycles
+        return RunResult(reason, cycles, bank[REG_PC], error)
+
+    def instruction_name(self, instr):
+        """Nombre de la instruccion ``instr``, p. ej. ``"LOADMEM"`` o ``"ADD"``."""
+        handler, operands = self._decode_word(instr)
+        name = handler.__name__[4:]
+        if name in ("unary", "shift", "binary"):
+            name = operands[0].__name__
+        return name.upper()
+
+    # RUN BLOCKS — ejecucion por bloques basicos traducidos
+    # Cada bloque se traduce una vez a una funcion de Python que ejecuta
+    # todas sus instrucciones con los registros en variables locales.
+    def run_blocks(self, max_cycles=None, until_pc=None):
+        """Como ``run()`` pero usando bloques basicos traducidos.
+
+        El estado final (registros, FLAGS, MAR/MDR, RAM y ``cycle_count``)
+        es el mismo que deja ``run()`` con los mismos argumentos: si el
+        bloque no cabe en el presupuesto o contiene ``until_pc`` se ejecuta
+        instruccion por instruccion.
+        """
+        self.running = True
+        self.cycle_count = 0
+        blocks = self._blocks
+        bank = self._bank
+        reason = StopReason.HLT
+        error = None
+        try:
+            while self.running:
+                remaining = -1 if max_cycles is None else max_cycles - self.cycle_count
+                if remaining == 0:
+                    reason = StopReason.BUDGET
+                    break
+                pc = bank[REG_PC]
+                block = blocks.get(pc)
+                if block is None:
+                    block = self._translate(pc)
+                if (block is None or 0 < remaining < block.length
+                        or (until_pc is not None and pc < until_pc < pc + block.length)):
+                    # Un paso normal: direccion no traducible, presupuesto
+                    # insuficiente o breakpoint dentro del bloque
+                    self.cycle_count += 1
+                    self.fetch()
+                    self.execute()
+                else:
+                    self.cycle_count += block()
+                if until_pc is not None and bank[REG_PC] == until_pc and self.running:
+                    reason = StopReason.BREAKPOINT
+                    break
+        except Exception as e:
+            reason = StopReason.FAULT
+            error = e
+        return RunResult(reason, self.cycle_count, bank[REG_PC], error)
+
+    def _invalidate_blocks(self, address):
+        starts = self._block_owners.pop(address, None)
+        if starts:
+            for start in starts:
+                self._blocks.pop(start, None)
+
+    def _translate(self, start):
+        """Traduce el bloque basico que inicia en ``start``.
+
+        El bloque termina en un salto, HLT, una escritura a PC/IR o al
+        alcanzar ``BLOCK_MAX_INSTR``. Retorna ``None`` si no hay nada que
+        traducir (p. ej. ``start`` fuera de la RAM).
+        """
+        last = self.ram.size - 1
+        instrs = []
+        addr = start
+        # La ultima celda no se traduce: la RAM redirige ahi las
+        # direcciones fuera de rango y el bloque no lo detectaria.
+        while addr < last and len(instrs) < BLOCK_MAX_INSTR:
+            word = self.ram.request(0, addr, CTRL_MEM_READ)
+            handler, operands = self._decode_word(word)
+            instrs.append((addr, word, handler.__name__, operands))
+            addr += 1
+            if _ends_block(handler.__name__, operands):
+                break
+        if not instrs:
+            return None
+        end = addr
+
+        names = self.register_map
+        used = set()
+        for _, _, name, operands in instrs:
+            used.update(c for c in _block_regs(name, operands)
+                        if c in BLOCK_LOCAL_REGS)
+        local = {code: names[code].lower() for code in sorted(used)}
+
+        namespace = {
+            "M": WORD_MASK, "cpu": self, "reg": self.reg,
+            "bank": self._bank, "flags": self.reg.flags,
+            "request": self.ram.request,
+            "update_flags": self.alu.update_flags, "comp": self.alu.comp,
+        }
+        trace_mem = self._trace_mem
+        trace_warn = self._trace_warn
+        if trace_mem is not None:
+            namespace["trace_load"] = trace_mem.load
+            namespace["trace_store"] = trace_mem.store
+        if trace_warn is not None:
+            namespace["trace_warn"] = trace_warn.warn
+
+        def read(code, addr, word):
+            if code in local:
+                return local[code]
+            if code == REG_PC:  # PC ya incrementado por el fetch
+                return str(addr + 1)
+            if code == REG_IR:  # IR contiene la instruccion actual
+                return str(word)
+            return "0"
+
+        def write(code, expr):
+            if code in local:
+                return f"{local[code]} = {expr}"
+            if code == REG_PC:
+                return f"pc = ({expr}) & M"
+            if code == REG_IR:
+                return f"ir = ({expr}) & M"
+            return f"_ = {expr}"
+
+        def writeback_lines():
+            return [f"bank[{code}] = {var}" for code, var in local.items()]
+
+        def exit_lines(indent, n, pc, ir, mar_src):
+            lines = writeback_lines()
+            if mar_src is None:
+                lines.append("reg.MAR = mar; reg.MDR = mdr")
+            else:
+                lines.append(f"reg.MAR = {mar_src[0]}; reg.MDR = {mar_src[1]}")
+            lines.append(f"bank[{REG_PC}] = {pc}; bank[{REG_IR}] = {ir}")
+            lines.append(f"return {n}")
+            return [" " * indent + line for line in lines]
+
+        body = []
+        # Origen de MAR/MDR: (dir, palabra) del ultimo fetch o None si
+        # el ultimo acceso fue una operacion de memoria (locales mar/mdr).
+        mar_src = None
+        pc_exit = str(end)
+        ir_exit = None
+        for k, (addr, word, name, ops) in enumerate(instrs):
+            mar_src = (addr, word)
+            ir_exit = str(word)
+            emit = body.append
+            emit(f"# 0x{addr:04X}: {name[4:]} {ops}")
+            if name not in _PURE_OPS:
+                emit(f"at = {k}")
+
+            if name == "_op_hlt":
+                emit("cpu.running = False")
+            elif name == "_op_jmp":
+                pc_exit = str(ops[0])
+            elif name in _JUMP_CONDITIONS:
+                pc_exit = "pc"
+                emit(f"pc = {ops[0]} if {_JUMP_CONDITIONS[name]} else {addr + 1}")
+            elif name == "_op_jmpr":
+                pc_exit = "pc"
+                emit(f"pc = {read(ops[0], addr, word)}")
+            elif name == "_op_loadmem":
+                x, y = ops
+                if trace_mem is not None:
+                    emit(f"trace_load({addr}, {y}, {read(y, addr, word)})")
+                emit(f"mar = {read(y, addr, word)} & M")
+                emit("mdr = request(0, mar, 0) & M")
+                emit(write(x, "mdr"))
+                mar_src = None
+            elif name in ("_op_stor", "_op_store_imm", "_op_push"):
+                if name == "_op_stor":
+                    x, y = ops
+                    if trace_mem is not None:
+                        emit(f"trace_store({addr}, {y}, {read(y, addr, word)}, "
+                             f"{x}, {read(x, addr, word)})")
+                    emit(f"mar = {read(y, addr, word)} & M")
+                    emit(f"mdr = {read(x, addr, word)} & M")
+                elif name == "_op_store_imm":
+                    emit(f"mar = {read(ops[0], addr, word)} & M")
+                    emit(f"mdr = {ops[1]} & M")
+                else:
+                    emit(write(REG_SP, f"({read(REG_SP, addr, word)} - 1) & M"))
+                    emit(f"mar = {read(REG_SP, addr, word)} & M")
+                    emit(f"mdr = {read(ops[0], addr, word)} & M")
+                emit("request(mdr, mar, 1)")
+                mar_src = None
+                if addr + 1 < end:
+                    # Codigo auto-modificable: la escritura cae en el resto
+                    # de este bloque, que ya fue invalidado.
+                    emit(f"if {addr} < mar < {end}:")
+                    body.extend(exit_lines(4, k + 1, addr + 1, word, None))
+            elif name == "_op_pop":
+                emit(f"mar = {read(REG_SP, addr, word)} & M")
+                emit("mdr = request(0, mar, 0) & M")
+                emit(write(ops[0], "mdr"))
+                emit(write(REG_SP, f"({read(REG_SP, addr, word)} + 1) & M"))
+                mar_src = None
+            elif name == "_op_load_imm":
+                emit(write(ops[0], str(ops[1])))
+            elif name == "_op_mov":
+                emit(write(ops[0], read(ops[1], addr, word)))
+            elif name == "_op_abval":
+                x, y = ops
+                emit(f"v = {read(y, addr, word)}")
+                emit("v = (-(v - (1 << 64))) & M if v & (1 << 63) else v")
+                emit("update_flags(v)")
+                emit(write(x, "v"))
+            elif name == "_op_chng_sign":
+                x, y = ops
+                emit(f"v = ((~{read(y, addr, word)}) + 1) & M")
+                emit("update_flags(v)")
+                emit(write(x, "v"))
+            elif name == "_op_comp":
+                x, y = ops
+                emit(f"comp({read(x, addr, word)}, {read(y, addr, word)})")
+            elif name in ("_op_unary", "_op_shift", "_op_binary"):
+                op = f"op{k}"
+                namespace[op] = ops[0]
+                args = [read(c, addr, word) for c in ops[2:]]
+                if name == "_op_shift":
+                    args.append("1")
+                emit(write(ops[1], f"{op}({', '.join(args)})"))
+            elif name in ("_op_dec", "_op_inc"):
+                op = "sub" if name == "_op_dec" else "add"
+                namespace[op] = getattr(self.alu, op)
+                emit(write(ops[0], f"{op}({read(ops[0], addr, word)}, 1)"))
+            elif name == "_op_unknown":
+                if trace_warn is not None:
+                    emit(f"trace_warn({addr}, {ops[0]})")
+            elif name != "_op_nop":
+                raise ValueError(f"Handler sin traduccion: {name}")
+
+            if _dest_reg(name, ops) == REG_PC:
+                pc_exit = "pc"
+            if _dest_reg(name, ops) == REG_IR:
+                ir_exit = "ir"
+
+        src = [f"def block_{start:04X}():"]
+        src += [f"    {var} = bank[{code}]" for code, var in local.items()]
+        src += ["    mar = mdr = 0", "    at = 0", "    try:", "        pass"]
+        src += ["        " + line for line in body]
+        src += ["    except BaseException:"]
+        src += ["        " + line for line in writeback_lines()]
+        src += ["        fault(at)", "        raise"]
+        src += exit_lines(4, len(instrs), pc_exit, ir_exit, mar_src)
+        source = "\n".join(src)
+
+        def fault(at):
+            # Deja el estado como el de run() al fallar la instruccion ``at``
+            addr, word = instrs[at][:2]
+            self._bank[REG_PC] = addr + 1
+            self._bank[REG_IR] = self.reg.MDR = word
+            self.reg.MAR = addr
+            self.cycle_count += at + 1
+
+        namespace["fault"] = fault
+        exec(compile(source, f"<block 0x{start:04X}>", "exec"), namespace)
+        block = namespace[f"block_{start:04X}"]
+        block.source = source
+        block.length = len(instrs)
+
+        self._blocks[start] = block
+        for a in range(start, end):
+            self._block_owners.setdefault(a, set()).add(start)
+        return block
 
     # Depuracion
     def dump_registers(self):
@@ -427,3 +837,57 @@ class CPU:
         flags_str = "  ".join(f"{k}={v}" for k, v in self.reg.flags.items())
         print(f"  FLAGS: {flags_str}")
         print("=" * 60)
+
+
+# Traduccion por bloques basicos (CPU.run_blocks)
+
+# Registros que un bloque traducido mantiene en variables locales
+BLOCK_LOCAL_REGS = frozenset({REG_SP, REG_BP} | set(range(0b0101, 0b1111)))
+BLOCK_MAX_INSTR  = 128
+
+# Condicion de cada salto condicional sobre el dict ``flags``
+_JUMP_CONDITIONS = {
+    "_op_jmpz":     'flags["Z"] == 1',
+    "_op_jmpnz":    'flags["Z"] == 0',
+    "_op_jmpn":     'flags["N"] == 1',
+    "_op_jmpnn":    'flags["N"] == 0',
+    "_op_jmpovr":   'flags["D"] == 1',
+    "_op_jmpund":   'flags["U"] == 1',
+    "_op_jmpnorz":  '(flags["N"] or flags["Z"])',
+    "_op_jmpnandz": '(flags["N"] and flags["Z"])',
+}
+
+_BLOCK_WRITES_PC = {"_op_jmp", "_op_jmpr"} | set(_JUMP_CONDITIONS)
+
+# Instrucciones que no pueden lanzar excepciones
+_PURE_OPS = {"_op_nop", "_op_load_imm", "_op_mov"} | _BLOCK_WRITES_PC
+
+
+def _dest_reg(name, operands):
+    """Registro destino de la instruccion, o ``None``."""
+    if name in ("_op_loadmem", "_op_load_imm", "_op_mov", "_op_abval",
+                "_op_chng_sign", "_op_pop", "_op_dec", "_op_inc"):
+        return operands[0]
+    if name in ("_op_unary", "_op_shift", "_op_binary"):
+        return operands[1]
+    return None
+
+
+def _block_regs(name, operands):
+    """Codigos de registro leidos o escritos por la instruccion."""
+    if name in ("_op_push", "_op_pop"):
+        return (REG_SP, operands[0])
+    if name in ("_op_unary", "_op_shift", "_op_binary"):
+        return operands[1:]
+    if name in ("_op_load_imm", "_op_store_imm"):
+        return operands[:1]
+    if name in ("_op_loadmem", "_op_stor", "_op_mov", "_op_abval",
+                "_op_chng_sign", "_op_comp", "_op_dec", "_op_inc", "_op_jmpr"):
+        return operands
+    return ()
+
+
+def _ends_block(name, operands):
+    """Indica si la instruccion cierra el bloque basico."""
+    return (name == "_op_hlt" or name in _BLOCK_WRITES_PC
+            or _dest_reg(name, operands) in (REG_PC, REG_IR))
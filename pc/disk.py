@@ -1,36 +1,315 @@
+import copy
 import json
+import mmap
 import os
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+
+# Disk image formats
+BACKEND_JSON = "json"        # whole disk as one JSON document (original format)
+BACKEND_JOURNAL = "journal"  # append-only log of changes
+
+# When changes reach the disk image
+WRITE_THROUGH = "write-through"  # on every change
+WRITE_BACK = "write-back"        # batched: timer, flush(), close() or end of batch()
+
+# Sector image defaults: 64 words of 64 bits (512 bytes) per sector
+SECTOR_WORDS = 64
+SECTORS = 4096
+WORD_MASK_64 = (1 << 64) - 1
+
+
+def _read_json(path: str) -> dict:
+    """Load a JSON disk image; a missing or broken file is an empty disk."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"root": {}}
+    if not isinstance(data, dict) or "root" not in data:
+        return {"root": {}}
+    return data
+
+
+def _write_json(path: str, data: dict):
+    """Write a JSON disk image next to ``path`` and swap it in atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class JsonImage:
+    """Disk stored as one JSON document (the original ``disk.json``).
+
+    Every change rewrites the whole file, so a write costs O(disk size).
+    The new image replaces the old one with ``os.replace``: a crash leaves
+    either the previous or the new image, never a half-written file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def records(self):
+        """Records that rebuild the disk: a single ``image`` snapshot."""
+        if os.path.exists(self.path):
+            yield {"op": "image", "data": _read_json(self.path)}
+
+    def append(self, record: dict, data: dict):
+        self.save(data)
+
+    def save(self, data: dict):
+        _write_json(self.path, data)
+
+    def close(self):
+        pass
+
+
+class JournalImage:
+    """Disk stored as an append-only log, one JSON record per line.
+
+    Records are ``set`` (file content or new folder at ``path``), ``del``,
+    ``format``, ``image`` (full snapshot) and ``batch`` (several records
+    written as one line, so they are replayed all or nothing). A change appends only its own
+    record, so a write costs O(size of change); opening the disk replays
+    the log into the in-memory directory index.
+
+    A record cut short by a crash (no trailing newline or invalid JSON) and
+    anything after it are dropped and truncated away on open. When the log
+    grows past ``compact_ratio`` times the last snapshot (and at least
+    ``min_compact`` bytes) it is rewritten as a single snapshot, so replay
+    stays proportional to the disk size.
+    """
+
+    def __init__(self, path: str, compact_ratio: int = 4, min_compact: int = 1 << 20):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self._file = None
+        self._size = 0          # bytes in the log
+        self._snapshot = 0      # bytes of the last snapshot
+
+    def records(self):
+        """Replay the log; truncates a torn tail before reopening it."""
+        good = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if record.get("op") == "image":
+                        self._snapshot = len(line)
+                    good += len(line)
+                    yield record
+            if good < os.path.getsize(self.path):
+                with open(self.path, "r+b") as f:
+                    f.truncate(good)
+        self._size = good
+        self._file = open(self.path, "ab")
+
+    def append(self, record: dict, data: dict):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line)
+        if self._size > max(self.min_compact, self.compact_ratio * self._snapshot):
+            self.save(data)
+
+    def save(self, data: dict):
+        """Compact: replace the log with a single snapshot record."""
+        line = (json.dumps({"op": "image", "data": data}, ensure_ascii=False) + "\n").encode("utf-8")
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "ab")
+        self._size = self._snapshot = len(line)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 class Disk:
-    """Disk emulator using JSON file storage.
+    """Disk emulator with an in-memory directory index.
 
-    Uses nested JSON objects for folder structure:
+    Uses nested objects for folder structure:
     {"root": {"folder": {"file": "content", "subfolder": {}}, "file": "data"}}
+
+    The image is kept by ``backend``: ``"json"`` rewrites ``disk.json`` on
+    every change (the original format), ``"journal"`` appends one record
+    per change (see ``JournalImage``). By default ``.json`` paths use the
+    JSON backend and anything else the journal. ``legacy`` is a JSON image
+    imported when the journal does not exist yet; ``import_json`` and
+    ``export_json`` convert between formats at any time.
+
+    Durability by ``mode`` (the directory index in memory is always up to
+    date; this is about what survives a crash of the process):
+
+    * ``"write-through"`` (default): each change is in the image when the
+      method returns. JSON swaps in a complete new file, the journal
+      appends and flushes one record; a crash loses nothing, at most the
+      record being written, which is dropped on open.
+    * ``"write-back"``: changes are only marked dirty and written together
+      by a timer (``flush_interval`` seconds after the first one), by
+      ``flush()``, by ``close()`` or at the end of ``batch()``. A crash
+      loses the changes since the last flush; each flush is all or nothing
+      (one atomic JSON replace, or one ``batch`` line in the journal).
+
+    Neither mode calls ``fsync`` per change, so after a power loss the
+    operating system may not have written the last flushes yet.
+
+    ``with disk.batch():`` groups changes in any mode: they are written as
+    a single flush when the block ends, and if it raises they are undone
+    and never reach the image. Nested batches are written with the
+    outermost one; an inner batch that raises undoes only its own changes.
+    ``with Disk(...) as disk:`` closes the disk.
     """
 
-    def __init__(self, path: str = "disk.json"):
+    def __init__(self, path: str = "disk.json", backend: str | None = None,
+                 legacy: str | None = None, mode: str = WRITE_THROUGH,
+                 flush_interval: float = 1.0):
+        if mode not in (WRITE_THROUGH, WRITE_BACK):
+            raise ValueError(f"Unknown disk mode: {mode}")
         self.path = path
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self._pending: list[dict] = []     # changes not yet in the image
+        self._batch_depth = 0
+        self._timer = None
+        self._lock = threading.RLock()
+        if backend is None:
+            backend = BACKEND_JSON if path.endswith(".json") else BACKEND_JOURNAL
+        if backend == BACKEND_JSON:
+            self._image = JsonImage(path)
+        elif backend == BACKEND_JOURNAL:
+            self._image = JournalImage(path)
+        else:
+            raise ValueError(f"Unknown disk backend: {backend}")
+        self.backend = backend
         self._data: dict = {"root": {}}
+        fresh = not os.path.exists(path)
         self._load()
+        if fresh and legacy is not None and os.path.exists(legacy):
+            self.import_json(legacy)
 
     def _load(self):
-        """Load disk image from JSON file."""
-        if os.path.exists(self.path):
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self._data = json.load(f)
-                if "root" not in self._data:
-                    self._data = {"root": {}}
-            except (json.JSONDecodeError, IOError):
-                self._data = {"root": {}}
-        else:
-            self._data = {"root": {}}
+        """Rebuild the directory index from the disk image."""
+        self._data = {"root": {}}
+        for record in self._image.records():
+            self._apply(record)
 
     def _save(self):
-        """Save disk image to JSON file."""
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        """Write the whole disk image (a snapshot, for the journal)."""
+        self._image.save(self._data)
+
+    def _apply(self, record: dict):
+        """Apply one change record to the directory index."""
+        op = record["op"]
+        if op == "image":
+            self._data = copy.deepcopy(record["data"])
+        elif op == "batch":
+            for item in record["records"]:
+                self._apply(item)
+        elif op == "format":
+            self._data = {"root": {}}
+        elif op in ("set", "del"):
+            *parents, name = record["path"]
+            folder = self._data["root"]
+            for part in parents:
+                if not isinstance(folder.get(part), dict):
+                    if op == "del":
+                        return
+                    folder[part] = {}
+                folder = folder[part]
+            if op == "set":
+                folder[name] = copy.deepcopy(record["value"])
+            else:
+                folder.pop(name, None)
+        else:
+            raise ValueError(f"Unknown disk record: {op}")
+
+    def _update(self, record: dict):
+        """Apply a change and store it in the disk image (or mark it dirty)."""
+        with self._lock:
+            self._apply(record)
+            self._pending.append(record)
+            if self._batch_depth:
+                return
+            if self.mode == WRITE_THROUGH:
+                self.flush()
+            elif self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @property
+    def dirty(self) -> bool:
+        """There are changes not yet written to the disk image."""
+        return bool(self._pending)
+
+    def flush(self):
+        """Write all pending changes to the disk image as one unit."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            if len(self._pending) == 1:
+                record = self._pending[0]
+            else:
+                record = {"op": "batch", "records": self._pending}
+            self._image.append(record, self._data)
+            self._pending = []
+
+    @contextmanager
+    def batch(self):
+        """Group changes: one flush at the end, undone if the block raises."""
+        with self._lock:
+            if self._batch_depth == 0:
+                self.flush()
+            start = len(self._pending)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                # The image holds exactly the state before the outermost
+                # batch: reload it and replay the changes made before this one
+                del self._pending[start:]
+                self._image.close()
+                self._load()
+                for record in self._pending:
+                    self._apply(record)
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _folder_parts(path: str) -> list[str]:
+        """Path parts below root, as ``_get_folder`` walks them."""
+        if not path or path == "root":
+            return []
+        return [part for part in path.strip("/").split("/") if part]
 
     def _get_folder(self, path: str) -> dict:
         """Get folder dict by path."""
@@ -111,8 +390,7 @@ class Disk:
         folder_name = path.split("/")[-1]
         if folder_name in folder and isinstance(folder[folder_name], dict):
             raise FileExistsError(f"Folder '{path}' already exists")
-        folder[folder_name] = {}
-        self._save()
+        self._update({"op": "set", "path": self._folder_parts(path) + [folder_name], "value": {}})
 
     def delete_folder(self, path: str):
         """Delete a folder and all its contents."""
@@ -125,8 +403,7 @@ class Disk:
         if folder_name not in parent:
             raise FileNotFoundError(f"Folder '{path}' not found")
 
-        del parent[folder_name]
-        self._save()
+        self._update({"op": "del", "path": self._folder_parts(parent_path) + [folder_name]})
 
     def list_folder(self, path: str = "") -> list[str]:
         """List contents of a folder."""
@@ -159,19 +436,7 @@ class Disk:
         if not path:
             raise ValueError("Filename cannot be empty")
         
-        parts = path.split("/")
-        
-        folder = self._data["root"]
-        for part in parts[:-1]:
-            if part not in folder:
-                folder[part] = {}
-            elif not isinstance(folder[part], dict):
-                folder[part] = {}
-            folder = folder[part]
-        
-        filename = parts[-1]
-        folder[filename] = content
-        self._save()
+        self._update({"op": "set", "path": path.split("/"), "value": content})
 
     def delete_file(self, path: str):
         """Delete a file."""
@@ -188,57 +453,366 @@ class Disk:
         if isinstance(folder[filename], dict):
             raise IsADirectoryError(f"'{path}' is a folder, use delete_folder()")
 
-        del folder[filename]
-        self._save()
+        self._update({"op": "del", "path": self._folder_parts(parent_path) + [filename]})
 
     def format(self):
         """Format disk (delete all contents)."""
-        self._data = {"root": {}}
-        self._save()
+        self._update({"op": "format"})
+
+    def import_json(self, path: str):
+        """Replace the disk contents with a JSON image (original format)."""
+        self._update({"op": "image", "data": _read_json(path)})
+
+    def export_json(self, path: str):
+        """Write the disk contents as a JSON image (original format)."""
+        _write_json(path, self._data)
+
+    def close(self):
+        """Flush pending changes and release the disk image file."""
+        with self._lock:
+            self.flush()
+            self._image.close()
+
+
+def _words_to_bytes(words) -> bytes:
+    """64-bit words as little-endian bytes (the sector image format)."""
+    data = array("Q", (word & WORD_MASK_64 for word in words))
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _bytes_to_words(raw: bytes) -> array:
+    data = array("Q", raw)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data
+
+
+class SectorImage:
+    """Fixed-size sectors of 64-bit words in a memory-mapped file.
+
+    Layout (little-endian 64-bit words)::
+
+        MAGIC, sector_words, sectors, slots   header
+        index[sectors]                        slot + 1 of each sector, 0 = unused
+        slot 0, slot 1, ...                   sector_words words each
+
+    The file is mapped with ``mmap``: reads and writes are slices of the
+    mapping and the operating system writes the pages back (``flush``
+    forces it). A sector gets the next free slot the first time it is
+    written, so the data grows with the sectors in use (the file is
+    extended with zeroed slots, doubling); unused sectors read as zeros.
+    The index is kept in memory (sector -> slot in O(1)); new entries and
+    ``slots`` are stored after their data, so a crash never points a
+    sector at missing data. Sectors written together get consecutive
+    slots, so a range is usually moved with one slice.
+    """
+
+    MAGIC = int.from_bytes(b"LPDISK02", "little")
+    HEADER_WORDS = 4
+    MIN_SLOTS = 16
+
+    def __init__(self, path: str, sectors: int = SECTORS, sector_words: int = SECTOR_WORDS):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= self.HEADER_WORDS * 8:
+            self._file = open(path, "r+b")
+            magic, sector_words, sectors, slots = _bytes_to_words(self._file.read(self.HEADER_WORDS * 8))
+            if magic != self.MAGIC:
+                self._file.close()
+                raise ValueError(f"'{path}' is not a sector image")
+        else:
+            self._file = open(path, "w+b")
+            slots = 0
+            self._file.write(_words_to_bytes((self.MAGIC, sector_words, sectors, slots)))
+        self.sector_words, self.sectors = sector_words, sectors
+        self.sector_bytes = sector_words * 8
+        self._data_start = (self.HEADER_WORDS + sectors) * 8
+
+        # Whole slots only (a crash may leave the file at any length)
+        capacity = max(0, os.path.getsize(path) - self._data_start) // self.sector_bytes
+        self._file.truncate(self._data_start + capacity * self.sector_bytes)
+        self._file.seek(self.HEADER_WORDS * 8)
+        self._index = _bytes_to_words(self._file.read(sectors * 8))
+        self._slots = min(slots, capacity)
+        # Entries stored before a crash cut ``slots`` short are unused
+        for s, entry in enumerate(self._index):
+            if entry > self._slots:
+                self._index[s] = 0
+        self._file.flush()
+        self._capacity = capacity
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _remap(self, capacity: int):
+        """Resize the file to ``capacity`` slots and map it again."""
+        self._map.close()
+        self._file.truncate(self._data_start + capacity * self.sector_bytes)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = capacity
+
+    def _offset(self, slot: int) -> int:
+        return self._data_start + slot * self.sector_bytes
+
+    def _check(self, sector: int, count: int):
+        if sector < 0 or count < 0 or sector + count > self.sectors:
+            raise IndexError(
+                f"Sectors [{sector}, {sector + count}) out of disk (0..{self.sectors - 1})"
+            )
+
+    def _runs(self, sector: int, count: int):
+        """(first sector, count, slot) of each run with consecutive slots;
+        ``slot`` is None for unused sectors."""
+        index = self._index
+        run_start, run_slot = sector, None
+        for s in range(sector, sector + count):
+            slot = index[s] - 1 if index[s] else None
+            if s == run_start:
+                run_slot = slot
+            elif slot is None and run_slot is None:
+                pass
+            elif slot is None or run_slot is None or slot != run_slot + (s - run_start):
+                yield run_start, s - run_start, run_slot
+                run_start, run_slot = s, slot
+        if count:
+            yield run_start, sector + count - run_start, run_slot
+
+    def _allocate(self, sector: int, count: int) -> list[int]:
+        """Give a slot to every unused sector of the range; returns them."""
+        index = self._index
+        new = [s for s in range(sector, sector + count) if not index[s]]
+        if self._slots + len(new) > self._capacity:
+            self._remap(max(2 * self._capacity, self._slots + len(new), self.MIN_SLOTS))
+        for s in new:
+            self._slots += 1
+            index[s] = self._slots
+        return new
+
+    def _store_index(self, new: list[int]):
+        """Store the entries of newly allocated sectors (contiguous in the
+        range, so one slice) and then the slot count."""
+        if new:
+            first, last = new[0], new[-1] + 1
+            start = (self.HEADER_WORDS + first) * 8
+            self._map[start:start + (last - first) * 8] = _words_to_bytes(self._index[first:last])
+            self._map[24:32] = _words_to_bytes((self._slots,))
+
+    def sectors_for(self, n_words: int) -> int:
+        return -(-n_words // self.sector_words)
+
+    def export(self, sector: int, n_words: int, sink):
+        """Pass ``n_words`` words from ``sector`` on to ``sink(offset, view)``,
+        one call per run of consecutive slots (usually one). ``view`` is a
+        memoryview of 64-bit words over the mapping (zeros for unused
+        sectors) and is only valid during the call."""
+        count = self.sectors_for(n_words)
+        self._check(sector, count)
+        done = 0
+        for first, n, slot in self._runs(sector, count):
+            words = min(n * self.sector_words, n_words - done)
+            if slot is None:
+                sink(done, memoryview(array("Q", bytes(words * 8))))
+            elif sys.byteorder == "big":
+                start = self._offset(slot)
+                sink(done, memoryview(_bytes_to_words(self._map[start:start + words * 8])))
+            else:
+                start = self._offset(slot)
+                with memoryview(self._map) as whole, whole[start:start + words * 8] as raw, \
+                        raw.cast("Q") as view:
+                    sink(done, view)
+            done += words
+
+    def load(self, sector: int, buffer) -> int:
+        """Write a buffer of 64-bit words from ``sector`` on, one slice per
+        run of consecutive slots; the last sector is padded with zeros.
+        Returns the number of sectors written."""
+        if sys.byteorder == "big":
+            words = array("Q")
+            words.frombytes(buffer)
+            words.byteswap()
+            buffer = words
+        with memoryview(buffer) as source, source.cast("B") as raw:
+            count = self.sectors_for(len(raw) // 8)
+            self._check(sector, count)
+            new = self._allocate(sector, count)
+            for first, n, slot in self._runs(sector, count):
+                done = (first - sector) * self.sector_bytes
+                part = raw[done:done + n * self.sector_bytes]
+                start = self._offset(slot)
+                self._map[start:start + len(part)] = part
+                if len(part) < n * self.sector_bytes:
+                    self._map[start + len(part):start + n * self.sector_bytes] = bytes(n * self.sector_bytes - len(part))
+                part.release()
+            # Data first: a crash before the index is stored loses only the
+            # new sectors
+            self._store_index(new)
+        return count
+
+    def read(self, sector: int, count: int = 1) -> array:
+        """Words of ``count`` sectors starting at ``sector``."""
+        out = array("Q")
+        self.export(sector, count * self.sector_words, lambda offset, view: out.frombytes(view.cast("B")))
+        return out
+
+    def write(self, sector: int, words) -> int:
+        """Write ``words`` from ``sector`` on, padding the last sector with
+        zeros. Returns the number of sectors written."""
+        return self.load(sector, array("Q", (word & WORD_MASK_64 for word in words)))
+
+    def format(self):
+        """Mark every sector unused and drop the data slots."""
+        self._index = array("Q", bytes(self.sectors * 8))
+        self._slots = 0
+        self._map[self.HEADER_WORDS * 8:self._data_start] = self._index.tobytes()
+        self._map[24:32] = bytes(8)
+        self._remap(0)
+        self.flush()
+
+    def flush(self):
+        """Write the mapped pages back to the file."""
+        self._map.flush()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
 
 
 class DiskDevice:
-    """Disk device interface for CPU interaction."""
+    """Disk device interface for CPU interaction.
+
+    The device sees the disk as numbered sectors of ``sector_words``
+    64-bit words stored in a ``SectorImage`` file (``image``), separate
+    from the folder view of ``Disk``. Errors do not raise: the call
+    returns nothing and ``status`` / ``last_error`` describe the problem.
+
+    ``dma_read`` / ``dma_write`` move words between the image and the RAM
+    without going through ``RAM.request``: with the default array-backed
+    ``RAM`` each run of consecutive slots is one slice copy between the mapping
+    and the RAM buffer, otherwise one block copy.
+
+    ``disk`` is the optional ``Disk`` (folder view) on the same machine;
+    the device never reads or writes files through it, but ``format()``
+    formats it together with the sector image.
+    """
 
     STATUS_OK = 0x00
     STATUS_NOT_FOUND = 0x01
     STATUS_ERROR = 0x02
 
-    def __init__(self, disk: Disk):
+    def __init__(self, disk: Disk | None = None, image: str = "disk.img",
+                 sectors: int = SECTORS, sector_words: int = SECTOR_WORDS):
         self.disk = disk
+        self.image = SectorImage(image, sectors, sector_words)
         self._current_sector = 0
         self._last_error = None
+        self._status = self.STATUS_OK
+
+    @property
+    def sector_words(self) -> int:
+        return self.image.sector_words
+
+    @property
+    def sectors(self) -> int:
+        return self.image.sectors
+
+    def _fail(self, error: Exception):
+        self._last_error = str(error)
+        self._status = self.STATUS_NOT_FOUND if isinstance(error, IndexError) else self.STATUS_ERROR
+
+    def _ok(self):
+        self._last_error = None
+        self._status = self.STATUS_OK
 
     def set_sector(self, sector: int):
-        """Set current sector (simulated)."""
+        """Set current sector."""
         self._current_sector = sector
 
-    def read_sector(self) -> str:
-        """Read sector as string."""
+    def read_sectors(self, sector: int, count: int) -> list[int]:
+        """Read ``count`` contiguous sectors as a list of words."""
+        try:
+            words = self.image.read(sector, count).tolist()
+        except (IndexError, OSError, TypeError, ValueError) as e:
+            self._fail(e)
+            return []
+        self._ok()
+        return words
+
+    def write_sectors(self, sector: int, words) -> int:
+        """Write words over contiguous sectors from ``sector`` (the last one
+        is padded with zeros). Returns the number of sectors written."""
+        try:
+            count = self.image.write(sector, words)
+        except (IndexError, OSError, TypeError, ValueError) as e:
+            self._fail(e)
+            return 0
+        self._ok()
+        return count
+
+    def read_sector(self, sector: int | None = None) -> list[int]:
+        """Read one sector (the current one by default)."""
+        return self.read_sectors(self._current_sector if sector is None else sector, 1)
+
+    def write_sector(self, data, sector: int | None = None):
+        """Write one sector (the current one by default)."""
+        data = list(data)[:self.sector_words]
+        self.write_sectors(self._current_sector if sector is None else sector, data or [0])
+
+    def dma_read(self, sector: int, ram, addr: int, n_words: int) -> int:
+        """Copy ``n_words`` words from ``sector`` on into ``ram`` at ``addr``.
+        Returns the number of words copied."""
         try:
-            files = self.disk.list_folder()
-            if self._current_sector < len(files):
-                filename = files[self._current_sector]
-                return self.disk.read_file(f"root/{filename}")
-            return ""
-        except Exception as e:
-            self._last_error = str(e)
-            return ""
-
-    def write_sector(self, data: str):
-        """Write sector data."""
+            if addr < 0 or n_words < 0 or addr + n_words > ram.size:
+                raise IndexError(f"RAM block [{addr}, {addr + n_words}) out of range")
+            self.image.export(sector, n_words,
+                              lambda offset, view: ram.load_buffer(addr + offset, view))
+        except (IndexError, OSError, TypeError, ValueError) as e:
+            self._fail(e)
+            return 0
+        self._ok()
+        return n_words
+
+    def dma_write(self, sector: int, ram, addr: int, n_words: int) -> int:
+        """Copy ``n_words`` words of ``ram`` from ``addr`` to the disk from
+        ``sector`` on (the last sector is padded with zeros). Returns the
+        number of sectors written."""
         try:
-            files = self.disk.list_folder()
-            if self._current_sector < len(files):
-                filename = files[self._current_sector]
-                self.disk.write_file(f"root/{filename}", data)
-            self._last_error = None
-        except Exception as e:
-            self._last_error = str(e)
+            if addr < 0 or n_words < 0 or addr + n_words > ram.size:
+                raise IndexError(f"RAM block [{addr}, {addr + n_words}) out of range")
+            if ram.backend == "array":
+                with ram.memoryview() as memo, memo[addr:addr + n_words] as view:
+                    if view.itemsize == 8:
+                        count = self.image.load(sector, view)
+                    else:
+                        count = self.image.write(sector, view.tolist())
+            else:
+                count = self.image.write(sector, ram.read_block(addr, n_words))
+        except (IndexError, OSError, TypeError, ValueError) as e:
+            self._fail(e)
+            return 0
+        self._ok()
+        return count
 
     def format(self):
-        """Format disk."""
-        self.disk.format()
+        """Format the sector image and, if given, the ``Disk``."""
+        try:
+            self.image.format()
+            if self.disk is not None:
+                self.disk.format()
+        except OSError as e:
+            self._fail(e)
+            return
+        self._ok()
+
+    def flush(self):
+        self.image.flush()
+
+    def close(self):
+        self.image.close()
+
+    @property
+    def status(self) -> int:
+        return self._status
 
     @property
     def last_error(self) -> str | None:
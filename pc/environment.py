@@ -1,4 +1,5 @@
 import sys
+import traceback
 
 from ram      import RAM
 from register import Registers
@@ -6,6 +7,7 @@ from alu    import Alu
 from fpu import FPU
 from cpu      import CPU
 from loader   import Loader
+from tracing  import Tracer, TraceLevel, FileSink
 
 MAX_RAM = 2 ** 16
 
@@ -26,7 +28,7 @@ def main():
     reg  = Registers()
     fpu = FPU(reg)
     alu  = Alu(reg, fpu)
-    cpu  = CPU(ram, reg, alu)
+    cpu  = CPU(ram, reg, alu, Tracer(TraceLevel.WARN, FileSink(sys.stdout)))
 
     #Cargar programa con el Loader (ANTES del ciclo run)
     loader = Loader(start_address=base_addr)
@@ -40,7 +42,10 @@ def main():
     print(f"  PC: {entry_point}  |  SP: {reg.SP}")
 
     #Ejecutar
-    cpu.run()
+    result = cpu.run()
+    if result.error is not None:
+        print(f"  Error en PC = {result.pc}: {result.error!r}")
+        traceback.print_exception(result.error)
 
     print(f"  Detenida tras {cpu.cycle_count} ciclos")
     cpu.dump_registers()
@@ -7,6 +7,16 @@ MANT_MASK = (1 << 52) - 1
 BIAS = 1023
 
 
+def _float_flags(result):
+    # Evaluador perezoso de FLAGS para resultados de la FPU -> (N, Z, D, U)
+    exp = (result >> 52) & 0x7FF
+    mant = result & MANT_MASK
+    if exp != 0:
+        mant |= (1 << 52)
+    # D: overflow, U: underflow
+    return (result >> 63) & 0x1, int(result == 0), int(exp >= 2047), int(exp == 0 and mant != 0)
+
+
 class FPU:
 
     def __init__(self, registers):
@@ -58,16 +68,7 @@ class FPU:
     # ------------------------
 
     def update_flags(self, result):
-        sign, exp, mant = self.fextract(result)
-
-        self.reg.flags["Z"] = int(result == 0)
-        self.reg.flags["N"] = sign
-
-        # overflow
-        self.reg.flags["D"] = int(exp >= 2047)
-
-        # underflow
-        self.reg.flags["U"] = int(exp == 0 and mant != 0)
+        self.reg.flags.defer(_float_flags, result)
 
     # ------------------------
     # FLOAT OPERATIONS
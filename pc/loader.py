@@ -1,5 +1,4 @@
 WORD_SIZE = 64
-CONTROL_WRITE = 1  # impar = write
 OPCODE_BITS = 8
 OPERAND_BITS = WORD_SIZE - OPCODE_BITS
 
@@ -55,7 +54,7 @@ class Loader:
         Carga el programa en RAM y retorna el entry point.
         """
 
-        addr = self.start_address
+        words = []
 
         with open(filename, "r") as f:
             for line_number, line in enumerate(f, start=1):
@@ -80,18 +79,10 @@ class Loader:
                 word = int(line, 2)
 
                 # reubicación
-                word = self._relocate(word)
-
-                # escritura en RAM vía bus
-                ram.request(
-                    data=word,
-                    direction=addr,
-                    control=CONTROL_WRITE
-                )
-
-                addr += 1
+                words.append(self._relocate(word))
 
+        # escritura en RAM de todo el programa en un solo bloque
+        self.end_address = ram.load_block(self.start_address, words)
         self.entry_point = self.start_address
-        self.end_address = addr
 
         return self.entry_point
\ No newline at end of file
@@ -0,0 +1,155 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+# Simbolo para direcciones anteriores a la primera etiqueta
+NO_SYMBOL = "<sin simbolo>"
+
+
+def _clean_label(label: str) -> str:
+    """Quita el terminador ``\\0`` con el que el ensamblador guarda las etiquetas."""
+    for end in ("\\0", "\0"):
+        if label.endswith(end):
+            return label[:-len(end)]
+    return label
+
+
+class Profiler:
+    """Perfilador de programas de la maquina virtual (ver ``CPU.run_profiled``).
+
+    Cuenta ejecuciones (y opcionalmente tiempo del host en ns) por opcode,
+    por direccion de PC y por etiqueta (la ultima etiqueta en o antes de
+    cada direccion).
+
+    Para las pilas colapsadas se lleva una pila de llamadas sombra segun
+    la convencion de llamada de los programas (``PUSH`` de la direccion
+    de retorno seguido de ``JMP rutina``; retorno con ``JMPR``): un
+    ``JMP`` precedido de ``PUSH`` abre un marco con la etiqueta destino y
+    un ``JMPR`` lo cierra.
+
+    Args:
+        labels (dict | None): nombre -> direccion, p. ej.
+                              ``LinkerLoader.text_labels``.
+        timing (bool): medir tambien el tiempo del host por instruccion.
+    """
+
+    def __init__(self, labels=None, timing=False):
+        self.timing = timing
+        self.pc_counts = defaultdict(int)
+        self.pc_time = defaultdict(int)
+        self.opcode_counts = defaultdict(int)
+        self.opcode_time = defaultdict(int)
+        self.stack_counts = defaultdict(int)
+        self.stack_time = defaultdict(int)
+        self.instructions = 0
+        self.set_labels(labels or {})
+
+    @classmethod
+    def from_linker(cls, linker, base=0, timing=False):
+        """Perfilador con las etiquetas de texto de un ``LinkerLoader``."""
+        labels = {name: addr + base for name, addr in linker.text_labels.items()}
+        return cls(labels, timing)
+
+    def set_labels(self, labels):
+        symbols = sorted((addr, _clean_label(name)) for name, addr in labels.items())
+        self._addrs = [addr for addr, _ in symbols]
+        self._names = [name for _, name in symbols]
+        self._symbol_of = {}
+        self._stack = []
+        self._stack_key = None
+        self._prev = self._prev_prev = None
+
+    # Resolucion de simbolos
+    def symbol(self, addr: int) -> str:
+        """Ultima etiqueta en o antes de ``addr``."""
+        name = self._symbol_of.get(addr)
+        if name is None:
+            i = bisect_right(self._addrs, addr) - 1
+            name = self._names[i] if i >= 0 else NO_SYMBOL
+            self._symbol_of[addr] = name
+        return name
+
+    def describe(self, addr: int) -> str:
+        """``etiqueta+desplazamiento`` de una direccion."""
+        i = bisect_right(self._addrs, addr) - 1
+        if i < 0:
+            return f"0x{addr:04X}"
+        offset = addr - self._addrs[i]
+        return self._names[i] if offset == 0 else f"{self._names[i]}+{offset}"
+
+    # Registro (llamado por la CPU en cada instruccion)
+    def record(self, pc: int, opcode: str, elapsed: int = 0):
+        self.instructions += 1
+        self.pc_counts[pc] += 1
+        self.opcode_counts[opcode] += 1
+
+        # Pila sombra: la instruccion anterior decide si se entro o se
+        # salio de una rutina
+        prev = self._prev
+        stack = self._stack
+        if not stack:
+            stack.append(self.symbol(pc))
+            self._stack_key = stack[0]
+        elif prev == "JMP" and self._prev_prev == "PUSH":
+            stack.append(self.symbol(pc))
+            self._stack_key = ";".join(stack)
+        elif prev == "JMPR" and len(stack) > 1:
+            stack.pop()
+            self._stack_key = ";".join(stack)
+        self._prev_prev = prev
+        self._prev = opcode
+        self.stack_counts[self._stack_key] += 1
+
+        if elapsed:
+            self.pc_time[pc] += elapsed
+            self.opcode_time[opcode] += elapsed
+            self.stack_time[self._stack_key] += elapsed
+
+    # Resultados
+    def label_counts(self):
+        """Ejecuciones (y tiempo) agrupadas por etiqueta: nombre -> (n, ns)."""
+        totals = defaultdict(lambda: [0, 0])
+        for pc, n in self.pc_counts.items():
+            entry = totals[self.symbol(pc)]
+            entry[0] += n
+            entry[1] += self.pc_time.get(pc, 0)
+        return {name: tuple(v) for name, v in totals.items()}
+
+    def report(self, top: int = 20) -> str:
+        """Tablas por opcode, etiqueta y PC ordenadas de mayor a menor."""
+        total = self.instructions or 1
+        lines = [f"Instrucciones ejecutadas: {self.instructions}"]
+
+        def table(title, rows):
+            lines.append("")
+            lines.append(title)
+            header = f"  {'':28s} {'veces':>10s} {'%':>6s}"
+            if self.timing:
+                header += f" {'ms':>10s}"
+            lines.append(header)
+            rows = sorted(rows, key=lambda row: (-row[1], -row[2], row[0]))
+            for name, n, ns in rows[:top]:
+                line = f"  {name:28s} {n:>10d} {100 * n / total:>6.2f}"
+                if self.timing:
+                    line += f" {ns / 1e6:>10.3f}"
+                lines.append(line)
+
+        table("Por opcode:", [(op, n, self.opcode_time.get(op, 0))
+                              for op, n in self.opcode_counts.items()])
+        table("Por etiqueta:", [(name, n, ns)
+                                for name, (n, ns) in self.label_counts().items()])
+        table("Por PC:", [(f"0x{pc:04X} {self.describe(pc)}", n, self.pc_time.get(pc, 0))
+                          for pc, n in self.pc_counts.items()])
+        return "\n".join(lines)
+
+    def collapsed(self, weight: str = "count") -> list[str]:
+        """Pilas colapsadas (``rutina;rutina;... valor``) para flamegraph.pl,
+        speedscope, etc. ``weight`` es ``"count"`` o ``"time"`` (ns)."""
+        if weight not in ("count", "time"):
+            raise ValueError(f"weight debe ser 'count' o 'time', no {weight!r}")
+        values = self.stack_counts if weight == "count" else self.stack_time
+        return [f"{stack} {value}" for stack, value in sorted(values.items()) if value]
+
+    def write_collapsed(self, path: str, weight: str = "count"):
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.collapsed(weight):
+                f.write(line + "\n")
@@ -1,11 +1,31 @@
+from array import array
+
 # Máscara de 64 bits: se usa para truncar cualquier valor al rango [0, 2^64-1]
 WORD_MASK_64 = (1 << 64) - 1
 
+# Backends de almacenamiento disponibles
+BACKEND_LIST  = "list"    # lista de enteros de Python (acceso individual rápido)
+BACKEND_ARRAY = "array"   # buffer contiguo array('B'/'H'/'I'/'Q')
+
+
+def _typecode_for(bits: int) -> str:
+    """Primer typecode sin signo de ``array`` con al menos ``bits`` bits.
+
+    Se omite 'L' a propósito: su tamaño depende de la plataforma (8 bytes en
+    Linux, 4 en Windows) y las palabras de 64 bits deben ser siempre 'Q'.
+    """
+    for code in "BHIQ":
+        if array(code).itemsize * 8 >= bits:
+            return code
+    raise ValueError(f"Tamaño de palabra no soportado: {bits} bits")
+
 
 class RAM:
     """Emula la memoria principal (RAM) de palabra configurable.
 
-    Internamente almacena enteros sin signo de 64 bits en una lista de Python.
+    Internamente almacena enteros sin signo en un buffer contiguo de ``array``
+    (8 bytes por palabra de 64 bits, exportable sin copia con ``memoryview()``)
+    o, con ``backend="list"``, en una lista de enteros de Python.
     La interfaz pública es el método ``request()``, que simula el Bus de Datos,
     el Bus de Direcciones y el Bus de Control en una sola llamada.
     """
@@ -13,7 +33,8 @@ class RAM:
     def __init__(
         self,
         word_size: str = "64",
-        positions: int = 2 ** 16
+        positions: int = 2 ** 16,
+        backend: str = BACKEND_ARRAY
     ):
         """Inicializa la RAM.
 
@@ -22,6 +43,8 @@ class RAM:
                              Determina la máscara de truncamiento al escribir.
             positions (int): cantidad de posiciones (celdas) disponibles.
                              Por defecto 2^16 = 65 536.
+            backend   (str): almacenamiento interno, ``"array"`` (por
+                             defecto, buffer tipado contiguo) o ``"list"``.
         """
         # Mapa de tamaño de palabra → máscara máxima sin signo
         word_s_info = {
@@ -33,11 +56,36 @@ class RAM:
 
         self._num_pos  = positions
         self._max_uint = word_s_info.get(word_size, WORD_MASK_64)
+        self.backend   = backend
 
-        # Arreglo interno: lista inicializada en ceros.
-        # Cada posición almacena un entero Python ,
+        # Arreglo interno inicializado en ceros.
+        # Cada posición almacena un entero sin signo,
         # se trunca a ``_max_uint`` en cada escritura.
-        self._memo = [0] * positions
+        if backend == BACKEND_LIST:
+            self._memo = [0] * positions
+        elif backend == BACKEND_ARRAY:
+            typecode = _typecode_for(self._max_uint.bit_length())
+            self._memo = array(typecode, bytes(array(typecode).itemsize * positions))
+        else:
+            raise ValueError(f"Backend de RAM desconocido: {backend}")
+
+        # Observadores de escritura: se llaman con la direccion escrita y la
+        # cantidad de palabras. La CPU los usa para invalidar su cache de
+        # instrucciones.
+        self._write_listeners = []
+
+    @property
+    def size(self) -> int:
+        """Cantidad de posiciones de la RAM."""
+        return self._num_pos
+
+    def add_write_listener(self, listener):
+        """Registra ``listener(direccion, cantidad)`` para cada escritura."""
+        self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        """Elimina un observador registrado con ``add_write_listener``."""
+        self._write_listeners.remove(listener)
 
     # Interfaz pública, simula los tres buses
     def request(self, data: int, direction: int, control: int):
@@ -64,3 +112,86 @@ class RAM:
         else:
             # ESCRITURA (MemWrite)
             self._memo[direction] = data & self._max_uint
+            for listener in self._write_listeners:
+                listener(direction, 1)
+
+    # Acceso por bloques (sin pasar palabra a palabra por el bus)
+    def _check_range(self, start: int, count: int):
+        if start < 0 or count < 0 or start + count > self._num_pos:
+            raise IndexError(
+                f"Bloque [{start}, {start + count}) fuera de la RAM "
+                f"(0..{self._num_pos - 1})"
+            )
+
+    def read_block(self, start: int, count: int) -> list[int]:
+        """Lee ``count`` palabras consecutivas desde ``start``.
+
+        Raises:
+            IndexError: si el bloque no cabe en la RAM.
+        """
+        self._check_range(start, count)
+        block = self._memo[start:start + count]
+        if self.backend == BACKEND_ARRAY:
+            return block.tolist()
+        return block
+
+    def load_block(self, start: int, words) -> int:
+        """Escribe ``words`` en posiciones consecutivas desde ``start``.
+
+        Cada palabra se trunca al tamaño de palabra, igual que en ``request``.
+
+        Returns:
+            int: la dirección siguiente al último dato escrito.
+
+        Raises:
+            IndexError: si el bloque no cabe en la RAM.
+        """
+        mask = self._max_uint
+        words = [word & mask for word in words]
+        count = len(words)
+        self._check_range(start, count)
+        if self.backend == BACKEND_ARRAY:
+            self._memo[start:start + count] = array(self._memo.typecode, words)
+        else:
+            self._memo[start:start + count] = words
+        if count:
+            for listener in self._write_listeners:
+                listener(start, count)
+        return start + count
+
+    def load_buffer(self, start: int, buffer) -> int:
+        """Escribe un buffer de palabras (``memoryview``, ``array``) desde
+        ``start``.
+
+        Con ``backend="array"`` y el mismo tamaño de item que la RAM se copia
+        con una sola asignación de slice sobre el buffer, sin convertir a
+        enteros de Python; si no, se usa ``load_block``. En ambos casos se
+        notifica a los observadores de escritura.
+
+        Returns:
+            int: la dirección siguiente al último dato escrito.
+
+        Raises:
+            IndexError: si el bloque no cabe en la RAM.
+        """
+        view = memoryview(buffer)
+        if self.backend != BACKEND_ARRAY or view.itemsize != self._memo.itemsize:
+            return self.load_block(start, view.tolist())
+        count = len(view)
+        self._check_range(start, count)
+        with memoryview(self._memo) as memo:
+            memo[start:start + count] = view.cast("B").cast(self._memo.typecode)
+        if count:
+            for listener in self._write_listeners:
+                listener(start, count)
+        return start + count
+
+    def memoryview(self) -> memoryview:
+        """Vista sin copia del buffer de la RAM (solo ``backend="array"``).
+
+        La vista es de escritura: modificar la RAM a través de ella no pasa
+        por el bus ni notifica a los observadores de escritura.
+        """
+        if self.backend != BACKEND_ARRAY:
+            raise TypeError("memoryview() requiere RAM(backend=\"array\")")
+        return memoryview(self._memo)
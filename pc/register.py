@@ -1,15 +1,130 @@
+from collections.abc import MutableMapping
+
+# Codigos de 4 bits de cada registro (mismo mapa que CPU.register_map)
+REGISTER_CODES = {
+  "PC": 0b0001, "SP": 0b0010, "BP": 0b0011, "IR": 0b0100,
+  "RA": 0b0101, "RB": 0b0110, "RC": 0b0111, "RD": 0b1000, "RE": 0b1001,
+  "R1": 0b1010, "R2": 0b1011, "R3": 0b1100, "R4": 0b1101, "R5": 0b1110,
+}
+
+GENERAL_NAMES = ("RA", "RB", "RC", "RD", "RE", "R1", "R2", "R3", "R4", "R5")
+
+
+class RegisterView(MutableMapping):
+  """Vista por nombre sobre el banco de registros.
+
+  Conserva la interfaz del antiguo dict ``general`` ({"RA": 0, ...}); cada
+  lectura o escritura va directo a la posicion del codigo en el banco.
+  """
+
+  def __init__(self, bank, names):
+    self._bank = bank
+    self._codes = {name: REGISTER_CODES[name] for name in names}
+
+  def __getitem__(self, name):
+    return self._bank[self._codes[name]]
+
+  def __setitem__(self, name, value):
+    self._bank[self._codes[name]] = value
+
+  def __delitem__(self, name):
+    raise TypeError("No se pueden eliminar registros")
+
+  def __iter__(self):
+    return iter(self._codes)
+
+  def __len__(self):
+    return len(self._codes)
+
+  def __contains__(self, name):
+    return name in self._codes
+
+  def __repr__(self):
+    return repr(dict(self.items()))
+
+
+class Flags(MutableMapping):
+  """FLAGS N/Z/D/U con evaluacion perezosa.
+
+  La ALU y la FPU no escriben las cuatro banderas tras cada operacion:
+  registran con ``defer`` la funcion que las calcula y sus argumentos.
+  El calculo se hace solo cuando alguien lee (o escribe) una bandera,
+  p. ej. un salto condicional, ``dump_registers`` o la GUI.
+  """
+
+  NAMES = ("N", "Z", "D", "U")
+
+  def __init__(self):
+    self._values = {"N": 0, "Z": 0, "D": 0, "U": 0}
+    self._pending = None
+
+  def defer(self, evaluate, *args):
+    """Registra la ultima operacion; ``evaluate(*args)`` -> (N, Z, D, U)."""
+    self._pending = (evaluate, args)
+
+  @property
+  def pending(self):
+    """``(evaluate, args)`` de la ultima operacion si aun no se calculo."""
+    return self._pending
+
+  def resolve(self):
+    """Calcula las banderas pendientes y retorna el dict de valores."""
+    if self._pending is not None:
+      evaluate, args = self._pending
+      self._pending = None
+      values = self._values
+      values["N"], values["Z"], values["D"], values["U"] = evaluate(*args)
+    return self._values
+
+  def __getitem__(self, name):
+    if self._pending is not None:
+      self.resolve()
+    return self._values[name]
+
+  def __setitem__(self, name, value):
+    if name not in self._values:
+      raise KeyError(name)
+    self.resolve()[name] = value
+
+  def __delitem__(self, name):
+    raise TypeError("No se pueden eliminar banderas")
+
+  def __iter__(self):
+    return iter(self.NAMES)
+
+  def __len__(self):
+    return len(self.NAMES)
+
+  def __repr__(self):
+    return repr(dict(self.resolve()))
+
+
+def _bank_register(code):
+  """Propiedad que expone ``bank[code]`` como atributo (PC, SP, BP, IR)."""
+  def getter(self):
+    return self.bank[code]
+
+  def setter(self, value):
+    self.bank[code] = value
+
+  return property(getter, setter)
+
+
 class Registers:
+  #Specials (viven en el banco, expuestos como atributos)
+  PC = _bank_register(REGISTER_CODES["PC"])
+  SP = _bank_register(REGISTER_CODES["SP"])
+  BP = _bank_register(REGISTER_CODES["BP"])
+  IR = _bank_register(REGISTER_CODES["IR"])
+
   def __init__(self):
-    #Specials
-    self.PC = 0
-    self.SP = 0
-    self.BP = 0
-    self.IR = 0
-    #Interfaz Memoria 
+    #Banco de registros indexado por el codigo de 4 bits.
+    #Las posiciones 0 y 15 no corresponden a ningun registro y valen 0.
+    self.bank = [0] * 16
+    #Interfaz Memoria
     self.MAR = 0
     self.MDR = 0
-    #Registros Generales
-    self.general = {"RA": 0, "RB": 0, "RC": 0,"RD": 0, "RE": 0,
-            "R1": 0, "R2": 0, "R3": 0,"R4": 0, "R5": 0}
-    #Flags
-    self.flags = {"N": 0,"Z": 0,"D": 0,"U": 0}
+    #Registros Generales (vista por nombre sobre el banco)
+    self.general = RegisterView(self.bank, GENERAL_NAMES)
+    #Flags (evaluacion perezosa, ver Flags)
+    self.flags = Flags()
@@ -0,0 +1,121 @@
+import sys
+from collections import deque
+from enum import IntEnum
+from typing import NamedTuple
+
+
+class TraceLevel(IntEnum):
+    OFF  = 0   # sin trazas
+    WARN = 1   # diagnosticos (instruccion no reconocida)
+    MEM  = 2   # ademas, cada LOADMEM / STOR
+
+
+class TraceEvent(NamedTuple):
+    """Un evento de traza: tipo, direccion de la instruccion y datos."""
+    level: TraceLevel
+    kind: str
+    pc: int
+    args: tuple
+
+    def format(self) -> str:
+        """Texto del evento (el mismo que imprimia antes la CPU)."""
+        return _FORMATS[self.kind].format(*self.args)
+
+
+_FORMATS = {
+    "load":  "LOD {0}: {1}",
+    "store": "STOR into {0}: {1} value {2}: {3}",
+    "warn":  "  [WARN] Instruccion no reconocida: 0x{0:016X}",
+}
+
+
+class Tracer:
+    """Recibe los eventos de la CPU y los entrega a un sumidero.
+
+    Un sumidero es cualquier invocable ``sink(evento)``: un
+    ``RingBufferSink``, un ``FileSink`` o una funcion propia (callback).
+    Los eventos con nivel mayor a ``level`` se descartan; con
+    ``TraceLevel.OFF`` la CPU ni siquiera llama al trazador.
+    """
+
+    def __init__(self, level: TraceLevel = TraceLevel.OFF, sink=None):
+        self.level = TraceLevel(level)
+        self.sink = sink if sink is not None else RingBufferSink()
+
+    def enabled(self, level: TraceLevel) -> bool:
+        return self.level >= level
+
+    def emit(self, level: TraceLevel, kind: str, pc: int, *args):
+        if self.level >= level:
+            self.sink(TraceEvent(level, kind, pc, args))
+
+    # Eventos de la CPU
+    def load(self, pc: int, reg_y: int, address: int):
+        self.emit(TraceLevel.MEM, "load", pc, reg_y, address)
+
+    def store(self, pc: int, reg_y: int, address: int, reg_x: int, value: int):
+        self.emit(TraceLevel.MEM, "store", pc, reg_y, address, reg_x, value)
+
+    def warn(self, pc: int, instr: int):
+        self.emit(TraceLevel.WARN, "warn", pc, instr)
+
+    def close(self):
+        """Cierra el sumidero si tiene ``close()`` (p. ej. ``FileSink``)."""
+        close = getattr(self.sink, "close", None)
+        if close is not None:
+            close()
+
+
+class RingBufferSink:
+    """Guarda los ultimos ``capacity`` eventos en memoria."""
+
+    def __init__(self, capacity: int = 1024):
+        self.events = deque(maxlen=capacity)
+
+    def __call__(self, event: TraceEvent):
+        self.events.append(event)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def clear(self):
+        self.events.clear()
+
+    def lines(self) -> list[str]:
+        return [event.format() for event in self.events]
+
+
+class FileSink:
+    """Escribe cada evento como una linea de texto.
+
+    Args:
+        target: ruta del archivo (se abre en modo ``"w"``) o un objeto con
+                ``write()`` ya abierto, p. ej. ``sys.stdout``. En el segundo
+                caso ``close()`` no lo cierra.
+    """
+
+    def __init__(self, target):
+        if isinstance(target, str):
+            self._file = open(target, "w", encoding="utf-8")
+            self._owned = True
+        else:
+            self._file = target
+            self._owned = False
+
+    def __call__(self, event: TraceEvent):
+        self._file.write(event.format() + "\n")
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def default_tracer() -> Tracer:
+    """Trazador de una CPU creada sin uno: solo los diagnosticos
+    (``TraceLevel.WARN``), escritos en ``sys.stderr``."""
+    return Tracer(TraceLevel.WARN, FileSink(sys.stderr))
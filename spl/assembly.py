@@ -1,8 +1,17 @@
 import sys
+import os
+import hashlib
+import marshal
+import tempfile
 from ply import lex
 from enum import Enum, auto
 from struct import pack #para conversion a binario
 
+if __package__:
+    from .plytab import lextab_name
+else:
+    from plytab import lextab_name
+
 REGISTERS = {
     'PC': 0x1, 'SP': 0x2, 'BP': 0x3, 'IR': 0x4, 
     'RA': 0x5, 'RB': 0x6, 'RC': 0x7, 'RD': 0x8, 'RE': 0x9,
@@ -88,7 +97,9 @@ class Builder:
         self._dataOutput: list[int] = []
         self._dataReplace: dict[str,list[int]] = {}
         
-        self._outputLabels: list[tuple[str, int] | int] = [0]
+        #etiquetas de texto (se emiten en orden inverso) y de datos
+        self._textLabels: list[tuple[str, int]] = []
+        self._dataLabels: list[tuple[str, int]] = []
         self._inst: str = None
         self._instBase: int = None
         self._expectedParams: ParamType = None
@@ -204,9 +215,9 @@ class Builder:
         self._labels[label] = pos
         oLen = len(self._textOutput if self._sectionIsText else self._dataOutput)
         if self._sectionIsText:
-            self._outputLabels.insert(0, (label, oLen))
+            self._textLabels.append((label, oLen))
         else:
-            self._outputLabels.append((label, oLen))
+            self._dataLabels.append((label, oLen))
     
     def clearInstruction(self) -> None:
         self._inst = None
@@ -263,66 +274,154 @@ class Builder:
     def len2mask(self, len: int):
         return (1 << len) - 1
     
-    def encodeLabels(self) -> bytes:
-        ret = "" if self._readable else b""
-        for val in self._outputLabels:
-            if val != 0:
-                lbl, pos = val
-                ret += self.encodeStr(lbl)
-                ret += self.encodeInt(pos)
-            else:
-                ret += self.encodeStr("")
-        ret += self.encodeStr("")
-        return ret
-    
-    def encodeSectionOutput(self, output: list[bytes]) -> bytes:
-        ret = "" if self._readable else b""
-        ret += self.encodeInt(len(output))
-        for inst in output:
-            ret += self.encodeInt(inst)
-        return ret
-    
-    def encodeText(self) -> bytes:
-        ret = "" if self._readable else b""
-        
+    #La salida se genera por partes (iter*) en una sola pasada; encode*
+    #las une con un solo join y write las escribe directo al archivo.
+    def iterLabels(self):
+        for lbl, pos in reversed(self._textLabels):
+            yield self.encodeStr(lbl)
+            yield self.encodeInt(pos)
+        yield self.encodeStr("")
+        for lbl, pos in self._dataLabels:
+            yield self.encodeStr(lbl)
+            yield self.encodeInt(pos)
+        yield self.encodeStr("")
+    
+    def iterSectionOutput(self, output: list[int]):
+        yield self.encodeInt(len(output))
+        yield from map(self.encodeInt, output)
+    
+    def iterText(self):
+        encodeInt = self.encodeInt
         #codificar identificadores a reemplazar en la seccion texto
         for id, posInfo in self._textReplace.items():
-            ret += self.encodeStr(id)
-            ret += self.encodeInt(len(posInfo))
+            yield self.encodeStr(id)
+            yield encodeInt(len(posInfo))
             for start, posLen in posInfo:
-                ret += self.encodeInt(start)
-                ret += self.encodeInt(posLen)
-        ret += self.encodeStr("")
+                yield encodeInt(start)
+                yield encodeInt(posLen)
+        yield self.encodeStr("")
         
         #codificar direcciones en la seccion texto
-        ret += self.encodeInt(len(self._textDirs))
+        yield encodeInt(len(self._textDirs))
         for dir, posInfo in self._textDirs.items():
-            ret += self.encodeInt(dir)
-            ret += self.encodeInt(len(posInfo))
+            yield encodeInt(dir)
+            yield encodeInt(len(posInfo))
             for start, posLen in posInfo:
-                ret += self.encodeInt(start)
-                ret += self.encodeInt(posLen)
+                yield encodeInt(start)
+                yield encodeInt(posLen)
         
         #codificar instrucciones
-        ret += self.encodeSectionOutput(self._textOutput)
-        return ret
-        
-    def encodeData(self) -> bytes:
-        ret = "" if self._readable else b""
+        yield from self.iterSectionOutput(self._textOutput)
+    
+    def iterData(self):
         for id, posInfo in self._dataReplace.items():
-            ret += self.encodeStr(id)
-            ret += self.encodeInt(len(posInfo))
+            yield self.encodeStr(id)
+            yield self.encodeInt(len(posInfo))
             for pos in posInfo:
-                ret += self.encodeInt(pos)
-        ret += self.encodeStr("")
-        ret += self.encodeSectionOutput(self._dataOutput)
-        return ret
+                yield self.encodeInt(pos)
+        yield self.encodeStr("")
+        yield from self.iterSectionOutput(self._dataOutput)
+    
+    def iterObject(self):
+        yield from self.iterLabels()
+        yield from self.iterText()
+        yield from self.iterData()
+    
+    def _join(self, parts) -> bytes | str:
+        return ("" if self._readable else b"").join(parts)
+    
+    def encodeLabels(self) -> bytes | str:
+        return self._join(self.iterLabels())
+    
+    def encodeSectionOutput(self, output: list[int]) -> bytes | str:
+        return self._join(self.iterSectionOutput(output))
+    
+    def encodeText(self) -> bytes | str:
+        return self._join(self.iterText())
+        
+    def encodeData(self) -> bytes | str:
+        return self._join(self.iterData())
+    
+    def encode(self) -> bytes | str:
+        """Archivo objeto completo (etiquetas, texto y datos)."""
+        return self._join(self.iterObject())
     
     def write(self, file: str):
         with open(file, self._writeMode) as out:
-            out.write(self.encodeLabels())
-            out.write(self.encodeText())
-            out.write(self.encodeData())
+            out.writelines(self.iterObject())
+    
+    #Estado ensamblado (independiente del formato de salida), usado por
+    #AssemblyCache
+    _stateFields = ("_textOutput", "_textReplace", "_textDirs", "_dataOutput",
+                    "_dataReplace", "_textLabels", "_dataLabels")
+    
+    def getState(self) -> dict:
+        return {name: getattr(self, name) for name in self._stateFields}
+    
+    @classmethod
+    def fromState(cls, state: dict, readable: bool | str = False) -> "Builder":
+        builder = cls(readable)
+        for name in cls._stateFields:
+            setattr(builder, name, state[name])
+        return builder
+
+#=======================#
+#   CACHE DE ENSAMBLADO  #
+#=======================#
+
+#Cambia con cualquier modificacion de este archivo (reglas, codificacion,
+#tabla de instrucciones), asi un cache viejo nunca se reutiliza
+with open(__file__, "rb") as _src:
+    ASSEMBLER_VERSION = hashlib.sha256(_src.read()).hexdigest()[:16]
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SPL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "spl", "asm"))
+
+class AssemblyCache:
+    """Cache en disco de ensamblados.
+    
+    La clave es el sha256 de la version del ensamblador y del texto que
+    recibe el lexer; el valor es el estado del Builder (ver getState), que
+    sirve para cualquier formato de salida. Solo se guardan ensamblados
+    sin errores.
+    
+    El estado se guarda con marshal (solo listas, dicts, tuplas, enteros y
+    cadenas): leer una entrada nunca ejecuta codigo, a diferencia de pickle.
+    """
+    
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+    
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{ASSEMBLER_VERSION}:{marshal.version}".encode())
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".marshal")
+    
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                state = marshal.load(f)
+        except Exception:
+            #sin entrada o entrada corrupta: se vuelve a ensamblar
+            return None
+        if not isinstance(state, dict) or any(name not in state for name in Builder._stateFields):
+            return None
+        return state
+    
+    def put(self, key: str, builder: Builder) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            #escritura atomica: otro proceso nunca ve un archivo a medias
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(builder.getState(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar en el cache de ensamblado: {e}")
             
 current_file = ""
 lastNewLinePos = 0
@@ -470,13 +569,30 @@ def t_INSTEND(t):
     t.value = ";"
     return t
 
+# El lexer se construye una sola vez por proceso. Con optimize=1 PLY guarda
+# las tablas en assembly_<hash>_lextab.py (junto a este archivo) y las
+# siguientes ejecuciones las leen en vez de validar y compilar las reglas.
+# El hash es el de las reglas (ver plytab.py): si cambian se usa otra tabla.
+_lexer = None
+
+def get_lexer():
+    """Retorna un lexer nuevo (copia del construido una sola vez)."""
+    global _lexer
+    if _lexer is None:
+        _lexer = lex.lex(optimize=1, lextab=lextab_name("assembly", globals()))
+    lexer = _lexer.clone()
+    lexer.lexstatestack = []
+    return lexer
+
 def main():
     if len(sys.argv) < 3:
-        print("Uso: python assembly.py <archivo_asm> <archivo_salida.o>")
+        print("Uso: python assembly.py <archivo_asm> <archivo_salida.o> [--readable formato] [--no-cache]")
         sys.exit(1)
     asm_file = sys.argv[1]
     out_file = sys.argv[2]
     
+    cache = None if "--no-cache" in sys.argv else AssemblyCache()
+    
     readable = None
     try:
         index = sys.argv.index("--readable")
@@ -495,7 +611,13 @@ def main():
         print(f"No se pudo encontrar el archivo {asm_file}")
         return
     
-    lexer = lex.lex()
+    key = cache.key(lines) if cache else None
+    state = cache.get(key) if cache else None
+    if state is not None:
+        Builder.fromState(state, readable).write(out_file)
+        return
+    
+    lexer = get_lexer()
     lexer.input(lines)
     builder = Builder(readable)
     last_pos = f"{asm_file}:{1}:{1}"
@@ -525,6 +647,8 @@ def main():
         last_pos = pos
     if builder._inst: builder.instructionEnd(last_pos)
     builder.write(out_file)
+    if cache and not builder._hasErrors:
+        cache.put(key, builder)
         
 #=======================#
 #       GUI API         #
@@ -532,12 +656,17 @@ def main():
 
 class Assembler:
 
-    def __init__(self, readable="hex"):
+    def __init__(self, readable="hex", cache: AssemblyCache | None = None):
+        """``cache``: AssemblyCache a usar; por defecto no se usa ninguno
+        (solo el driver de compilacion y la linea de comandos lo activan)."""
         self.readable = readable
+        self.cache = cache
 
     def assemble_text_as_binary(self, text: str) -> list[str]:
-        builder = self.assemble_text(text)
+        return self.binary_lines(self.assemble_text(text))
 
+    def binary_lines(self, builder: Builder) -> list[str]:
+        """Objeto de ``builder`` en binario legible, una palabra por linea."""
         # output = []
         # for word in builder._textOutput:
         #     output.append(f"0b{word:064b}")
@@ -545,11 +674,7 @@ class Assembler:
         # return output
         builder._readable = builder._readableModes["bin"]
 
-        output = ""
-
-        output += builder.encodeLabels()
-        output += builder.encodeText()
-        output += builder.encodeData()
+        output = builder.encode()
 
         # convertir a lista de líneas (lo que espera tu GUI)
         return [line for line in output.splitlines() if line.strip()]
@@ -560,29 +685,33 @@ class Assembler:
         # Forzar modo legible (IMPORTANTE)
         builder._readable = builder._readableModes["dec"]
 
-        output = ""
-
-        output += builder.encodeLabels()
-        output += builder.encodeText()
-        output += builder.encodeData()
+        output = builder.encode()
 
         # convertir a lista de líneas (lo que espera tu GUI)
         return [line for line in output.splitlines() if line.strip()]
 
-    def assemble_text(self, text: str) -> Builder:
+    def assemble_text(self, text: str, name: str = "<input>") -> Builder:
+        """Ensambla ``text``; ``name`` es el archivo que se muestra en los
+        mensajes de error."""
         global lastNewLinePos, current_file
 
-        current_file = "<input>"
+        if self.cache:
+            key = self.cache.key(text)
+            state = self.cache.get(key)
+            if state is not None:
+                return Builder.fromState(state, self.readable)
+
+        current_file = name
         lastNewLinePos = 0
 
-        lexer = lex.lex()
+        lexer = get_lexer()
         lexer.input(text)
 
         builder = Builder(self.readable)
-        last_pos = "<input>:1:1"
+        last_pos = f"{name}:1:1"
 
         while tok := lexer.token():
-            pos = f"<input>:{lexer.lineno}:{lexer.lexpos - lastNewLinePos}"
+            pos = f"{name}:{lexer.lineno}:{lexer.lexpos - lastNewLinePos}"
 
             if tok.type == "INST":
                 builder.checkExpected(last_pos)
@@ -615,6 +744,9 @@ class Assembler:
         if builder._hasErrors:
             raise Exception("Errores en ensamblado")
 
+        if self.cache:
+            self.cache.put(key, builder)
+
         return builder
 
 if __name__ == "__main__":
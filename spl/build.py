@@ -0,0 +1,162 @@
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+
+from pc.ram import RAM
+
+# Se usa como ``python -m spl.build`` o como script desde spl/ (python
+# build.py, con la raiz del repositorio en PYTHONPATH para ``pc``)
+if __package__:
+    from .assembly import Assembler, AssemblyCache
+    from .linker_loader import LinkerLoader
+else:
+    from assembly import Assembler, AssemblyCache
+    from linker_loader import LinkerLoader
+
+USAGE = ("Uso: python -m spl.build <archivo.asm> [otros]... [-j N] "
+         "[-o resultado] [--dir=<direccion>] [--no-cache]")
+
+
+def assemble_file(path: str, use_cache: bool = True):
+    """Ensambla un archivo y retorna su .o binario en memoria.
+
+    Se ejecuta en los procesos del pool: cada ``Builder`` es
+    independiente, solo se comparte la cache en disco.
+
+    Returns:
+        tuple: (ruta, objeto en bytes o None si hubo errores,
+                mensajes impresos por el ensamblador, segundos)
+    """
+    start = time.perf_counter()
+    messages = StringIO()
+    data = None
+    with redirect_stdout(messages):
+        try:
+            with open(path, "r") as f:
+                text = f.read()
+        except FileNotFoundError:
+            print(f"No se pudo encontrar el archivo {path}")
+        else:
+            assembler = Assembler(readable=False, cache=AssemblyCache() if use_cache else None)
+            try:
+                data = assembler.assemble_text(text, path).encode()
+            except Exception as e:
+                print(f"{path}: {e}")
+    return path, data, messages.getvalue(), time.perf_counter() - start
+
+
+def assemble_all(sources: list[str], jobs: int = 1, use_cache: bool = True):
+    """Ensambla ``sources`` con ``jobs`` procesos; los resultados quedan en
+    el mismo orden de ``sources`` (el orden de enlazado)."""
+    if jobs <= 1 or len(sources) <= 1:
+        return [assemble_file(path, use_cache) for path in sources]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(assemble_file, sources, [use_cache] * len(sources)))
+
+
+def link(objects, base: int = 0) -> LinkerLoader:
+    """Enlaza objetos en memoria: pares (nombre, bytes del .o)."""
+    linker = LinkerLoader()
+    for name, data in objects:
+        linker.load_object_data(name, data)
+    linker.resolve(base)
+    linker.resolve_data()
+    return linker
+
+
+def parse_address(text: str) -> int | None:
+    if text.isdigit():
+        return int(text)
+    if re.fullmatch(r"0b[01]+", text):
+        return int(text[2:], 2)
+    if re.fullmatch(r"0x[0-9a-fA-F]+", text):
+        return int(text[2:], 16)
+    return None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(USAGE)
+        sys.exit(1)
+
+    sources = []
+    jobs = 1
+    base = 0
+    out_file = None
+    use_cache = True
+    arg_itr = iter(sys.argv[1:])
+    for arg in arg_itr:
+        if arg == "-j" or arg.startswith("-j") and arg[2:].isdigit():
+            value = arg[2:] or next(arg_itr, "")
+            if not value.isdigit() or int(value) < 1:
+                print("Error: se esperaba un numero positivo despues de \"-j\"", file=sys.stderr)
+                sys.exit(1)
+            jobs = int(value)
+        elif arg == "-o":
+            out_file = next(arg_itr, None)
+            if out_file is None:
+                print("Error: no se especifico archivo despues de \"-o\"", file=sys.stderr)
+                sys.exit(1)
+        elif arg.startswith("--dir="):
+            base = parse_address(arg.split("=", 1)[1])
+            if base is None:
+                print("Error: direccion invalida despues de \"--dir\"", file=sys.stderr)
+                sys.exit(1)
+        elif arg == "--no-cache":
+            use_cache = False
+        else:
+            sources.append(arg.strip("\"'"))
+
+    timings = []
+    start = time.perf_counter()
+
+    # 1. Ensamblado (en paralelo con -j)
+    results = assemble_all(sources, jobs, use_cache)
+    timings.append((f"ensamblado ({len(sources)} archivos, -j {jobs})",
+                    time.perf_counter() - start))
+    failed = False
+    for path, data, messages, _ in results:
+        if messages:
+            print(messages, end="")
+        failed = failed or data is None
+    if failed:
+        print("Error: no se enlaza porque hubo errores de ensamblado", file=sys.stderr)
+        sys.exit(1)
+
+    # 2. Enlazado, directo desde memoria
+    stage = time.perf_counter()
+    try:
+        linker = link([(path, data) for path, data, _, _ in results], base)
+    except Exception as e:
+        print(f"Error durante linking: {e}")
+        sys.exit(1)
+    timings.append(("enlazado", time.perf_counter() - stage))
+
+    # 3. Salida: archivo de texto con -o, o carga en una RAM
+    stage = time.perf_counter()
+    try:
+        if out_file is not None:
+            linker.load_to_file(out_file)
+            timings.append((f"escritura de {out_file}", time.perf_counter() - stage))
+        else:
+            entry = linker.load_to_ram(RAM(), start=base)
+            timings.append(("carga en RAM", time.perf_counter() - stage))
+            print(f"Programa cargado desde dirección {entry}")
+    except Exception as e:
+        print(f"Error durante loading: {e}")
+        sys.exit(1)
+
+    print("Tiempos:")
+    for path, _, _, seconds in results:
+        print(f"  {os.path.basename(path):28s} {seconds * 1000:>10.3f} ms")
+    for name, seconds in timings:
+        print(f"  {name:28s} {seconds * 1000:>10.3f} ms")
+    print(f"  {'total':28s} {(time.perf_counter() - start) * 1000:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
 import ply.yacc as yacc
-from lexic_analizer import Lexer
+
+# Se usa como script desde spl/ (python compiler.py) o como spl.compiler
+if __package__:
+    from .lexic_analizer import Lexer
+    from .optimizer import fold_constants, peephole
+    from .regalloc import allocate_registers, parallel_moves
+    from .ir import Instr, Func, Program, simplify_cfg
+else:
+    from lexic_analizer import Lexer
+    from optimizer import fold_constants, peephole
+    from regalloc import allocate_registers, parallel_moves
+    from ir import Instr, Func, Program, simplify_cfg
 
 class SymbolTable:
     def __init__(self):
@@ -13,17 +24,20 @@ class SymbolTable:
         self.offset_stack.append(self.offset_stack[-1])
 
     def reset_function_offsets(self):
-        self.offset_stack[-1] = 0
+        # BP apunta al BP guardado por el prologo (PUSH BP; MOV BP, SP):
+        # las locales empiezan en BP - 1
+        self.offset_stack[-1] = -1
 
     def exit_scope(self):
         self.scopes.pop()
         self.offset_stack.pop()
 
-    def declare(self, name, var_type, size=1, is_global=False):
+    def declare(self, name, var_type, size=1, is_global=False, register=None):
         if name in self.scopes[-1]:
             raise Exception(f"Error: {name} already declared")
 
-        if is_global:
+        if is_global or register is not None:
+            # Las variables en registro no ocupan espacio en la pila
             offset = None
 
         else:
@@ -34,7 +48,8 @@ class SymbolTable:
             'type': var_type,
             'offset': offset,
             'size': size,
-            'global': is_global
+            'global': is_global,
+            'register': register
         }
 
         return offset
@@ -63,8 +78,22 @@ class SymbolTable:
             'size': total_size
         }
 
+# Relaciones: (COMP con los operandos invertidos, salto si es verdadera,
+# salto si es falsa). N es el signo de la resta del COMP.
+RELATIONAL = {
+    '<':  (False, "JMPN",  "JMPNN"),   # a - b < 0
+    '>':  (True,  "JMPN",  "JMPNN"),   # b - a < 0
+    '<=': (True,  "JMPNN", "JMPN"),    # b - a >= 0
+    '>=': (False, "JMPNN", "JMPN"),    # a - b >= 0
+    '==': (False, "JMPZ",  "JMPNZ"),
+    '!=': (False, "JMPNZ", "JMPZ"),
+}
+
 class CodeGenerator:
-    def __init__(self):
+    def __init__(self, optimize: bool = True):
+        """``optimize``: plegar constantes en el AST y pasar la mirilla
+        sobre el assembly generado (ver optimizer.py)."""
+        self.optimize = optimize
         self.st = SymbolTable()
 
         self.text = []
@@ -75,6 +104,14 @@ class CodeGenerator:
         self.current_function = None
         self.in_function = False
 
+        # Registros de variables de la funcion actual (ver regalloc.py) y
+        # todos los usados, que la mirilla no puede tomar como temporales
+        self.var_registers = {}
+        self.reserved_registers = set()
+
+        # Etiquetas a las que se llega desde otra seccion (funciones)
+        self.entries = set()
+
         self.emit("MOV", "BP", "SP")
 
     def new_label(self, prefix="L"):
@@ -85,12 +122,14 @@ class CodeGenerator:
         return self.functions if self.in_function else self.text
 
     def place_label(self, label):
-        self.current_section().append(f"{{{label}}}")
+        self.current_section().append(Instr.label(label))
 
     def load_variable(self, name, target="R5"):
         info = self.st.lookup(name)
 
-        if info['global']:
+        if info.get('register'):
+            self.emit("MOV", target, info['register'])
+        elif info['global']:
             self.emit("LDINT", "R1", f"global_{name}")
             self.emit("LOADMEM", target, "R1")
         else:
@@ -101,7 +140,9 @@ class CodeGenerator:
     def store_variable(self, name, source="R5"):
         info = self.st.lookup(name)
 
-        if info['global']:
+        if info.get('register'):
+            self.emit("MOV", info['register'], source)
+        elif info['global']:
             self.emit("LDINT", "R1", f"global_{name}")
             self.emit("STOR", source, "R1")
         else:
@@ -109,9 +150,33 @@ class CodeGenerator:
             self.emit("ADD", "R1", "BP", "R1")
             self.emit("STOR", source, "R1")
 
+    def emit_compare(self, node):
+        """COMP de los operandos de una relacion; retorna el salto que se
+        toma si la relacion es verdadera (ver RELATIONAL)."""
+        swap, jump_true, _ = RELATIONAL[node[0]]
+
+        self.visit(node[1])
+        self.emit("PUSH", "R5")
+
+        self.visit(node[2])
+        self.emit("POP", "R1")
+
+        if swap:
+            self.emit("COMP", "R5", "R1")
+        else:
+            self.emit("COMP", "R1", "R5")
+
+        return jump_true
+
     def emit_condition_jump_false(self, condition, label):
+        if self.optimize and isinstance(condition, tuple) and condition[0] in RELATIONAL:
+            # Salto directo segun las banderas del COMP, sin calcular 0/1
+            self.emit_compare(condition)
+            self.emit(RELATIONAL[condition[0]][2], label)
+            return
+
         self.visit(condition)
-        self.emit("LDINT", "RA", "0")
+        self.emit("LDINT", "RA", 0)
         self.emit("COMP", "R5", "RA")
         self.emit("JMPZ", label)
 
@@ -119,22 +184,33 @@ class CodeGenerator:
         if section is None:
             section = self.current_section()
 
-        if len(params) == 0:
-            section.append(instr)
-        else:
-            section.append(f"{instr} " + ", ".join(map(str, params)))
+        section.append(Instr(instr, *params))
+
+    def lower(self, ast) -> Program:
+        """Baja el AST a la IR (ver ir.py) y la optimiza."""
+        if self.optimize:
+            ast = fold_constants(ast)
 
-    def generate(self, ast):
         self.visit(ast)
 
-        return (
-            "data:\n"
-            + "\n".join(self.data)
-            + "\ntext:\n"
-            + "\n".join(self.text)
-            + "\nHLT\n"
-            + "\n".join(self.functions)
-        )
+        if self.optimize:
+            self.text = self.optimize_section(self.text)
+            self.functions = self.optimize_section(self.functions, self.reserved_registers)
+
+        return Program(self.data, self.text + [Instr("HLT")] + self.functions)
+
+    def optimize_section(self, instrs, reserved=()):
+        # El grafo quita etiquetas y saltos de sobra, lo que deja bloques
+        # mas largos para la mirilla (y la mirilla deja saltos a saltos)
+        while True:
+            before = instrs
+            instrs = simplify_cfg(instrs, self.entries)
+            instrs = peephole(instrs, reserved)
+            if instrs == before:
+                return instrs
+
+    def generate(self, ast) -> str:
+        return self.lower(ast).to_asm()
 
     def visit(self, node, in_func: bool = False):
         if node is None: return
@@ -147,7 +223,7 @@ class CodeGenerator:
                 return
 
             if isinstance(node, float):
-                self.emit("LOADFLOAT", "R5", node)
+                self.emit("LDFLT", "R5", node)
                 return
 
             if isinstance(node, str):
@@ -170,11 +246,13 @@ class CodeGenerator:
 
             if is_global:
                 self.st.declare(node[2], node[1], is_global=True)
-                self.data.append(f"{{global_{node[2]}}}")
-                self.data.append("0")
+                self.data.append(Instr.label(f"global_{node[2]}"))
+                self.data.append(0)
             else:
-                self.st.declare(node[2], node[1])
-                self.emit("DEC", "SP")
+                register = self.var_registers.get(id(node))
+                self.st.declare(node[2], node[1], register=register)
+                if register is None:
+                    self.emit("DEC", "SP")
 
         elif tag == 'DECL_ASSIGN':
             is_global = not self.in_function
@@ -187,12 +265,14 @@ class CodeGenerator:
                 else:
                     value = 0
 
-                self.data.append(f"{{global_{node[2]}}}")
-                self.data.append(str(value))
+                self.data.append(Instr.label(f"global_{node[2]}"))
+                self.data.append(value)
 
             else:
-                self.st.declare(node[2], node[1])
-                self.emit("DEC", "SP")
+                register = self.var_registers.get(id(node))
+                self.st.declare(node[2], node[1], register=register)
+                if register is None:
+                    self.emit("DEC", "SP")
                 self.visit(node[3])
                 self.store_variable(node[2])
         
@@ -276,6 +356,7 @@ class CodeGenerator:
             self.in_function = True
             self.current_function = node[2]
 
+            self.entries.add(node[2])
             self.place_label(node[2])
 
             self.st.enter_scope()
@@ -289,10 +370,20 @@ class CodeGenerator:
             reg_params = ["R1", "R2", "R3", "R4", "R5"]
 
             stack_params_off = 2
+
+            prev_registers = self.var_registers
+            self.var_registers = allocate_registers(node) if self.optimize else {}
+            self.reserved_registers.update(self.var_registers.values())
+            moves = {}
             
             for idx, (ptype, pname) in enumerate(params):
 
-                if idx < 5: #parametros en registro
+                if id(params[idx]) in self.var_registers: #parametro asignado a un registro
+                    register = self.var_registers[id(params[idx])]
+                    self.st.declare(pname, ptype, register=register)
+                    moves[register] = reg_params[idx]
+
+                elif idx < 5: #parametros en registro
                     offset = self.st.declare(pname, ptype)
                     self.emit("DEC", "SP")
                     self.emit("LDINT", "RB", offset)
@@ -311,6 +402,10 @@ class CodeGenerator:
 
                     stack_param_offset += 1
 
+            # Despues de guardar los de la pila: RA esta libre en la entrada
+            for dst, src in parallel_moves(moves, "RA"):
+                self.emit("MOV", dst, src)
+
             self.visit(node[4])
 
             self.emit("MOV", "SP", "BP")
@@ -319,13 +414,15 @@ class CodeGenerator:
 
             self.st.exit_scope()
 
+            self.var_registers = prev_registers
             self.current_function = None
             self.in_function = prev
 
         elif tag == 'METHOD_DEF':
             # Method: struct_name.method_name
             method_label = f"{node[2]}_{node[4]}"
-            self.text.append("{" + method_label + "}")
+            self.entries.add(method_label)
+            self.text.append(Instr.label(method_label))
             self.st.enter_scope()
             # Param 0 is the hidden 'this' pointer (hidden address)
             self.st.declare("this", node[2]) 
@@ -357,10 +454,10 @@ class CodeGenerator:
 
             ret_label = self.new_label("ret")
 
-            self.emit("LOADINT", "RC", ret_label)
+            self.emit("LDINT", "RC", ret_label)
             self.emit("PUSH", "RC")
 
-            self.emit("JMP", node[1])
+            self.emit("JMP", Func(node[1]))
             
             self.place_label(ret_label)
             self.emit("MOV", "R5", "RA")
@@ -380,7 +477,7 @@ class CodeGenerator:
             # 3. Call
             self.emit("PUSH", "PC", section=section)
             # Method label format: StructName_MethodName
-            self.emit("JMP", f"{self.st.lookup(instance[1])['type']}_{instance[2]}", section=section)
+            self.emit("JMP", Func(f"{self.st.lookup(instance[1])['type']}_{instance[2]}"), section=section)
 
         elif tag == 'AND':
             self.visit(node[1])
@@ -420,39 +517,13 @@ class CodeGenerator:
 
             self.emit(op, "R5", "R1", "R5")
 
-        elif tag in ('<', '>', '<=', '>=', '==', '!='):
-            op = tag
-
-            self.visit(node[1])
-            self.emit("PUSH", "R5")
-
-            self.visit(node[2])
-            self.emit("POP", "R1")
-
-            self.emit("COMP", "R1", "R5")
+        elif tag in RELATIONAL:
+            jump_true = self.emit_compare(node)
 
             l_true = self.new_label("rel_true")
             l_end = self.new_label("rel_end")
 
-            if op == '<':
-                self.emit("JMPN", l_true)
-
-            elif op == '>':
-                self.emit("JMPNN", l_true)
-                self.emit("JMPZ", l_end)
-
-            elif op == '==':
-                self.emit("JMPZ", l_true)
-
-            elif op == '!=':
-                self.emit("JMPNZ", l_true)
-
-            elif op == '<=':
-                self.emit("JMPN", l_true)
-                self.emit("JMPZ", l_true)
-
-            elif op == '>=':
-                self.emit("JMPNN", l_true)
+            self.emit(jump_true, l_true)
 
             self.emit("LDINT", "R5", 0)
             self.emit("JMP", l_end)
@@ -462,6 +533,9 @@ class CodeGenerator:
 
             self.place_label(l_end)
 
+        elif tag in ('INC_VAR', 'DEC_VAR') and self.st.lookup(node[1]).get('register'):
+            self.emit(tag[:3], self.st.lookup(node[1])['register'])
+
         elif tag == 'INC_VAR':
             self.load_variable(node[1])
             self.emit("INC", "R5")
@@ -493,10 +567,18 @@ class CodeGenerator:
             return ("ADDRESS_IN_R2", "VALUE_IN_R5")
 
 class Parser:
+    # Tablas LALR: se leen de compiler_parsetab.py (o se generan y guardan
+    # ahi si la gramatica cambio) una sola vez por proceso. Las acciones
+    # p_* no guardan estado en la instancia, asi que el parser se comparte.
+    _parser = None
+    _tabmodule = f"{__package__}.compiler_parsetab" if __package__ else "compiler_parsetab"
+
     def __init__(self):
         self.lexer_instance = Lexer()
         self.tokens = self.lexer_instance.tokens
-        self.parser = yacc.yacc(module=self)
+        if Parser._parser is None:
+            Parser._parser = yacc.yacc(module=self, tabmodule=Parser._tabmodule, debug=False)
+        self.parser = Parser._parser
 
     # Program & Blocks
     def p_programa(self, p):
@@ -719,12 +801,12 @@ class Parser:
         print(f"Parser Error: Unexpected {p.type if p else 'EOF'}")
 
     def parse(self, code):
-        return self.parser.parse(code)
+        return self.parser.parse(code, lexer=self.lexer_instance.lexer)
 
 def main():
     import sys
     if len(sys.argv) < 2:
-        print("Uso: python test_lexer.py <archivo>")
+        print("Uso: python compiler.py <archivo> [-O0]")
         return
     path = sys.argv[1]
     try:
@@ -736,7 +818,7 @@ def main():
 
     p = Parser()
     ast = p.parse(code)
-    gen = CodeGenerator()
+    gen = CodeGenerator(optimize="-O0" not in sys.argv)
     assembly = gen.generate(ast)
     print(assembly)
 
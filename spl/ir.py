@@ -0,0 +1,299 @@
+"""Representacion intermedia del compilador de SPL.
+
+El ``CodeGenerator`` baja el AST a una lista de ``Instr`` por seccion:
+instrucciones de tres direcciones de la maquina con operandos tipados
+(``Reg``, ``Label``, ``Func``, ``int`` o ``float``) y etiquetas como
+pseudo instrucciones ``LABEL``. Sobre esa lista se arma el grafo de
+bloques basicos (``build_cfg``), se optimiza (``simplify_cfg`` y la
+mirilla de optimizer.py) y el ``Program`` resultante se escribe como
+``.asm`` o se pasa directo a un ``Builder`` sin volver a lexear el texto.
+"""
+if __package__:
+    from .assembly import Builder, REGISTERS
+else:
+    from assembly import Builder, REGISTERS
+
+
+class Reg(str):
+    """Registro de la maquina (``RA``, ``R1``, ``SP``, ...)."""
+    __slots__ = ()
+
+
+class Label(str):
+    """Referencia a una etiqueta: destino de un salto o direccion cargada
+    con ``LDINT``."""
+    __slots__ = ()
+
+
+class Func(Label):
+    """Etiqueta de una funcion: ``JMP`` a una ``Func`` es una llamada."""
+    __slots__ = ()
+
+
+def operand(value):
+    """Tipa un parametro de ``emit``: los nombres de registro son ``Reg`` y
+    el resto de los textos ``Label``."""
+    if isinstance(value, str) and not isinstance(value, Label):
+        return Reg(value.upper()) if value.upper() in REGISTERS else Label(value)
+    return value
+
+
+class Instr:
+    """Una instruccion (o etiqueta, con ``op == "LABEL"``) de la IR."""
+    __slots__ = ("op", "args")
+
+    def __init__(self, op: str, *args):
+        self.op = op
+        self.args = tuple(operand(arg) for arg in args)
+
+    @classmethod
+    def label(cls, name: str) -> "Instr":
+        return cls("LABEL", Label(name))
+
+    @property
+    def is_label(self) -> bool:
+        return self.op == "LABEL"
+
+    def __eq__(self, other):
+        return (isinstance(other, Instr) and self.op == other.op
+                and self.args == other.args)
+
+    def __hash__(self):
+        return hash((self.op, self.args))
+
+    def __repr__(self):
+        return f"Instr({self.op!r}, {', '.join(map(repr, self.args))})"
+
+    def __str__(self):
+        if self.is_label:
+            return f"{{{self.args[0]}}}"
+        if not self.args:
+            return self.op
+        return f"{self.op} " + ", ".join(map(str, self.args))
+
+
+#=======================#
+#   Grafo de bloques    #
+#=======================#
+
+JUMPS = {"JMP", "JMPZ", "JMPNZ", "JMPN", "JMPNN", "JMPOVR", "JMPUND",
+         "JMPNORZ", "JMPNANDZ"}
+# Saltos condicionales: siguen en la instruccion siguiente si no saltan
+COND_JUMPS = JUMPS - {"JMP"}
+
+# Saltos condicionales con la condicion contraria
+_INVERSE = {"JMPZ": "JMPNZ", "JMPNZ": "JMPZ", "JMPN": "JMPNN", "JMPNN": "JMPN"}
+
+
+def is_terminator(ins: Instr) -> bool:
+    """La instruccion no sigue en la siguiente (salto, retorno o fin)."""
+    return (ins.op in ("JMP", "JMPR", "HLT")
+            or (ins.op == "POP" and ins.args == ("PC",))
+            or (ins.op == "MOV" and ins.args[:1] == ("PC",)))
+
+
+def jump_target(ins: Instr) -> Label | None:
+    """Etiqueta local a la que salta ``ins`` (las llamadas no cuentan)."""
+    if ins.op in JUMPS and isinstance(ins.args[0], Label) and not isinstance(ins.args[0], Func):
+        return ins.args[0]
+    return None
+
+
+class BasicBlock:
+    """Etiquetas iniciales, instrucciones y sucesores de un bloque."""
+    __slots__ = ("index", "labels", "instrs", "succs", "preds")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.labels = []
+        self.instrs = []
+        self.succs = []
+        self.preds = []
+
+    def __iter__(self):
+        yield from (Instr.label(label) for label in self.labels)
+        yield from self.instrs
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.labels}, {len(self.instrs)} instr)"
+
+
+def build_cfg(instrs: list[Instr]) -> list[BasicBlock]:
+    """Parte una seccion en bloques basicos y enlaza sucesores/predecesores.
+
+    Un bloque empieza en una etiqueta o despues de un salto, y termina en
+    un salto o antes de una etiqueta. ``JMP`` a una ``Func`` (llamada),
+    ``JMPR``, ``POP PC`` y ``HLT`` no tienen sucesores en la seccion.
+    """
+    blocks = [BasicBlock(0)]
+    for ins in instrs:
+        block = blocks[-1]
+        if ins.is_label:
+            if block.instrs:
+                block = BasicBlock(len(blocks))
+                blocks.append(block)
+            block.labels.append(ins.args[0])
+            continue
+        block.instrs.append(ins)
+        if ins.op in JUMPS or is_terminator(ins):
+            blocks.append(BasicBlock(len(blocks)))
+    if not blocks[-1].labels and not blocks[-1].instrs and len(blocks) > 1:
+        blocks.pop()
+
+    owner = {label: block for block in blocks for label in block.labels}
+    for block, following in zip(blocks, blocks[1:] + [None]):
+        last = block.instrs[-1] if block.instrs else None
+        target = jump_target(last) if last else None
+        if target in owner:
+            block.succs.append(owner[target])
+        if following is not None and (last is None or not is_terminator(last)):
+            block.succs.append(following)
+        for succ in block.succs:
+            succ.preds.append(block)
+    return blocks
+
+
+def _referenced(instrs) -> set[str]:
+    """Etiquetas que se usan como dato (p. ej. ``LDINT RC, ret``)."""
+    return {arg for ins in instrs if not ins.is_label and ins.op not in JUMPS
+            for arg in ins.args if isinstance(arg, Label)}
+
+
+def simplify_cfg(instrs: list[Instr], keep=()) -> list[Instr]:
+    """Simplificaciones sobre el grafo de bloques de una seccion.
+
+    * Saltos a un ``JMP`` van directo a su destino.
+    * ``Jcc A; JMP B; {A}`` -> ``Jcc' B; {A}`` (condicion contraria).
+    * Se quitan los bloques inalcanzables, los ``JMP`` a la etiqueta que
+      sigue y las etiquetas que ya nadie usa.
+
+    ``keep``: etiquetas a las que se llega desde fuera de la seccion (las
+    funciones); se conservan junto con las usadas como dato.
+    """
+    roots = set(keep) | _referenced(instrs)
+    blocks = build_cfg(instrs)
+    owner = {label: block for block in blocks for label in block.labels}
+
+    def final_target(label):
+        seen = set()
+        while label in owner and label not in seen:
+            seen.add(label)
+            block = owner[label]
+            if len(block.instrs) != 1 or block.instrs[0].op != "JMP":
+                break
+            target = jump_target(block.instrs[0])
+            if target is None:
+                break
+            label = target
+        return label
+
+    for block in blocks:
+        if block.instrs and jump_target(block.instrs[-1]) is not None:
+            last = block.instrs[-1]
+            target = final_target(last.args[0])
+            if target != last.args[0]:
+                block.instrs[-1] = Instr(last.op, target)
+
+    # Bloques alcanzables desde el inicio y las raices
+    reach = set()
+    pending = [blocks[0]] + [owner[label] for label in roots if label in owner]
+    while pending:
+        block = pending.pop()
+        if block.index in reach:
+            continue
+        reach.add(block.index)
+        last = block.instrs[-1] if block.instrs else None
+        target = jump_target(last) if last else None
+        if target in owner:
+            pending.append(owner[target])
+        if (last is None or not is_terminator(last)) and block.index + 1 < len(blocks):
+            pending.append(blocks[block.index + 1])
+
+    out = []
+    for block in blocks:
+        if block.index in reach:
+            out.extend(block)
+
+    changed = True
+    while changed:
+        changed = False
+        for i, ins in enumerate(out):
+            target = jump_target(ins)
+            if target is None:
+                continue
+            # JMP a la etiqueta que sigue
+            j = i + 1
+            while j < len(out) and out[j].is_label and out[j].args[0] != target:
+                j += 1
+            if ins.op == "JMP" and j < len(out) and out[j].is_label:
+                del out[i]
+                changed = True
+                break
+            # Jcc A; JMP B; {A} -> Jcc' B; {A}
+            if (ins.op in _INVERSE and i + 2 < len(out) and out[i + 1].op == "JMP"
+                    and jump_target(out[i + 1]) is not None
+                    and out[i + 2].is_label and out[i + 2].args[0] == target):
+                out[i:i + 2] = [Instr(_INVERSE[ins.op], out[i + 1].args[0])]
+                changed = True
+                break
+
+    used = roots | {jump_target(ins) for ins in out}
+    return [ins for ins in out if not ins.is_label or ins.args[0] in used]
+
+
+#=======================#
+#       Programa        #
+#=======================#
+
+class Program:
+    """Resultado del compilador: datos (etiquetas ``LABEL`` y valores) y
+    texto (main, ``HLT`` y las funciones)."""
+
+    def __init__(self, data: list, text: list[Instr]):
+        self.data = data
+        self.text = text
+
+    def to_asm(self) -> str:
+        return ("data:\n" + "\n".join(map(str, self.data))
+                + "\ntext:\n" + "\n".join(map(str, self.text)))
+
+    def build(self, builder: Builder | None = None, name: str = "<spl>") -> Builder:
+        """Ensambla la IR en ``builder`` (uno binario nuevo por defecto)
+        con los mismos eventos que genera el lexer del ensamblador; las
+        posiciones de los errores son las lineas de ``to_asm()``."""
+        if builder is None:
+            builder = Builder()
+        line = 1
+        for section, items in (("DATA", self.data), ("TEXT", self.text)):
+            pos = f"{name}:{line}:1"
+            builder.section(section, pos)
+            builder.literal(":", pos)
+            builder.instructionEnd(pos)
+            line += 1
+            for item in items:
+                pos = f"{name}:{line}:1"
+                if isinstance(item, Instr) and item.is_label:
+                    builder.labelDef(str(item.args[0]), pos)
+                elif isinstance(item, Instr):
+                    builder.instruction(item.op, pos)
+                    for k, arg in enumerate(item.args):
+                        if k:
+                            builder.literal(",", pos)
+                        _parameter(builder, arg, pos)
+                else:
+                    _parameter(builder, item, pos)
+                builder.instructionEnd(pos)
+                builder.checkExpected(pos)
+                line += 1
+        return builder
+
+
+def _parameter(builder: Builder, arg, pos: str):
+    if isinstance(arg, Reg):
+        builder.parameter("REG", REGISTERS[arg], pos)
+    elif isinstance(arg, str):
+        builder.parameter("ID", str(arg), pos)
+    elif isinstance(arg, float):
+        builder.parameter("FLOAT", arg, pos)
+    else:
+        builder.parameter("INT", arg, pos)
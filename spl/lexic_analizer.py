@@ -1,5 +1,52 @@
+import re
+from bisect import bisect_right
+
 import ply.lex as lex
 
+if __package__:
+    from .plytab import lextab_name
+else:
+    from plytab import lextab_name
+
+
+class Token:
+    """Token de ``Lexer.analyze``. Tambien se puede leer como el dict que
+    se usaba antes (``tok["line"]``)."""
+    __slots__ = ("type", "value", "line", "column", "category")
+
+    def __init__(self, type, value, line, column, category):
+        self.type = type
+        self.value = value
+        self.line = line
+        self.column = column
+        self.category = category
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __repr__(self):
+        return (f"Token({self.type!r}, {self.value!r}, line={self.line}, "
+                f"column={self.column}, category={self.category!r})")
+
+
+# Categoria de cada tipo de token (ver Lexer.classify_token)
+CATEGORIES = {
+    **dict.fromkeys(["PLUS", "MINUS", "TIMES", "DIV", "MOD", "INC", "DEC"], "ARITHMETIC_OP"),
+    **dict.fromkeys(["EQ", "NE", "GT", "LT", "GE", "LE"], "RELATIONAL_OP"),
+    **dict.fromkeys(["AND", "OR", "NOT"], "LOGICAL_OP"),
+    **dict.fromkeys(["IF", "ELSE", "WHILE", "FOR", "RETURN"], "CONTROL"),
+    **dict.fromkeys(["INT", "FLOAT", "BOOL"], "TYPE"),
+    "STRUCT": "STRUCTURE",
+    **dict.fromkeys(["TRUE", "FALSE"], "BOOLEAN"),
+    **dict.fromkeys(["INTEGER", "FLOAT_NUMBER"], "NUMERIC_LITERAL"),
+    "STRING": "STRING_LITERAL",
+    "IDENTIFIER": "IDENTIFIER",
+    **dict.fromkeys(["LPAREN", "RPAREN", "LBRACE", "RBRACE", "LBRACKET", "RBRACKET"], "PARENTHESIS"),
+    **dict.fromkeys(["COMMA", "COLON", "SEMICOLON", "DOT"], "PUNCTUATION"),
+    **dict.fromkeys(["ASSIGN", "PLUSEQ", "MINUSEQ", "TIMESEQ", "DIVEQ"], "ASSIGNMENT_OP"),
+}
+
+
 class Lexer:
     # =========================================================
     # TOKENS
@@ -92,77 +139,39 @@ class Lexer:
     # Ignorar espacios y tabs
     t_ignore = " \t"
 
+    # Lexer construido una sola vez por proceso (tablas en
+    # lexic_analizer_<hash>_lextab.py, ver plytab.py); cada instancia usa una
+    # copia ligada a ella.
+    _master = None
+    _package = f"{__package__}." if __package__ else ""
+
     def __init__(self):
         self.symbol_table = {}
         self.errors = []
-        self.lexer = lex.lex(module=self)
+        self._line_data = None
+        self._line_starts = [0]
+        if Lexer._master is None:
+            lextab = Lexer._package + lextab_name("lexic_analizer", vars(Lexer))
+            Lexer._master = lex.lex(module=self, optimize=1, lextab=lextab)
+        self.lexer = Lexer._master.clone(self)
+        # clone() vuelve a ligar las reglas pero deja lexre apuntando a las
+        # del original: begin() lo actualiza
+        self.lexer.begin("INITIAL")
 
     # =========================================================
     # CLASIFICACIÓN
     # =========================================================
     def classify_token(self, tok):
-        if tok.type in [
-            "PLUS", "MINUS", "TIMES", "DIV",
-            "MOD", "INC", "DEC"
-        ]:
-            return "ARITHMETIC_OP"
-        elif tok.type in [
-            "EQ", "NE", "GT", "LT", "GE", "LE"
-        ]:
-            return "RELATIONAL_OP"
-        elif tok.type in [
-            "AND", "OR", "NOT"
-        ]:
-            return "LOGICAL_OP"
-        elif tok.type in [
-            "IF", "ELSE", "WHILE",
-            "FOR", "RETURN"
-        ]:
-            return "CONTROL"
-        elif tok.type in [
-            "INT", "FLOAT", "BOOL"
-        ]:
-            return "TYPE"
-        elif tok.type == "STRUCT":
-            return "STRUCTURE"
-        elif tok.type in [
-            "TRUE", "FALSE"
-        ]:
-            return "BOOLEAN"
-        elif tok.type in [
-            "INTEGER", "FLOAT_NUMBER"
-        ]:
-            return "NUMERIC_LITERAL"
-        elif tok.type == "STRING":
-            return "STRING_LITERAL"
-        elif tok.type == "IDENTIFIER":
-            return "IDENTIFIER"
-        elif tok.type in [
-            "LPAREN", "RPAREN",
-            "LBRACE", "RBRACE",
-            "LBRACKET", "RBRACKET"
-        ]:
-            return "PARENTHESIS"
-        elif tok.type in [
-            "COMMA", "COLON",
-            "SEMICOLON", "DOT"
-        ]:
-            return "PUNCTUATION"
-        elif tok.type in [
-            "ASSIGN",
-            "PLUSEQ",
-            "MINUSEQ",
-            "TIMESEQ",
-            "DIVEQ"
-        ]:
-            return "ASSIGNMENT_OP"
-        else:
-            return "SYMBOL"
+        return CATEGORIES.get(tok.type, "SYMBOL")
 
     def find_column(self, token):
-        line_start = self.lexer.lexdata.rfind(
-            '\n', 0, token.lexpos
-        ) + 1
+        # Inicio de cada linea, calculado una vez por entrada: la columna
+        # sale de una busqueda binaria en vez de recorrer hacia atras
+        data = self.lexer.lexdata
+        if self._line_data is not data:
+            self._line_data = data
+            self._line_starts = [0] + [m.end() for m in re.finditer("\n", data)]
+        line_start = self._line_starts[bisect_right(self._line_starts, token.lexpos) - 1]
         return (token.lexpos - line_start) + 1
     # -------------------------
     # Tokens (t_ functions)
@@ -287,13 +296,13 @@ class Lexer:
 
         for tok in self.lexer:
 
-            tokens_list.append({
-                "type": tok.type,
-                "value": tok.value,
-                "line": tok.lineno,
-                "column": self.find_column(tok),
-                "category": self.classify_token(tok)
-            })
+            tokens_list.append(Token(
+                tok.type,
+                tok.value,
+                tok.lineno,
+                self.find_column(tok),
+                self.classify_token(tok)
+            ))
 
         return tokens_list,self.symbol_table
 
@@ -315,7 +324,7 @@ def main():
     tokens, table = lexer.analyze(code)
     print("\nTOKENS:\n")
     for t in tokens:
-        print(f"{t['line']:>2} | {t['type']:<12} | {t['value']}")
+        print(f"{t.line:>2} | {t.type:<12} | {t.value}")
 
     print("\nSYMBOL TABLE:\n")
     print(table)
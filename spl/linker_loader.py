@@ -3,6 +3,14 @@ from pc.ram import RAM
 import sys
 import os
 import re
+import mmap
+import struct
+import traceback
+
+if __package__:
+    from .plytab import lextab_name
+else:
+    from plytab import lextab_name
 
 tokens = ("STRING", "BINARY", "NUMBER")
 
@@ -27,9 +35,42 @@ def t_error(t):
     print(f"Token ilegal: {t.value[0]}")
     t.lexer.skip(1)
 
+# Lexer de los .o, construido una sola vez por proceso (tablas en
+# linker_loader_<hash>_lextab.py, ver assembly.get_lexer).
+_lexer = None
+
+def get_lexer():
+    """Retorna un lexer nuevo (copia del construido una sola vez)."""
+    global _lexer
+    if _lexer is None:
+        _lexer = lex.lex(optimize=1, lextab=lextab_name("linker_loader", globals()))
+    return _lexer.clone()
+
+# Formato binario de los .o (Builder sin --readable): enteros de 64 bits
+# big-endian sin signo y cadenas terminadas en NUL, en siete partes:
+#   1. etiquetas de texto   (cadena, entero)* ""
+#   2. etiquetas de datos   (cadena, entero)* ""
+#   3. reemplazos en texto  (cadena, n, (inicio, largo)*n)* ""
+#   4. direcciones en texto n, (dir, m, (inicio, largo)*m)*n
+#   5. seccion de texto     n, palabra*n
+#   6. reemplazos en datos  (cadena, n, posicion*n)* ""
+#   7. seccion de datos     n, palabra*n
+# El formato legible empieza siempre con una cadena entre comillas.
+_WORD = struct.Struct(">Q")
+
+# HLT que se agrega al final del texto al cargar
+HLT_WORD = 0xFFFFFFFFFFFFFFFF
+
 class LinkerLoader:
-    def __init__(self):
+    def __init__(self, verbose: bool = True):
+        """``verbose``: imprimir los desplazamientos de cada objeto."""
+        self.verbose = verbose
         self.labels = {}
+        # Subconjunto de ``labels`` definido en la seccion de texto
+        self.text_labels = {}
+        # Etiquetas de datos relativas al inicio de la seccion de datos;
+        # ``resolve`` las pasa a ``labels`` con su direccion en la RAM
+        self.data_labels = {}
         self.dir_offset = 0
         self.text_dir_offset = self.dir_offset
         self.data_dir_offset = self.dir_offset
@@ -49,26 +90,187 @@ class LinkerLoader:
         return i
 
     def load_object(self, files: list[str]):
-        lexer = lex.lex()
+        lexer = get_lexer()
         for file in files:
             self.current_file = file
             try:
-                with open(file) as f:
-                    content = f.read()
+                f = open(file, "rb")
             except FileNotFoundError:
                 print(f"No se encontro el archivo {file}")
+                continue
 
-            lexer.input(content)
-
-            tokens = []
-            while tok := lexer.token():
-                tokens.append(tok)
-
-            self._parse(tokens)
-            self.text_dir_offset = len(self.text) + self.dir_offset
-            self.data_dir_offset = len(self.data) + self.dir_offset
+            with f:
+                if f.read(1) not in (b'"', b""):
+                    # .o binario: se lee directo del mmap, sin tokens
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        self._parse_binary(buf)
+                else:
+                    f.seek(0)
+                    self._parse_readable(lexer, f.read().decode())
+            self._end_object()
+
+    def load_object_data(self, name: str, data: bytes | str):
+        """Enlaza un .o que ya esta en memoria (p. ej. ``Builder.encode()``),
+        en cualquiera de los dos formatos, sin pasar por un archivo.
+        ``name`` solo se usa en los mensajes de error."""
+        self.current_file = name
+        if isinstance(data, str):
+            self._parse_readable(get_lexer(), data)
+        elif data[:1] not in (b'"', b""):
+            self._parse_binary(data)
+        else:
+            self._parse_readable(get_lexer(), data.decode())
+        self._end_object()
+
+    def _parse_readable(self, lexer, content: str):
+        lexer.input(content)
+
+        tokens = []
+        while tok := lexer.token():
+            tokens.append(tok)
+
+        self._parse(tokens)
+
+    def _end_object(self):
+        # El siguiente objeto empieza donde termino este
+        self.text_dir_offset = len(self.text) + self.dir_offset
+        self.data_dir_offset = len(self.data) + self.dir_offset
+        if self.verbose:
             print(f"{self.text_dir_offset=}, {self.data_dir_offset=}")
+
+    def load_builder(self, name: str, builder):
+        """Enlaza el resultado de un ``Builder`` directamente, sin
+        codificarlo ni volver a leerlo. ``name`` solo se usa en los
+        mensajes de error."""
+        self.current_file = name
+        state = builder.getState()
+
+        def suffix(items):
+            # Mismas etiquetas (con el sufijo "\\0") y orden que el .o binario
+            return [(label + "\\0", value) for label, value in items]
+
+        self._add_object(
+            suffix(reversed(state["_textLabels"])),
+            suffix(state["_dataLabels"]),
+            suffix(state["_textReplace"].items()),
+            state["_textDirs"].items(),
+            state["_textOutput"],
+            suffix(state["_dataReplace"].items()),
+            state["_dataOutput"],
+        )
+        self._end_object()
     
+    def _parse_binary(self, buf):
+        """Lee un .o binario (ver formato arriba) con los mismos
+        desplazamientos que ``_parse``."""
+        # La vista se libera al salir del with (tambien si hay error), para
+        # que el mmap se pueda cerrar
+        with memoryview(buf) as view:
+            self._parse_binary_view(buf, view)
+
+    def _parse_binary_view(self, buf, view):
+        pos = 0
+
+        def word():
+            nonlocal pos
+            if pos + 8 > len(view):
+                raise Exception(f"Formato inválido: fin de archivo en {self.current_file}")
+            value, = _WORD.unpack_from(view, pos)
+            pos += 8
+            return value
+
+        def words(n):
+            nonlocal pos
+            if pos + 8 * n > len(view):
+                raise Exception(f"Formato inválido: fin de archivo en {self.current_file}")
+            values = struct.unpack_from(f">{n}Q", view, pos)
+            pos += 8 * n
+            return values
+
+        def string():
+            # Las etiquetas se guardan con el mismo sufijo "\\0" que deja
+            # el lexer del formato legible, para poder mezclar ambos
+            nonlocal pos
+            end = buf.find(b"\0", pos)
+            if end < 0:
+                raise Exception(f"Formato inválido: cadena sin terminar en {self.current_file}")
+            value = bytes(view[pos:end]).decode("utf-8")
+            pos = end + 1
+            return value + "\\0" if value else ""
+
+        def pairs(fields):
+            return list(zip(fields[::2], fields[1::2]))
+
+        # TEXT LABELS
+        text_labels = []
+        while label := string():
+            text_labels.append((label, word()))
+
+        # DATA LABELS
+        data_labels = []
+        while label := string():
+            data_labels.append((label, word()))
+
+        # TEXT REPLACE
+        text_replace = []
+        while label := string():
+            text_replace.append((label, pairs(words(2 * word()))))
+
+        # TEXT DIRECTIONS
+        text_dirs = []
+        for _ in range(word()):
+            dir_val = word()
+            text_dirs.append((dir_val, pairs(words(2 * word()))))
+
+        # TEXT SECTION
+        text = words(word())
+
+        # DATA REPLACE
+        data_replace = []
+        while label := string():
+            data_replace.append((label, words(word())))
+
+        # DATA SECTION
+        data = words(word())
+
+        self._add_object(text_labels, data_labels, text_replace, text_dirs,
+                         text, data_replace, data)
+
+    def _add_object(self, text_labels, data_labels, text_replace, text_dirs,
+                    text, data_replace, data):
+        """Agrega las partes de un objeto (con direcciones relativas a el)
+        a continuacion de los objetos anteriores."""
+        text_base = self.text_dir_offset - self.dir_offset
+        data_base = self.data_dir_offset - self.dir_offset
+
+        for label, addr in text_labels:
+            addr += self.text_dir_offset
+            self.labels[label] = addr
+            self.text_labels[label] = addr
+
+        for label, addr in data_labels:
+            self.data_labels[label] = addr + data_base
+            self.labels[label] = addr + data_base
+
+        for label, positions in text_replace:
+            self.text_replace[label] = [
+                (text_base + start // 64, start % 64, length)
+                for start, length in positions
+            ]
+
+        for dir_val, positions in text_dirs:
+            self.text_dirs[dir_val + self.text_dir_offset] = [
+                (start + text_base * 64, length)
+                for start, length in positions
+            ]
+
+        self.text.extend(text)
+
+        for label, positions in data_replace:
+            self.data_replace[label] = [p + data_base for p in positions]
+
+        self.data.extend(data)
+
     def _parse(self, tokens):
         i = 0
 
@@ -82,6 +284,7 @@ class LinkerLoader:
             addr = tokens[i + 1].value
 
             self.labels[label] = addr + self.text_dir_offset
+            self.text_labels[label] = addr + self.text_dir_offset
             i += 2
         i += 1
         
@@ -94,7 +297,8 @@ class LinkerLoader:
             label = tokens[i].value
             addr = tokens[i + 1].value
 
-            self.labels[label] = addr + self.data_dir_offset - self.dir_offset
+            self.data_labels[label] = addr + self.data_dir_offset - self.dir_offset
+            self.labels[label] = self.data_labels[label]
             i += 2
         i += 1
         # TEXT REPLACE 
@@ -223,7 +427,23 @@ class LinkerLoader:
                 self.data.append(tokens[i].value)
                 i += 1
 
+    def text_image(self) -> list[int]:
+        """Seccion de texto como se carga: con un HLT al final si no lo tiene."""
+        image = list(self.text)
+        if not self.text or self.text[-1] != HLT_WORD:
+            image.append(HLT_WORD)
+        return image
+
+    def data_start(self, base: int = 0) -> int:
+        """Direccion de la seccion de datos si la imagen se carga en ``base``."""
+        return base + len(self.text) + (not self.text or self.text[-1] != HLT_WORD)
+
     def resolve(self, base=0):
+        # Los datos van despues del texto y su HLT
+        data_start = self.data_start(base)
+        for label, addr in self.data_labels.items():
+            self.labels[label] = addr + data_start
+
         for addr, positions in self.text_dirs.items():
             for (bit_pos, bit_len) in positions:
 
@@ -261,22 +481,11 @@ class LinkerLoader:
             
 
     def load_to_ram(self, ram, start=0):
-        addr = start
-
-        # LOAD TEXT
-        for word in self.text:
-            ram.request(data=word, direction=addr, control=1)
-            addr += 1
-
-        # TEMPORAL
-        if not self.text or self.text[-1] != 0xFFFFFFFFFFFFFFFF:
-            ram.request(data=0xFFFFFFFFFFFFFFFF, direction=addr, control=1)
-            addr += 1
+        # TEXT + HLT (TEMPORAL) + DATA en una sola escritura por bloque
+        image = self.text_image()
+        image.extend(self.data)
 
-        # LOAD DATA
-        for word in self.data:
-            ram.request(data=word, direction=addr, control=1)
-            addr += 1
+        ram.load_block(start, image)
 
         return self.labels.get("main", start)
     
@@ -360,11 +569,12 @@ def main():
     from pc.fpu      import FPU
     from pc.cpu      import CPU
     from pc.loader   import Loader
+    from pc.tracing  import Tracer, TraceLevel, FileSink
     
     reg  = Registers()
     fpu = FPU(reg)
     alu  = Alu(reg, fpu)
-    cpu  = CPU(ram, reg, alu)
+    cpu  = CPU(ram, reg, alu, Tracer(TraceLevel.WARN, FileSink(sys.stdout)))
 
     MAX_RAM = 2 ** 16
     
@@ -378,9 +588,13 @@ def main():
     #Ejecutar
     # return
     try:
-        cpu.run()
+        result = cpu.run()
     except KeyboardInterrupt:
         print(reg.PC, reg.SP)
+    else:
+        if result.error is not None:
+            print(f"  Error en PC = {result.pc}: {result.error!r}")
+            traceback.print_exception(result.error)
     
     print(f"  Detenida tras {cpu.cycle_count} ciclos")
     cpu.dump_registers()
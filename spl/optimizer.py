@@ -0,0 +1,476 @@
+"""Optimizaciones del compilador de SPL (ver ``CodeGenerator(optimize=True)``).
+
+Dos pasadas:
+
+* ``fold_constants``: plegado de constantes sobre el AST de tuplas.
+* ``peephole``: mirilla sobre las instrucciones de la IR (ver ir.py) que
+  emite el ``CodeGenerator`` (una lista por seccion).
+
+La mirilla solo es valida para el codigo del compilador, que cumple:
+
+* Las banderas solo se leen justo despues de un ``COMP``.
+* ``RB``, ``RC``, ``RD`` y ``RE`` son temporales: no estan vivos al
+  llegar a una etiqueta, salvo los que ``regalloc`` le dio a una variable
+  (el argumento ``reserved`` de ``peephole``).
+"""
+
+if __package__:
+    from .ir import COND_JUMPS, Instr
+else:
+    from ir import COND_JUMPS, Instr
+
+WORD_MASK = (1 << 64) - 1
+
+# Rango del inmediato de LDINT (56 bits con signo)
+IMM_MIN = -(1 << 55)
+IMM_MAX = (1 << 55) - 1
+
+# Temporales libres para reemplazar un PUSH/POP (ver _remove_push_pop)
+SCRATCH = ("RD", "RE", "RC", "RB")
+
+
+#=======================#
+#  Plegado de constantes #
+#=======================#
+
+def _word(value: int) -> int:
+    return value & WORD_MASK
+
+
+def _div(a, b):
+    # Division entera sin signo, igual que Alu.div; la division por cero
+    # se deja para que falle en ejecucion
+    if b == 0:
+        raise ZeroDivisionError
+    return a // b
+
+_BINARY = {
+    '+':   lambda a, b: a + b,
+    '-':   lambda a, b: a - b,
+    '*':   lambda a, b: a * b,
+    '/':   _div,
+    'AND': lambda a, b: a & b,
+    'OR':  lambda a, b: a | b,
+}
+
+# Identidades x op k -> x (y k op x -> x si la operacion conmuta)
+_RIGHT_IDENTITY = {'+': 0, '-': 0, '*': 1, '/': 1}
+_LEFT_IDENTITY = {'+': 0, '*': 1}
+
+
+def _is_int(node) -> bool:
+    return isinstance(node, int) and not isinstance(node, bool)
+
+
+def _literal(word: int):
+    """Entero con signo que LDINT carga como ``word``, o None si no cabe."""
+    value = word - (1 << 64) if word >> 63 else word
+    return value if IMM_MIN <= value <= IMM_MAX else None
+
+
+def fold_constants(node):
+    """Pliega las expresiones enteras con operandos literales.
+
+    El resultado es el mismo que calcularia la maquina: aritmetica sin
+    signo de 64 bits (ver ``pc/alu.py``). Si el resultado no cabe en el
+    inmediato de LDINT, o la division es por cero, la expresion se deja
+    como esta.
+    """
+    if isinstance(node, list):
+        return [fold_constants(child) for child in node]
+    if not isinstance(node, tuple) or not node:
+        return node
+
+    node = tuple(fold_constants(child) for child in node)
+    tag = node[0]
+
+    if tag in _BINARY and len(node) == 3:
+        left, right = node[1], node[2]
+        if _is_int(left) and _is_int(right):
+            try:
+                value = _literal(_word(_BINARY[tag](_word(left), _word(right))))
+            except ZeroDivisionError:
+                value = None
+            if value is not None:
+                return value
+        if _is_int(right) and _RIGHT_IDENTITY.get(tag) == right:
+            return left
+        if _is_int(left) and _LEFT_IDENTITY.get(tag) == left:
+            return right
+
+    elif tag == 'NOT' and len(node) == 2 and _is_int(node[1]):
+        value = _literal(_word(~node[1]))
+        if value is not None:
+            return value
+
+    return node
+
+
+#=======================#
+#  Mirilla (peephole)   #
+#=======================#
+
+# Instrucciones que escriben su primer parametro y leen el resto
+_WRITES_FIRST = {
+    "LDINT", "LDFLT", "MOV", "LOADMEM", "NOT", "SHFTL", "SHFTR", "ABVAL",
+    "CHNSGN", "CHNINT", "CHNFLT", "ADD", "SUB", "MUL", "DIV", "FADD", "FSUB",
+    "FMUL", "FDIV", "AND", "OR", "XOR",
+}
+# Leen y escriben su unico parametro
+_READ_WRITE = {"INC", "DEC"}
+# Solo leen sus parametros
+_READS_ONLY = {"COMP", "STOR", "STRINT", "STRFLT", "PUSH", "JMPR"}
+# Sin parametros que sean registros
+_IMMEDIATE = {"LDINT", "LDFLT", "STRINT", "STRFLT"}
+
+
+def _parse(line: Instr):
+    """``ADD R5, R1, R5`` -> ``("ADD", [R5, R1, R5])``."""
+    return line.op, list(line.args)
+
+
+def _format(instr: str, params) -> Instr:
+    return Instr(instr, *params)
+
+
+def _is_barrier(line: Instr) -> bool:
+    """Etiquetas, saltos y fin de programa cortan el bloque basico."""
+    if line.is_label:
+        return True
+    instr, params = _parse(line)
+    return (instr in COND_JUMPS or instr in ("JMP", "JMPR", "HLT")
+            or (instr == "POP" and params == ["PC"]))
+
+
+def _reads(instr, params) -> list[str]:
+    if instr in _IMMEDIATE:
+        return params[:1] if instr in ("STRINT", "STRFLT") else []
+    if instr in _WRITES_FIRST:
+        return params[1:]
+    if instr in _READ_WRITE or instr in _READS_ONLY:
+        return list(params) + (["SP"] if instr == "PUSH" else [])
+    if instr == "POP":
+        return ["SP"]
+    return []
+
+
+def _writes(instr, params) -> list[str]:
+    if instr in _WRITES_FIRST or instr in _READ_WRITE:
+        return params[:1]
+    if instr == "PUSH":
+        return ["SP"]
+    if instr == "POP":
+        return params[:1] + ["SP"]
+    return []
+
+
+def _read_positions(instr, params) -> range:
+    """Posiciones de ``params`` que la instruccion lee."""
+    if instr in _WRITES_FIRST:
+        return range(1, len(params)) if instr not in _IMMEDIATE else range(0)
+    if instr in ("STRINT", "STRFLT"):
+        return range(1)
+    if instr in _READS_ONLY or instr in _READ_WRITE:
+        return range(len(params))
+    return range(0)
+
+
+def _dead_after(lines, i: int, reg: str, scratch=SCRATCH) -> bool:
+    """True si ``reg`` se sobreescribe despues de ``lines[i]`` antes de
+    leerse, dentro del mismo bloque basico."""
+    for line in lines[i + 1:]:
+        if line.is_label:
+            # Los temporales no llegan vivos a una etiqueta
+            return reg in scratch
+        instr, params = _parse(line)
+        if reg in _reads(instr, params):
+            return False
+        if instr in COND_JUMPS:
+            # Si salta llega a una etiqueta; si no, se sigue buscando
+            if reg in scratch:
+                continue
+            return False
+        if _is_barrier(line):
+            return reg in scratch
+        if reg in _writes(instr, params):
+            return True
+    return reg in scratch
+
+
+def _written_first(lines, reg: str) -> bool:
+    """True si el primer uso de ``reg`` en ``lines`` es una escritura."""
+    for line in lines:
+        instr, params = _parse(line)
+        if reg in _reads(instr, params):
+            return False
+        if reg in _writes(instr, params):
+            return True
+    return False
+
+
+def _remove_push_pop(lines, scratch=SCRATCH) -> bool:
+    """``PUSH R5; ...; POP R1`` -> ``MOV R1, R5; ...``.
+
+    El codigo entre ambos (el operando derecho de una expresion) no debe
+    tocar la pila ni saltar, y si usa ``R1`` como temporal se renombra a
+    uno de ``scratch`` que no use.
+    """
+    changed = False
+    i = 0
+    while i < len(lines):
+        instr, params = _parse(lines[i])
+        if instr != "PUSH" or lines[i].is_label:
+            i += 1
+            continue
+        src = params[0]
+        j = i + 1
+        used = set()
+        while j < len(lines) and not _is_barrier(lines[j]):
+            instr, params = _parse(lines[j])
+            if instr in ("PUSH", "POP"):
+                break
+            used.update(_reads(instr, params))
+            used.update(_writes(instr, params))
+            j += 1
+        else:
+            i += 1
+            continue
+        instr, params = _parse(lines[j])
+        if instr != "POP" or params[0] in ("PC", "SP") or "SP" in used:
+            i += 1
+            continue
+        dst = params[0]
+        body = lines[i + 1:j]
+
+        if dst in used:
+            # dst se usa adentro: solo como temporal escrito antes de leerse
+            temp = next((r for r in scratch if r not in used and r not in (src, dst)
+                         and _dead_after(lines, j, r, scratch)), None)
+            if temp is None or not _written_first(body, dst):
+                i += 1
+                continue
+            body = [_format(ins, [temp if p == dst else p for p in ps])
+                    for ins, ps in map(_parse, body)]
+
+        lines[i:j + 1] = ([] if dst == src and src not in used else [_format("MOV", [dst, src])]) + body
+        changed = True
+        i += 1
+    return changed
+
+
+class _Values:
+    """Numeracion de valores de un bloque basico: el valor simbolico de
+    cada registro y de las direcciones de memoria conocidas."""
+
+    def __init__(self):
+        self.regs = {}
+        self.memory = {}
+        self._fresh = 0
+
+    def fresh(self):
+        self._fresh += 1
+        return ("?", self._fresh)
+
+    def of(self, operand):
+        value = self.regs.get(operand)
+        if value is None:
+            value = self.regs[operand] = self.fresh()
+        return value
+
+    def clear(self):
+        self.regs.clear()
+        self.memory.clear()
+
+
+def _address(value):
+    """(base, desplazamiento) de una direccion simbolica."""
+    if value[0] == "imm":
+        return (None, value[1]) if isinstance(value[1], int) else (value[1], 0)
+    if value[0] == "ADD" and value[2][0] == "imm" and isinstance(value[2][1], int):
+        return value[1], value[2][1]
+    return value, 0
+
+
+def _may_alias(a, b) -> bool:
+    if a == b:
+        return True
+    (base_a, off_a), (base_b, off_b) = _address(a), _address(b)
+    if base_a == base_b:
+        return off_a == off_b
+    # Dos etiquetas distintas son variables globales distintas
+    return not (isinstance(base_a, str) and isinstance(base_b, str))
+
+
+def _fused_value(values, params, next_line):
+    """Valor de ``LDINT R, k`` seguido de una operacion ``OP R, Y, R`` (u
+    ``OP R, R, Y``), o None si la siguiente linea no es de esa forma."""
+    if next_line.is_label:
+        return None
+    instr, next_params = _parse(next_line)
+    reg = params[0]
+    if (instr not in _WRITES_FIRST or len(next_params) != 3 or next_params[0] != reg
+            or next_params.count(reg) != 2):
+        return None
+    imm = ("imm", params[1])
+    return (instr,) + tuple(imm if p == reg else values.of(p) for p in next_params[1:])
+
+
+def _remove_redundant(lines) -> bool:
+    """Quita las instrucciones que escriben en un registro el valor que ya
+    tiene (direcciones y constantes recalculadas, cargas de una variable
+    recien guardada)."""
+    values = _Values()
+    changed = False
+    out = []
+    skip = False
+    for i, line in enumerate(lines):
+        if skip:
+            skip = False
+            continue
+        if line.is_label:
+            values.clear()
+            out.append(line)
+            continue
+        instr, params = _parse(line)
+
+        if instr == "LDINT" and params[0] not in ("PC", "SP") and i + 1 < len(lines):
+            # Direccion ``LDINT R, k; ADD R, BP, R`` que R ya tiene
+            fused = _fused_value(values, params, lines[i + 1])
+            if fused is not None and values.regs.get(params[0]) == fused:
+                changed = skip = True
+                continue
+
+        if instr in _WRITES_FIRST:
+            dst = params[0]
+            if instr == "LDINT":
+                value = ("imm", params[1])
+            elif instr == "LDFLT":
+                value = ("flt", params[1])
+            elif instr == "MOV":
+                value = values.of(params[1])
+            elif instr == "LOADMEM":
+                address = values.of(params[1])
+                value = values.memory.get(address)
+                if value is None:
+                    value = values.memory[address] = values.fresh()
+            else:
+                value = (instr,) + tuple(values.of(p) for p in params[1:])
+            if dst not in ("PC", "SP") and values.regs.get(dst) == value:
+                changed = True
+                continue
+            values.regs[dst] = value
+            if dst == "PC":
+                values.clear()
+
+        elif instr in ("STOR", "STRINT", "STRFLT"):
+            address = values.of(params[1] if instr == "STOR" else params[0])
+            if instr == "STOR":
+                value = values.of(params[0])
+            else:
+                value = ("imm" if instr == "STRINT" else "flt", params[1])
+            values.memory = {a: v for a, v in values.memory.items() if not _may_alias(a, address)}
+            values.memory[address] = value
+
+        elif instr in ("PUSH", "POP"):
+            # Escriben en la pila: no se sabe que variables pisa
+            values.memory.clear()
+            for reg in _writes(instr, params):
+                values.regs[reg] = values.fresh()
+            if params == ["PC"] and instr == "POP":
+                values.clear()
+
+        elif instr in ("JMP", "JMPR", "HLT"):
+            values.clear()
+
+        else:
+            for reg in _writes(instr, params):
+                values.regs[reg] = values.fresh()
+
+        out.append(line)
+
+    lines[:] = out
+    return changed
+
+
+def _fold_moves(lines, scratch=SCRATCH) -> bool:
+    """Pliega cadenas de MOV: ``X R, ...; MOV T, R`` -> ``X T, ...`` si
+    ``R`` no se vuelve a leer, y ``LDINT R, 0; ADD R, Y, R`` -> ``MOV R, Y``."""
+    changed = False
+    i = 0
+    while i < len(lines):
+        if lines[i].is_label:
+            i += 1
+            continue
+        instr, params = _parse(lines[i])
+
+        if instr == "MOV" and params[0] == params[1]:
+            del lines[i]
+            changed = True
+            continue
+
+        if i + 1 < len(lines) and not lines[i + 1].is_label:
+            next_instr, next_params = _parse(lines[i + 1])
+
+            if (instr == "LDINT" and params[1] == 0 and next_instr == "ADD"
+                    and next_params[0] == params[0] and next_params[2] == params[0]
+                    and next_params[1] != params[0]):
+                lines[i:i + 2] = [_format("MOV", next_params[:2])]
+                changed = True
+                continue
+
+            if (instr == "MOV" and "PC" not in params and params[0] != "SP"
+                    and params[0] in _reads(next_instr, next_params)
+                    and next_instr not in _READ_WRITE and next_instr not in ("PUSH", "POP")
+                    and (params[0] in _writes(next_instr, next_params)
+                         or _dead_after(lines, i + 1, params[0], scratch))):
+                # ``MOV T, S; X ..T..`` -> ``X ..S..`` si T no se vuelve a leer
+                reads = _read_positions(next_instr, next_params)
+                new_params = [params[1] if k in reads and p == params[0] else p
+                              for k, p in enumerate(next_params)]
+                lines[i:i + 2] = [_format(next_instr, new_params)]
+                changed = True
+                continue
+
+            if (instr in _WRITES_FIRST and next_instr == "MOV"
+                    and next_params[1] == params[0] != next_params[0]
+                    and params[0] not in ("PC", "SP") and next_params[0] not in ("PC", "SP")
+                    and _dead_after(lines, i + 1, params[0], scratch)):
+                lines[i:i + 2] = [_format(instr, [next_params[0]] + params[1:])]
+                changed = True
+                continue
+        i += 1
+    return changed
+
+
+def _remove_unreachable(lines) -> bool:
+    """Quita lo que sigue a un salto incondicional (o retorno) hasta la
+    siguiente etiqueta, p. ej. el epilogo repetido despues de un return."""
+    changed = False
+    i = 0
+    while i < len(lines):
+        instr, params = _parse(lines[i])
+        if instr in ("JMP", "JMPR", "HLT") or (instr == "POP" and params == ["PC"]):
+            end = i + 1
+            while end < len(lines) and not lines[end].is_label:
+                end += 1
+            if end > i + 1:
+                del lines[i + 1:end]
+                changed = True
+        i += 1
+    return changed
+
+
+def peephole(lines: list[Instr], reserved=()) -> list[Instr]:
+    """Aplica la mirilla a una seccion hasta que no haya mas cambios.
+
+    ``reserved``: registros que guardan variables; no se usan como temporales.
+    """
+    lines = list(lines)
+    scratch = tuple(reg for reg in SCRATCH if reg not in reserved)
+    while True:
+        changed = _remove_unreachable(lines)
+        changed = _remove_push_pop(lines, scratch) or changed
+        changed = _remove_redundant(lines) or changed
+        changed = _fold_moves(lines, scratch) or changed
+        if not changed:
+            return lines
@@ -0,0 +1,98 @@
+"""Compilar, ensamblar, enlazar y ejecutar SPL sin archivos intermedios.
+
+    Parser -> CodeGenerator (IR) -> Builder -> LinkerLoader -> RAM -> CPU
+
+Cada etapa pasa objetos a la siguiente: la IR alimenta al ``Builder`` sin
+escribir ni lexear el assembly y el linker toma el estado del ``Builder``
+sin codificar el .o. Pensado para correr muchos programas chicos seguidos
+(p. ej. pruebas)::
+
+    from spl.pipeline import run_source
+    run = run_source("int r; r = 6 * 7;")
+    run.read("global_r")    # 42
+"""
+from typing import NamedTuple
+
+from pc.ram import RAM
+from pc.register import Registers
+from pc.alu import Alu
+from pc.fpu import FPU
+from pc.cpu import CPU, RunResult
+
+from .assembly import Assembler, Builder
+from .compiler import Parser, CodeGenerator
+from .ir import Program
+from .linker_loader import LinkerLoader
+
+MAX_RAM = 2**16
+
+
+def compile_source(source: str, optimize: bool = True) -> Program:
+    """SPL -> IR optimizada (``ir.Program``)."""
+    ast = Parser().parse(source)
+    if ast is None:
+        raise Exception("Error de sintaxis: no se pudo compilar el programa")
+    return CodeGenerator(optimize=optimize).lower(ast)
+
+
+def assemble(program: Program | str, name: str = "<spl>") -> Builder:
+    """IR (o texto assembly) -> ``Builder`` ensamblado."""
+    if not isinstance(program, Program):
+        return Assembler(readable=False).assemble_text(program, name)
+    builder = program.build(name=name)
+    if builder._hasErrors:
+        raise Exception("Errores en ensamblado")
+    return builder
+
+
+def link(objects: list[tuple[str, Builder]], base: int = 0) -> LinkerLoader:
+    """Enlaza pares (nombre, ``Builder``) en ese orden."""
+    linker = LinkerLoader(verbose=False)
+    for name, builder in objects:
+        linker.load_builder(name, builder)
+    linker.resolve(base)
+    linker.resolve_data()
+    return linker
+
+
+class Execution(NamedTuple):
+    """Resultado de ``run_source``: la maquina queda como termino."""
+    result: RunResult
+    cpu: CPU
+    ram: RAM
+    registers: Registers
+    linker: LinkerLoader
+
+    def address(self, label: str) -> int:
+        return self.linker.labels[label + "\\0"]
+
+    def read(self, label: str) -> int:
+        """Palabra en la direccion de la etiqueta (p. ej. ``global_x``)."""
+        return self.ram.request(0, self.address(label), 0)
+
+
+def load(linker: LinkerLoader, base: int = 0, ram: RAM | None = None,
+         tracer=None) -> tuple[CPU, RAM, Registers]:
+    """Carga la imagen enlazada en ``ram`` (una nueva por defecto) y arma
+    una CPU lista para ejecutar desde el punto de entrada."""
+    ram = RAM() if ram is None else ram
+    reg = Registers()
+    fpu = FPU(reg)
+    cpu = CPU(ram, reg, Alu(reg, fpu), tracer)
+    reg.PC = linker.load_to_ram(ram, start=base)
+    reg.SP = MAX_RAM - 1
+    return cpu, ram, reg
+
+
+def run_source(source: str, optimize: bool = True, base: int = 0,
+               max_cycles: int | None = None, ram: RAM | None = None,
+               tracer=None) -> Execution:
+    """Compila y ejecuta un programa SPL completamente en memoria.
+
+    Un fallo durante la ejecucion no se lanza: queda en ``result.error``
+    (ver ``RunResult.raise_error``)."""
+    builder = assemble(compile_source(source, optimize))
+    linker = link([("<spl>", builder)], base)
+    cpu, ram, reg = load(linker, base, ram, tracer)
+    result = cpu.run(max_cycles=max_cycles)
+    return Execution(result, cpu, ram, reg, linker)
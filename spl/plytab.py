@@ -0,0 +1,30 @@
+"""Nombres de las tablas que PLY guarda con ``optimize=1``.
+
+Con ``optimize=1`` ``lex.lex`` lee ``<lextab>.py`` si existe y no revisa
+si las reglas cambiaron. Por eso el nombre de la tabla lleva un hash de
+las reglas: al cambiarlas se genera una tabla nueva con otro nombre en vez
+de leer la vieja. (``yacc.yacc`` ya compara la firma de la gramatica con
+la de la parsetab y la regenera si no coincide.)
+"""
+import hashlib
+
+# Nombres de un modulo o clase lexer que PLY guarda en la lextab
+_RULE_NAMES = ("tokens", "literals", "states")
+
+
+def lextab_name(prefix: str, rules: dict) -> str:
+    """``<prefix>_<hash>_lextab`` para las reglas ``t_*`` de ``rules`` (el
+    namespace del modulo o de la clase del lexer).
+
+    De las reglas funcion se usa la expresion regular y la linea donde se
+    definen (PLY las ordena por linea); el cuerpo no queda en la tabla.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(rules):
+        if not (name.startswith("t_") or name in _RULE_NAMES):
+            continue
+        value = rules[name]
+        if callable(value):
+            value = (getattr(value, "regex", value.__doc__), value.__code__.co_firstlineno)
+        digest.update(f"{name}={value!r}\n".encode("utf-8"))
+    return f"{prefix}_{digest.hexdigest()[:12]}_lextab"
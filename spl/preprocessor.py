@@ -1,70 +1,205 @@
 import ply.lex as lex
+import os
 import sys
 
-tokens = ("INCLUIR", "DEFINIR", "IDENTIFIER", "TEXT")
-
-
-def preprocess(data):
-    defines = {}
-    buffer = ""
-    memory = []
-    loaded_files = {}
-
-    def add_to_memory(name, text):
-        words = text.split()
-        start = len(memory)
-        memory.extend(words)
-        loaded_files[name] = (start, len(words))
-
-    # Token: include
-    def t_INCLUIR(t):
-        r"%[ ]*include[ ]+[^\n]+"
-        nonlocal buffer
-        parts = t.value.split()
-        filename = parts[-1]
-
+if __package__:
+    from .plytab import lextab_name
+else:
+    from plytab import lextab_name
+
+tokens = ("INCLUIR", "DEFINIR", "IDENTIFIER", "SPACE", "TEXT")
+
+
+# Las reglas solo reconocen los tokens; el Preprocessor los consume en
+# orden y va emitiendo pedazos de la salida. Asi el lexer se construye una
+# sola vez por proceso (tablas en preprocessor_<hash>_lextab.py, ver
+# plytab.py).
+
+# Token: include
+def t_INCLUIR(t):
+    r"%[ ]*include[ ]+[^\n]+"
+    t.value = t.value.split()[-1]
+    return t
+
+def t_DEFINIR(t):
+    r"%[ ]*define[ ]+[a-zA-Z_][a-zA-Z0-9_]*[ ]+[^\n]+"
+    parts = t.value.split()
+    t.value = (parts[-2], parts[-1])
+    return t
+
+def t_IDENTIFIER(t):
+    r"[a-zA-Z_][a-zA-Z0-9_]*"
+    return t
+
+def t_SPACE(t):
+    r"\s+"
+    return t
+
+def t_TEXT(t):
+    r"[^%a-zA-Z_\s]+|%"
+    return t
+
+t_ignore = ""
+
+def t_error(t):
+    t.lexer.skip(1)
+
+
+_lexer = None
+
+def get_lexer():
+    """Retorna un lexer nuevo (copia del construido una sola vez)."""
+    global _lexer
+    if _lexer is None:
+        _lexer = lex.lex(optimize=1, lextab=lextab_name("preprocessor", globals()))
+    return _lexer.clone()
+
+
+class Preprocessor:
+    """Preprocesador con estado entre llamadas.
+
+    * Los archivos incluidos se guardan en memoria por (ruta, mtime): solo
+      se vuelven a leer si cambiaron en disco.
+    * ``graph`` guarda los ``%include`` directos de cada archivo
+      preprocesado; ``dependencies`` y ``latest_mtime`` lo recorren para
+      que un build incremental sepa si una unidad cambio.
+
+    La salida son las palabras separadas por un espacio. Como antes, un
+    ``%define`` vale para todo el archivo, tambien antes de la linea que lo
+    define y dentro de los includes: ``stream`` junta primero los defines de
+    la unidad y sus includes (si un nombre se define dos veces gana el
+    ultimo) y despues los reemplaza al emitir cada identificador. El texto
+    de los includes pasa por el mismo lexer que el archivo principal, asi
+    que sus identificadores quedan separados de la puntuacion (``RA , N``).
+    """
+
+    def __init__(self):
+        self.cache = {}     # ruta -> (mtime_ns, contenido)
+        self.graph = {}     # archivo -> [includes directos]
+
+    def read(self, path: str) -> str:
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r") as f:
+            content = f.read()
+        self.cache[path] = (mtime, content)
+        return content
+
+    def collect_defines(self, data: str, defines: dict, stack: list) -> dict:
+        """Agrega a ``defines`` los ``%define`` de ``data`` y de sus
+        includes, en orden de aparicion. ``stack`` son los archivos que se
+        estan recorriendo (para no seguir un include circular)."""
+        lexer = get_lexer()
+        lexer.input(data)
+        while tok := lexer.token():
+            if tok.type == "DEFINIR":
+                name, value = tok.value
+                defines[name] = value
+            elif tok.type == "INCLUIR" and tok.value not in stack:
+                try:
+                    content = self.read(tok.value)
+                except OSError:
+                    continue
+                stack.append(tok.value)
+                self.collect_defines(content, defines, stack)
+                stack.pop()
+        return defines
+
+    def stream(self, data: str, name: str = "<input>", defines=None, loaded=None):
+        """Genera la salida de ``data`` por pedazos.
+
+        ``defines`` son valores iniciales (los ``%define`` de la unidad los
+        pisan); ``loaded`` (archivo -> (inicio, palabras), como el
+        ``loaded_files`` de ``preprocess``) se comparte con los includes.
+        """
+        defines = self.collect_defines(data, dict(defines or {}), [name])
+        loaded = {} if loaded is None else loaded
+        state = {"words": 0, "space": False, "stack": [name], "memory": 0}
+        self.graph[name] = []
+        yield from self._stream(data, defines, loaded, state)
+
+    def _stream(self, data, defines, loaded, state):
+        lexer = get_lexer()
+        lexer.input(data)
+        while tok := lexer.token():
+            if tok.type == "SPACE":
+                state["space"] = True
+                continue
+
+            if tok.type == "DEFINIR":
+                # Ya juntado por collect_defines
+                continue
+
+            if tok.type == "INCLUIR":
+                yield from self._include(tok.value, defines, loaded, state)
+                continue
+
+            text = defines.get(tok.value, tok.value) if tok.type == "IDENTIFIER" else tok.value
+            if state["space"] and state["words"]:
+                yield " "
+            yield text
+            state["words"] += 1
+            # Los identificadores siempre quedan separados de lo que sigue
+            state["space"] = tok.type == "IDENTIFIER"
+
+    def _include(self, filename, defines, loaded, state):
+        stack = state["stack"]
+        self.graph[stack[-1]].append(filename)
+        if filename in stack:
+            print(f"Error: include circular de {filename}")
+            return
         try:
-            with open(filename, "r") as f:
-                content = f.read()
-            add_to_memory(filename, content)
-            buffer += content
-        except:
+            content = self.read(filename)
+        except OSError:
             print(f"Error: no se pudo abrir {filename}")
-
-    def t_DEFINIR(t):
-        r"%[ ]*define[ ]+[a-zA-Z_][a-zA-Z0-9_]*[ ]+[^\n]+"
-        parts = t.value.split()
-        name = parts[-2]
-        value = parts[-1]
-        defines[name] = value
-
-    def t_IDENTIFIER(t):
-        r"[a-zA-Z_][a-zA-Z0-9_]*"
-        nonlocal buffer
-        buffer += t.value + " "
-
-    def t_TEXT(t):
-        r".|\n"
-        nonlocal buffer
-        buffer += t.value
-
-    t_ignore = ""
-
-    def t_error(t):
-        t.lexer.skip(1)
-
-    lexer = lex.lex()
-    lexer.input(data)
-
-    while lexer.token():
-        pass
-
-    result = buffer.split()
-    for i, word in enumerate(result):
-        if word in defines:
-            result[i] = defines[word]
-
-    return " ".join(result), loaded_files
+            return
+
+        # Posicion de sus palabras entre las de todos los includes
+        count = len(content.split())
+        loaded[filename] = (state["memory"], count)
+        state["memory"] += count
+
+        self.graph[filename] = []
+        stack.append(filename)
+        state["space"] = True
+        yield from self._stream(content, defines, loaded, state)
+        state["space"] = True
+        stack.pop()
+
+    def preprocess(self, data: str, name: str = "<input>"):
+        loaded = {}
+        output = "".join(self.stream(data, name, loaded=loaded))
+        return output, loaded
+
+    def dependencies(self, name: str) -> set[str]:
+        """Todos los archivos que ``name`` incluye, directa o indirectamente."""
+        seen = set()
+        pending = list(self.graph.get(name, ()))
+        while pending:
+            dep = pending.pop()
+            if dep not in seen:
+                seen.add(dep)
+                pending.extend(self.graph.get(dep, ()))
+        return seen
+
+    def latest_mtime(self, name: str) -> int:
+        """Ultima modificacion (ns) de ``name`` y sus includes: si no es
+        mayor que la de la salida, la unidad no necesita rehacerse."""
+        latest = 0
+        for path in self.dependencies(name) | {name}:
+            try:
+                latest = max(latest, os.stat(path).st_mtime_ns)
+            except OSError:
+                pass
+        return latest
+
+
+_default = Preprocessor()
+
+def preprocess(data, name="<input>"):
+    return _default.preprocess(data, name)
 
 
 if __name__ == "__main__":
@@ -81,8 +216,11 @@ if __name__ == "__main__":
         print(f"Error: no se pudo abrir {filename}")
         sys.exit(1)
 
-    output, loaded = preprocess(data)
+    output, loaded = preprocess(data, filename)
     print(output)
     print("\nLoaded files:")
     for name, (start, count) in loaded.items():
         print(f"  {name}: start={start}, count={count}")
+    print("\nDependencies:")
+    for dep in sorted(_default.dependencies(filename)):
+        print(f"  {dep}")
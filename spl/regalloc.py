@@ -0,0 +1,218 @@
+"""Asignacion de registros para las funciones de SPL (linear scan).
+
+Para cada funcion se calcula el intervalo de vida de cada variable local
+(y de cada parametro) sobre un recorrido lineal del cuerpo, en el mismo
+orden en que lo visita el ``CodeGenerator``; si una variable se usa dentro
+de un ciclo, su intervalo cubre el ciclo completo. Luego se reparten los
+registros libres con linear scan: cuando no alcanzan, se queda en la pila
+la variable de menor peso (usos, multiplicados por 10 por cada ciclo que
+los contiene).
+
+Convencion de llamada: los parametros llegan en R1-R5 (ver
+``PARAM_REGISTERS``) y el valor de retorno va en RA. Como cualquier
+llamada puede usar todos los registros, una variable cuyo intervalo
+cruza una llamada no se asigna a un registro.
+"""
+from collections import defaultdict
+
+# Registros en los que llegan los parametros (mismo orden que FUNC_DEF)
+PARAM_REGISTERS = ("R1", "R2", "R3", "R4", "R5")
+
+# Registros que puede recibir una variable. El CodeGenerator usa R5 y R1
+# para las expresiones, RA para el retorno y las condiciones y RB para
+# guardar los parametros; R2-R4 solo se escriben al preparar una llamada.
+POOL = ("R4", "R3", "R2", "RC", "RE", "RD")
+
+# MEMBER_ACCESS y CALL_METHOD usan R2 y R3 como temporales
+_STRUCT_TEMPS = ("R2", "R3")
+
+
+class _Liveness:
+    """Recorre el cuerpo de una funcion y anota intervalos y pesos."""
+
+    def __init__(self):
+        self.pos = 0
+        self.scopes = [{}]
+        self.intervals = {}
+        self.weights = defaultdict(int)
+        self.calls = []
+        self.pinned = set()
+        self.loops = []
+        self.uses_structs = False
+
+    def tick(self) -> int:
+        self.pos += 1
+        return self.pos
+
+    def declare(self, name, key, allocatable=True):
+        self.scopes[-1][name] = key
+        self.intervals[key] = [self.tick(), self.pos]
+        if not allocatable:
+            self.pinned.add(key)
+
+    def resolve(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None     # global
+
+    def use(self, name):
+        key = self.resolve(name)
+        if key is None:
+            return
+        self.intervals[key][1] = self.tick()
+        self.weights[key] += 10 ** min(len(self.loops), 6)
+        for _, used in self.loops:
+            used.add(key)
+
+    def pin(self, name):
+        if isinstance(name, str):
+            key = self.resolve(name)
+            if key is not None:
+                self.pinned.add(key)
+
+    def loop(self, *parts):
+        start = self.tick()
+        self.loops.append((start, set()))
+        for part in parts:
+            self.walk(part)
+        _, used = self.loops.pop()
+        end = self.tick()
+        # Lo declarado antes del ciclo debe seguir vivo en la siguiente vuelta
+        for key in used:
+            interval = self.intervals[key]
+            if interval[0] < start:
+                interval[1] = max(interval[1], end)
+
+    def walk(self, node):
+        if isinstance(node, list):
+            for child in node:
+                self.walk(child)
+            return
+        if isinstance(node, str):
+            self.use(node)
+            return
+        if not isinstance(node, tuple) or not node:
+            return
+
+        tag = node[0]
+        if tag == 'BLOCK':
+            self.scopes.append({})
+            self.walk(node[1])
+            self.scopes.pop()
+        elif tag == 'DECL':
+            self.declare(node[2], id(node))
+        elif tag == 'DECL_ASSIGN':
+            self.declare(node[2], id(node))
+            self.walk(node[3])
+            self.use(node[2])
+        elif tag == 'DECL_ARRAY':
+            self.declare(node[2], id(node), allocatable=False)
+        elif tag == 'ASSIGN':
+            self.walk(node[2])
+            self.use(node[1])
+        elif tag in ('INC_VAR', 'DEC_VAR'):
+            self.use(node[1])
+        elif tag == 'WHILE':
+            self.loop(node[1], node[2])
+        elif tag == 'FOR':
+            self.scopes.append({})
+            self.walk(node[1])
+            self.loop(node[2], node[4], node[3])
+            self.scopes.pop()
+        elif tag in ('CALL_FUNC', 'CALL_METHOD'):
+            start = self.tick()
+            if tag == 'CALL_METHOD':
+                self.uses_structs = True
+                self.walk(node[1])
+            self.walk(node[2])
+            self.calls.append((start, self.tick()))
+        elif tag == 'MEMBER_ACCESS':
+            self.uses_structs = True
+            self.pin(node[1])
+            self.walk(node[1])
+        elif tag in ('ARRAY_ACCESS', 'ASSIGN_ARRAY'):
+            self.pin(node[1])
+            self.walk(list(node[2:]))
+        elif tag in ('FUNC_DEF', 'METHOD_DEF', 'STRUCT_DEF'):
+            pass
+        else:
+            self.walk(list(node[1:]))
+
+
+def allocate_registers(func, pool=POOL) -> dict:
+    """Registros para las variables de un nodo ``FUNC_DEF``.
+
+    Returns:
+        dict: ``id()`` del nodo de declaracion (``DECL`` / ``DECL_ASSIGN``
+              o la tupla ``(tipo, nombre)`` del parametro) -> registro.
+              Las variables que no aparecen se quedan en la pila.
+    """
+    live = _Liveness()
+    params = func[3]
+    incoming = {}
+    for idx, param in enumerate(params):
+        live.declare(param[1], id(param), allocatable=idx < len(PARAM_REGISTERS))
+        if idx < len(PARAM_REGISTERS):
+            incoming[id(param)] = PARAM_REGISTERS[idx]
+    live.walk(func[4])
+
+    if live.uses_structs:
+        pool = tuple(reg for reg in pool if reg not in _STRUCT_TEMPS)
+
+    def crosses_call(start, end):
+        return any(s <= end and start <= e for s, e in live.calls)
+
+    candidates = sorted(
+        (key for key, (start, end) in live.intervals.items()
+         if key not in live.pinned and not crosses_call(start, end)),
+        key=lambda key: live.intervals[key][0])
+
+    assigned = {}
+    active = []
+    free = list(pool)
+    for n, key in enumerate(candidates):
+        start, end = live.intervals[key]
+        for other in list(active):
+            if live.intervals[other][1] < start:
+                active.remove(other)
+                free.append(assigned[other])
+
+        # Un parametro prefiere el registro en el que llega; nadie toma el
+        # registro de un parametro que todavia no se ha asignado
+        pending = {incoming[k] for k in candidates[n + 1:] if k in incoming}
+        choices = [reg for reg in free if reg not in pending]
+        reg = incoming.get(key)
+        if reg not in free:
+            reg = choices[0] if choices else None
+
+        if reg is None:
+            # Sin registros libres: se queda en la pila la de menor peso
+            victim = min(active, key=lambda k: live.weights[k], default=None)
+            if victim is None or live.weights[victim] >= live.weights[key]:
+                continue
+            active.remove(victim)
+            reg = assigned.pop(victim)
+        else:
+            free.remove(reg)
+        assigned[key] = reg
+        active.append(key)
+
+    return assigned
+
+
+def parallel_moves(moves: dict, temp: str) -> list[tuple[str, str]]:
+    """Ordena las copias ``destino <- origen`` para que ninguna pise un
+    origen que todavia no se ha copiado; los ciclos se rompen con ``temp``."""
+    moves = {dst: src for dst, src in moves.items() if dst != src}
+    out = []
+    while moves:
+        ready = [dst for dst in moves if dst not in moves.values()]
+        if ready:
+            for dst in ready:
+                out.append((dst, moves.pop(dst)))
+            continue
+        dst, src = next(iter(moves.items()))
+        out.append((temp, src))
+        moves = {d: (temp if s == src else s) for d, s in moves.items()}
+    return out
@@ -0,0 +1,170 @@
+"""Programas SPL para las pruebas del compilador: ejemplos con su
+resultado conocido y un generador de programas al azar (con semilla)."""
+import random
+
+from spl.pipeline import run_source
+
+MAX_CYCLES = 200000
+
+# nombre -> (fuente, valores esperados de las variables globales)
+SAMPLES = {
+    "fact_sum": ("""
+int r;
+int s;
+int fact(int n) {
+    int acc = 1;
+    while (n > 1) {
+        acc = acc * n;
+        n = n - 1;
+    }
+    return acc;
+}
+int sum(int a, int b, int c) {
+    int t = a + b * 2 - (3 * 4);
+    int u = t + c + 0;
+    return u * 1 + 10 / 2;
+}
+r = fact(10);
+s = sum(5, 6, 7);
+""", {"r": 3628800, "s": 17}),
+    "for_loop": ("""
+int r;
+int loop(int n) {
+    int total = 0;
+    for (int i = 0; i < n; i++) {
+        total = total + i * (2 + 3);
+    }
+    return total;
+}
+r = loop(50);
+""", {"r": 6125}),
+    "branches": ("""
+int r;
+int q;
+int calc(int a, int b, int c, int d) {
+    int x;
+    if (a < b) { x = c * (a + b) - d * (c - d); } else { x = a - b; }
+    return x + a * (b + c * (d + 1));
+}
+r = calc(3, 4, 10, 2);
+q = calc(9, 1, 3, 4);
+""", {"r": 156, "q": 152}),
+    "fib_collatz": ("""
+int r;
+int fib(int n) {
+    int a = 0;
+    int b = 1;
+    int t;
+    int k = 0;
+    while (k < n) {
+        t = a + b;
+        a = b;
+        b = t;
+        k = k + 1;
+    }
+    return a;
+}
+int collatz(int n) {
+    int steps = 0;
+    while (n != 1) {
+        if (n - n / 2 * 2 == 0) { n = n / 2; } else { n = 3 * n + 1; }
+        steps = steps + 1;
+    }
+    return steps;
+}
+r = fib(30);
+int s;
+s = collatz(27);
+""", {"r": 832040, "s": 111}),
+}
+
+HELPER = """int helper(int x, int y) {
+    int z = x * 3 - y;
+    if (z > x) { z = z - x; }
+    return z + 1;
+}
+"""
+
+
+class _Generator:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.loops = 0
+
+    def expr(self, names, depth=0):
+        rng = self.rng
+        if depth > 3 or rng.random() < 0.3:
+            if rng.random() < 0.4 or not names:
+                return str(rng.choice((0, 1, 2, 3, 7, 100, rng.randint(0, 1000))))
+            return rng.choice(names)
+        op = rng.choice("+-*/+-")
+        left = self.expr(names, depth + 1)
+        right = str(rng.randint(1, 9)) if op == "/" else self.expr(names, depth + 1)
+        if op != "/" and rng.random() < 0.3:
+            right = f"({right})"
+        return f"{left} {op} {right}"
+
+    def cond(self, names):
+        op = self.rng.choice(("<", ">", "<=", ">=", "==", "!="))
+        return f"{self.expr(names, 2)} {op} {self.expr(names, 2)}"
+
+    def block(self, names, depth):
+        rng = self.rng
+        out = []
+        for _ in range(rng.randint(1, 4)):
+            r = rng.random()
+            name = rng.choice(names)
+            if r < 0.1:
+                out.append(f"{name} = helper({self.expr(names, 2)}, {self.expr(names, 2)});")
+            elif r < 0.5 or depth > 1:
+                out.append(f"{name} = {self.expr(names)};")
+            elif r < 0.75:
+                then = " ".join(self.block(names, depth + 1))
+                if rng.random() < 0.5:
+                    other = " ".join(self.block(names, depth + 1))
+                    out.append(f"if ({self.cond(names)}) {{ {then} }} else {{ {other} }}")
+                else:
+                    out.append(f"if ({self.cond(names)}) {{ {then} }}")
+            else:
+                k = f"k{self.loops}"
+                self.loops += 1
+                n = rng.randint(0, 6)
+                body = " ".join(self.block(names, depth + 1))
+                if rng.random() < 0.5:
+                    out.append(f"for (int {k} = 0; {k} < {n}; {k}++) {{ {body} }}")
+                else:
+                    out.append(f"int {k} = 0; while ({k} < {n}) {{ {body} {k} = {k} + 1; }}")
+        return out
+
+    def program(self, locals_range=(1, 3)):
+        rng = self.rng
+        params = [f"p{i}" for i in range(rng.randint(1, 4))]
+        local_names = [f"v{i}" for i in range(rng.randint(*locals_range))]
+        body = [f"int {name} = {self.expr(params)};" for name in local_names]
+        body += self.block(params + local_names, 0)
+        args = ", ".join(str(rng.randint(0, 50)) for _ in params)
+        signature = ", ".join(f"int {name}" for name in params)
+        return (HELPER + f"int r;\nint work({signature}) {{\n" + "\n".join(body)
+                + f"\nreturn {self.expr(params + local_names)};\n}}\nr = work({args});\n")
+
+
+def random_program(seed: int, locals_range=(1, 3)) -> str:
+    """Programa SPL al azar: una funcion con parametros, locales, ciclos,
+    condiciones y llamadas, cuyo resultado queda en la global ``r``."""
+    return _Generator(random.Random(seed)).program(locals_range)
+
+
+def global_values(run) -> dict[str, int]:
+    """Valor de cada variable global (sin el prefijo ``global_``)."""
+    return {label[len("global_"):-2]: run.ram.request(0, run.linker.labels[label], 0)
+            for label in run.linker.data_labels if label.startswith("global_")}
+
+
+def run_both(source: str):
+    """Ejecuta ``source`` sin y con optimizaciones; un fallo de la CPU se
+    relanza en vez de compararse como un resultado mas."""
+    runs = (run_source(source, optimize=False, max_cycles=MAX_CYCLES),
+            run_source(source, optimize=True, max_cycles=MAX_CYCLES))
+    for run in runs:
+        run.result.raise_error()
+    return runs
@@ -0,0 +1,42 @@
+"""Banderas perezosas de la ALU: ABVAL / CHNG SIGN (``update_flags``)
+cambian N y Z sin calcular lo pendiente de la operacion anterior."""
+from pc.alu import Alu
+from pc.fpu import FPU
+from pc.register import Registers
+
+MIN_INT = 1 << 63
+
+
+def alu():
+    reg = Registers()
+    return Alu(reg, FPU(reg)), reg.flags
+
+
+def test_update_flags_keeps_pending_overflow():
+    unit, flags = alu()
+    unit.add(MIN_INT - 1, 1)               # desborda: D = 1
+    unit.update_flags(0)
+    assert flags.pending is not None
+    assert dict(flags) == {"N": 0, "Z": 1, "D": 1, "U": 0}
+
+
+def test_update_flags_chained():
+    unit, flags = alu()
+    unit.add(MIN_INT - 1, 1)
+    for value in (5, MIN_INT, 0, 7):
+        unit.update_flags(value)
+    # Encadenar no anida evaluaciones: D y U salen siempre del ADD
+    evaluate, args = flags.pending
+    assert args[1][0] is not evaluate
+    assert dict(flags) == {"N": 0, "Z": 0, "D": 1, "U": 0}
+    unit.update_flags(MIN_INT)
+    assert dict(flags) == {"N": 1, "Z": 0, "D": 1, "U": 0}
+
+
+def test_update_flags_after_resolve():
+    unit, flags = alu()
+    flags["U"] = 1
+    unit.update_flags(MIN_INT)
+    assert dict(flags) == {"N": 1, "Z": 0, "D": 0, "U": 1}
+    unit.sub(0, 0)
+    assert dict(flags) == {"N": 0, "Z": 1, "D": 0, "U": 0}
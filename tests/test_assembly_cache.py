@@ -0,0 +1,39 @@
+"""Cache de ensamblado en disco (spl/assembly.py)."""
+import pickle
+
+from spl.assembly import Assembler, AssemblyCache
+
+SOURCE = """
+data:
+{valor}
+7
+text:
+LDINT R1, 3
+{loop}
+DEC R1
+JMPNZ loop
+HLT
+"""
+
+
+def test_cache_is_opt_in():
+    assert not Assembler().cache
+
+
+def test_cached_object_matches(tmp_path):
+    cache = AssemblyCache(str(tmp_path))
+    expected = Assembler(readable=False).assemble_text(SOURCE).encode()
+    assert Assembler(readable=False, cache=cache).assemble_text(SOURCE).encode() == expected
+    assert cache.get(cache.key(SOURCE)) is not None
+    assert Assembler(readable=False, cache=cache).assemble_text(SOURCE).encode() == expected
+
+
+def test_cache_never_unpickles(tmp_path):
+    cache = AssemblyCache(str(tmp_path))
+    key = cache.key(SOURCE)
+    path = tmp_path / key[:2] / (key + ".marshal")
+    path.parent.mkdir()
+    path.write_bytes(pickle.dumps({"x": 1}))
+    assert cache.get(key) is None
+    path.write_bytes(b"basura")
+    assert cache.get(key) is None
@@ -0,0 +1,61 @@
+"""Driver de compilacion de varios archivos (spl/build.py)."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from spl.assembly import Assembler
+from spl.build import assemble_all, link
+from spl.linker_loader import LinkerLoader
+
+from conftest import ROOT
+
+# Orden de enlazado de programs/data_structures
+SOURCES = [os.path.join(ROOT, "programs", "data_structures", *parts) for parts in
+           (("test", "add_vector.asm"), ("vector.asm",), ("heap.asm",))]
+
+
+def sequential_link(tmp_path, base):
+    """Ensambla cada fuente a un .o y los enlaza con ``LinkerLoader``."""
+    objects = []
+    for path in SOURCES:
+        with open(path) as f:
+            builder = Assembler(readable=False).assemble_text(f.read(), path)
+        obj = str(tmp_path / (os.path.basename(path) + ".o"))
+        builder.write(obj)
+        objects.append(obj)
+    linker = LinkerLoader()
+    linker.load_object(objects)
+    linker.resolve(base)
+    linker.resolve_data()
+    return linker
+
+
+def test_parallel_build_matches_sequential_link(tmp_path):
+    results = assemble_all(SOURCES, jobs=2, use_cache=False)
+    assert [path for path, *_ in results] == SOURCES
+    assert all(data is not None and messages == "" for _, data, messages, _ in results)
+    for base in (0, 200):
+        parallel = link([(path, data) for path, data, _, _ in results], base)
+        expected = sequential_link(tmp_path, base)
+        assert parallel.text_image() == expected.text_image()
+        assert parallel.data == expected.data
+        assert parallel.labels == expected.labels
+
+
+@pytest.mark.parametrize("script", [False, True])
+def test_cli_writes_linked_image(tmp_path, script):
+    """``python -m spl.build`` y ``python build.py`` desde spl/ (con la raiz
+    en PYTHONPATH para ``pc``) producen la misma imagen."""
+    out = tmp_path / "resultado"
+    args = [*SOURCES, "-j", "2", "-o", str(out), "--no-cache"]
+    if script:
+        command, cwd = [sys.executable, "build.py", *args], os.path.join(ROOT, "spl")
+    else:
+        command, cwd = [sys.executable, "-m", "spl.build", *args], ROOT
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run(command, cwd=cwd, env=env, check=True, capture_output=True)
+    expected = tmp_path / "esperado"
+    sequential_link(tmp_path, 0).load_to_file(str(expected))
+    assert out.read_bytes() == expected.read_bytes()
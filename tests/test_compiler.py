@@ -0,0 +1,70 @@
+"""Correcciones del generador de codigo de SPL que no dependen del
+optimizador: mnemonicos validos, la semantica de ``>`` y el marco de
+las funciones (locales desde BP - 1)."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pc.cpu import StopReason
+from spl.compiler import CodeGenerator, Parser
+from spl.pipeline import assemble, run_source
+
+from conftest import ROOT
+from spl_programs import global_values
+
+
+def generate(source: str, optimize: bool) -> str:
+    return CodeGenerator(optimize=optimize).generate(Parser().parse(source))
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_mnemonics_assemble(optimize):
+    text = generate("int f(int x) { return x; } int r; float g; r = f(3); g = 1.5;", optimize)
+    assert "LOADINT" not in text and "LOADFLOAT" not in text
+    assert "LDFLT" in text
+    assemble(text)
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_greater_than(optimize):
+    source = """
+int a; int b; int c; int d;
+a = 3 > 3;
+b = 4 > 3;
+c = 0;
+if (3 > 3) { c = 1; }
+d = 0;
+if (4 > 3) { d = 1; }
+"""
+    run = run_source(source, optimize=optimize)
+    assert global_values(run) == {"a": 0, "b": 1, "c": 0, "d": 1}
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_locals_do_not_overwrite_saved_bp(optimize):
+    source = """
+int r;
+int inner(int m) {
+    int z = m * 2;
+    return z;
+}
+int outer(int n) {
+    int x = n + 1;
+    int y = inner(n);
+    return x + y;
+}
+r = outer(5);
+"""
+    run = run_source(source, optimize=optimize)
+    assert run.result.reason == StopReason.HLT
+    assert global_values(run) == {"r": 16}
+
+
+@pytest.mark.parametrize("module", ["compiler", "optimizer", "regalloc", "ir"])
+def test_modules_import_as_package_and_script(module):
+    """Los modulos de spl/ se usan como paquete (``spl.compiler``) y como
+    scripts desde spl/."""
+    for cwd, name in ((ROOT, f"spl.{module}"), (os.path.join(ROOT, "spl"), module)):
+        subprocess.run([sys.executable, "-c", f"import {name}"], cwd=cwd, check=True)
@@ -0,0 +1,119 @@
+"""``CPU.run_blocks`` (bloques basicos traducidos a Python con ``exec``)
+deja la maquina en el mismo estado que ``CPU.run``."""
+import glob
+import os
+import random
+
+import pytest
+
+from pc.alu import Alu
+from pc.cpu import CPU, HLT_WORD, StopReason
+from pc.fpu import FPU
+from pc.ram import RAM
+from pc.register import GENERAL_NAMES, Registers
+from spl.assembly import INSTRUCTION
+from spl.pipeline import assemble, link
+
+from conftest import ROOT
+
+RAM_SIZE = 128
+REGISTER_CODES = list(range(16))
+
+
+def random_word(rng: random.Random, span: int) -> int:
+    """Instruccion valida al azar, con direcciones dentro de ``span``."""
+    kind = rng.choice(list(INSTRUCTION))
+    ptype, base, _ = INSTRUCTION[kind]
+    reg = lambda: rng.choice(REGISTER_CODES)
+    if kind == "NOP":
+        return 0
+    if kind == "HLT":
+        return base if rng.random() < 0.3 else 0
+    if ptype.name == "i":
+        return (base << 56) | rng.randrange(span)
+    if kind == "JMPR":
+        return (base << 56) | (reg() << 52)
+    if kind == "LOADMEM":
+        return (base << 56) | (reg() << 52) | (reg() << 48)
+    if kind == "STOR":
+        return (base << 60) | (reg() << 56) | (reg() << 52)
+    if ptype.name in ("ri", "rf"):
+        imm = rng.choice((rng.randrange(span), rng.randrange(-5, 5), rng.getrandbits(56)))
+        return (base << 60) | (reg() << 56) | (imm & ((1 << 56) - 1))
+    if ptype.name == "rr":
+        return (base << 8) | (reg() << 4) | reg()
+    if ptype.name == "rrr":
+        return (base << 12) | (reg() << 8) | (reg() << 4) | reg()
+    return (base << 4) | reg()
+
+
+def run(words, registers, blocks, max_cycles, size=RAM_SIZE):
+    ram = RAM(positions=size)
+    ram.load_block(0, words)
+    reg = Registers()
+    reg.general.update(registers)
+    reg.SP = size - 8
+    cpu = CPU(ram, reg, Alu(reg, FPU(reg)))
+    runner = cpu.run_blocks if blocks else cpu.run
+    result = runner(max_cycles=max_cycles)
+    error = type(result.error) if result.error is not None else None
+    state = {name: getattr(reg, name) for name in ("PC", "SP", "BP", "IR", "MAR", "MDR")}
+    state.update(reg.general)
+    return (result.reason, result.cycles, result.pc, error, state,
+            dict(reg.flags), ram.read_block(0, size))
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_programs(seed):
+    rng = random.Random(seed)
+    n = rng.randrange(4, 60)
+    words = [random_word(rng, n + 10) for _ in range(n)]
+    registers = {name: rng.choice((rng.randrange(n + 10), rng.getrandbits(64), 0, 1))
+                 for name in GENERAL_NAMES}
+    budget = rng.choice((None, rng.randrange(1, 500)))
+    budget = 3000 if budget is None else budget
+    assert run(words, registers, True, budget) == run(words, registers, False, budget)
+
+
+# Programas que se enlazan con otros objetos (en este orden)
+LINKED_WITH = {
+    "programs/data_structures/vector.asm": ["programs/data_structures/heap.asm"],
+    "programs/data_structures/test/add_vector.asm": [
+        "programs/data_structures/vector.asm", "programs/data_structures/heap.asm"],
+}
+
+
+def program_paths():
+    for path in sorted(glob.glob(os.path.join(ROOT, "programs", "**", "*.asm"), recursive=True)):
+        with open(path) as f:
+            if "%" not in f.read():
+                yield os.path.relpath(path, ROOT).replace(os.sep, "/")
+
+
+@pytest.mark.parametrize("name", list(program_paths()))
+def test_programs(name):
+    objects = []
+    for path in [name] + LINKED_WITH.get(name, []):
+        with open(os.path.join(ROOT, path)) as f:
+            objects.append((path, assemble(f.read(), path)))
+    linker = link(objects)
+    words = linker.text_image() + linker.data
+    size = 1024
+    assert run(words, {}, True, 20000, size) == run(words, {}, False, 20000, size)
+
+
+@pytest.mark.parametrize("blocks", [False, True])
+def test_fault_keeps_traceback(blocks):
+    """Un fallo queda en ``result.error`` y ``raise_error`` lo relanza."""
+    _, base, _ = INSTRUCTION["DIV"]
+    ram = RAM(positions=16)
+    ram.load_block(0, [(base << 12) | (0xA << 8) | (0xB << 4) | 0xC, HLT_WORD])
+    reg = Registers()
+    reg.SP = 15
+    cpu = CPU(ram, reg, Alu(reg, FPU(reg)))
+    result = (cpu.run_blocks if blocks else cpu.run)()
+    assert result.reason is StopReason.FAULT
+    with pytest.raises(Exception, match="Divide by zero") as info:
+        result.raise_error()
+    assert info.value is result.error
+    assert info.traceback[-1].name == "div"
@@ -0,0 +1,96 @@
+"""El predecodificador por tabla resuelve cada palabra igual que la cadena
+de comparaciones original (tests/reference_cpu.py).
+
+Para cada palabra de los programas de programs/ (y variaciones de sus
+campos de registro) se ejecuta una instruccion en ambas CPUs desde el
+mismo estado y se compara el estado resultante.
+"""
+import glob
+import os
+import random
+
+import pytest
+
+from pc.alu import Alu
+from pc.cpu import CPU
+from pc.fpu import FPU
+from pc.ram import RAM
+from pc.register import GENERAL_NAMES, Registers
+from spl.pipeline import assemble
+from spl.preprocessor import Preprocessor
+
+from conftest import ROOT
+from reference_cpu import CPU as ReferenceCPU
+
+RAM_SIZE = 64
+START = 8
+
+
+def program_words() -> dict[str, list[int]]:
+    """Palabras (texto y datos) de cada .asm de programs/."""
+    preprocessor = Preprocessor()
+    programs = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "programs", "**", "*.asm"), recursive=True)):
+        with open(path) as f:
+            source = f.read()
+        if "%" in source:
+            source, _ = preprocessor.preprocess(source, path)
+        state = assemble(source, path).getState()
+        programs[os.path.relpath(path, ROOT)] = state["_textOutput"] + state["_dataOutput"]
+    return programs
+
+
+PROGRAMS = program_words()
+
+
+def variants(word: int, rng: random.Random):
+    """La palabra y copias con otros valores en los nibbles bajos, donde
+    van los registros de la mayoria de los formatos."""
+    yield word
+    for _ in range(4):
+        yield word ^ rng.getrandbits(12)
+
+
+def machine(cpu_class, word: int, seed: int):
+    """CPU con registros, banderas y RAM pseudoaleatorios y ``word`` en PC."""
+    rng = random.Random(seed)
+    ram = RAM(positions=RAM_SIZE)
+    for addr in range(RAM_SIZE):
+        ram.request(rng.getrandbits(64), addr, 1)
+    ram.request(word, START, 1)
+    reg = Registers()
+    for name in GENERAL_NAMES:
+        reg.general[name] = rng.choice((rng.randrange(RAM_SIZE), rng.getrandbits(64)))
+    reg.SP = rng.randrange(16, RAM_SIZE)
+    reg.BP = rng.randrange(RAM_SIZE)
+    reg.PC = START
+    for flag in ("N", "Z", "D", "U"):
+        reg.flags[flag] = rng.getrandbits(1)
+    fpu = FPU(reg)
+    return cpu_class(ram, reg, Alu(reg, fpu)), ram, reg
+
+
+def step(cpu_class, word: int, seed: int):
+    cpu, ram, reg = machine(cpu_class, word, seed)
+    try:
+        cpu.fetch()
+        cpu.execute()
+        error = None
+    except Exception as e:      # p. ej. division por cero
+        error = type(e)
+    registers = {name: getattr(reg, name) for name in ("PC", "SP", "BP", "IR", "MAR", "MDR")}
+    registers.update(reg.general)
+    return (error, registers, dict(reg.flags), cpu.running,
+            [ram.request(0, addr, 0) for addr in range(RAM_SIZE)])
+
+
+@pytest.mark.parametrize("program", sorted(PROGRAMS))
+def test_decode_matches_reference(program, capsys):
+    words = PROGRAMS[program]
+    assert words
+    rng = random.Random(program)
+    for word in words:
+        for variant in variants(word, rng):
+            seed = rng.getrandbits(32)
+            expected = step(ReferenceCPU, variant, seed)
+            assert step(CPU, variant, seed) == expected, f"0x{variant:016X} en {program}"
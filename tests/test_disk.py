@@ -0,0 +1,252 @@
+"""Disco de la maquina (pc/disk.py)."""
+import json
+
+import pytest
+
+from pc.alu import Alu
+from pc.cpu import CPU
+from pc.disk import Disk, DiskDevice, JournalImage
+from pc.fpu import FPU
+from pc.ram import RAM
+from pc.register import Registers
+from spl.pipeline import assemble, link
+
+
+@pytest.fixture
+def device(tmp_path):
+    disk = Disk(str(tmp_path / "disk.journal"))
+    device = DiskDevice(disk, image=str(tmp_path / "disk.img"), sectors=8, sector_words=4)
+    yield device
+    device.close()
+    disk.close()
+
+
+@pytest.mark.parametrize("data", ["texto", [1.5], [None]])
+def test_bad_sector_data_sets_status(device, data):
+    device.write_sector(data, 0)
+    assert device.status == DiskDevice.STATUS_ERROR
+    assert device.last_error
+    device.write_sector([1, 2], 0)
+    assert device.status == DiskDevice.STATUS_OK
+    assert device.read_sector(0) == [1, 2, 0, 0]
+
+
+def test_out_of_range_sector(device):
+    assert device.read_sectors(8, 1) == []
+    assert device.status == DiskDevice.STATUS_NOT_FOUND
+
+
+def test_format_formats_disk_and_image(device):
+    device.disk.write_file("a.txt", "hola")
+    device.write_sector([7], 3)
+    device.format()
+    assert device.status == DiskDevice.STATUS_OK
+    assert device.disk.list_folder() == []
+    assert device.read_sector(3) == [0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("mode", ["write-through", "write-back"])
+def test_inner_batch_rolls_back_alone(tmp_path, mode):
+    path = str(tmp_path / "disk.journal")
+    with Disk(path, mode=mode) as disk:
+        disk.write_file("antes.txt", "0")
+        with disk.batch():
+            disk.write_file("a.txt", "1")
+            try:
+                with disk.batch():
+                    disk.write_file("b.txt", "2")
+                    disk.write_file("a.txt", "cambiado")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            assert disk.read_file("a.txt") == "1"
+            assert not disk.exists("b.txt")
+            disk.write_file("c.txt", "3")
+        assert sorted(disk.list_folder()) == ["a.txt", "antes.txt", "c.txt"]
+    with Disk(path) as disk:
+        assert sorted(disk.list_folder()) == ["a.txt", "antes.txt", "c.txt"]
+        assert disk.read_file("a.txt") == "1"
+
+
+def test_outer_batch_rolls_back_everything(tmp_path):
+    path = str(tmp_path / "disk.journal")
+    with Disk(path) as disk:
+        disk.write_file("antes.txt", "0")
+        with pytest.raises(RuntimeError):
+            with disk.batch():
+                disk.write_file("a.txt", "1")
+                with disk.batch():
+                    disk.write_file("b.txt", "2")
+                raise RuntimeError
+        assert disk.list_folder() == ["antes.txt"]
+    with Disk(path) as disk:
+        assert disk.list_folder() == ["antes.txt"]
+
+
+def test_torn_journal_tail_is_truncated(tmp_path):
+    path = tmp_path / "disk.journal"
+    with Disk(str(path)) as disk:
+        disk.write_file("a.txt", "1")
+        disk.write_file("docs/b.txt", "2")
+    good = path.read_bytes()
+    # Un registro cortado por un crash: sin salto de linea final
+    path.write_bytes(good + b'{"op": "set", "path": ["c.txt"], "va')
+    with Disk(str(path)) as disk:
+        assert sorted(disk.list_folder()) == ["a.txt", "docs"]
+        assert disk.read_file("docs/b.txt") == "2"
+    assert path.read_bytes() == good
+
+
+def test_invalid_journal_line_drops_the_rest(tmp_path):
+    path = tmp_path / "disk.journal"
+    with Disk(str(path)) as disk:
+        disk.write_file("a.txt", "1")
+    good = path.read_bytes()
+    path.write_bytes(good + b"{roto\n" + b'{"op": "set", "path": ["b.txt"], "value": "2"}\n')
+    with Disk(str(path)) as disk:
+        assert disk.list_folder() == ["a.txt"]
+        disk.write_file("c.txt", "3")
+    with Disk(str(path)) as disk:
+        assert sorted(disk.list_folder()) == ["a.txt", "c.txt"]
+
+
+def test_journal_compaction_survives_reopen(tmp_path):
+    path = tmp_path / "disk.journal"
+    image = JournalImage(str(path), compact_ratio=2, min_compact=0)
+    assert list(image.records()) == []
+    data = {"root": {}}
+    for i in range(20):
+        data["root"][f"f{i}.txt"] = "x" * i
+        image.append({"op": "set", "path": [f"f{i}.txt"], "value": "x" * i}, data)
+    image.close()
+    lines = path.read_bytes().splitlines()
+    # La ultima compactacion dejo un snapshot al inicio del archivo
+    assert json.loads(lines[0])["op"] == "image"
+    assert len(lines) < 20
+    with Disk(str(path)) as disk:
+        assert sorted(disk.list_folder()) == sorted(data["root"])
+        assert disk.read_file("f19.txt") == "x" * 19
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "disk.json"
+    with Disk(str(legacy)) as old:
+        old.write_file("docs/a.txt", "hola")
+    journal = str(tmp_path / "disk.journal")
+    with Disk(journal, legacy=str(legacy)) as disk:
+        assert disk.backend == "journal"
+        assert disk.read_file("docs/a.txt") == "hola"
+        disk.write_file("b.txt", "nuevo")
+    # Con el journal ya creado el disk.json no se vuelve a importar
+    with Disk(str(legacy)) as old:
+        old.write_file("docs/a.txt", "cambiado")
+    with Disk(journal, legacy=str(legacy)) as disk:
+        assert disk.read_file("docs/a.txt") == "hola"
+        assert disk.read_file("b.txt") == "nuevo"
+
+
+def test_transfer_across_non_contiguous_slots(device):
+    # Slots por orden de primera escritura: 5 -> 0, 2 -> 1, 3 -> 2
+    for sector in (5, 2, 3):
+        device.write_sector([sector] * 4, sector)
+    words = list(range(100, 116))
+    assert device.write_sectors(2, words) == 4
+    # 2, 3 y el nuevo 4 (slot 3) son consecutivos; 5 sigue en el slot 0
+    assert list(device.image._runs(2, 4)) == [(2, 3, 1), (5, 1, 0)]
+    assert device.read_sectors(2, 4) == words
+    assert device.read_sectors(1, 6) == [0] * 4 + words + [0] * 4
+
+
+def test_image_grows_past_first_allocation(tmp_path):
+    path = tmp_path / "disk.img"
+    device = DiskDevice(image=str(path), sectors=64, sector_words=4)
+    header = (4 + 64) * 8
+    for sector in range(17):
+        device.write_sector([sector + 1], sector * 3 % 64)
+        slots = 16 if sector < 16 else 32
+        assert path.stat().st_size == header + slots * 4 * 8
+    device.write_sectors(10, [7] * 4 * 40)
+    assert path.stat().st_size >= header + (17 + 30) * 4 * 8
+    for sector in range(17):
+        expected = 7 if 10 <= sector * 3 % 64 < 50 else sector + 1
+        assert device.read_sector(sector * 3 % 64)[0] == expected
+    device.close()
+
+
+def test_image_reopens_with_same_sectors(tmp_path):
+    path = tmp_path / "disk.img"
+    device = DiskDevice(image=str(path), sectors=32, sector_words=4)
+    device.write_sectors(30, [1, 2, 3, 4, 5, 6])
+    device.write_sectors(3, [9])
+    device.close()
+
+    raw = path.read_bytes()
+    assert raw[:8] == b"LPDISK02"
+    assert [int.from_bytes(raw[i:i + 8], "little") for i in range(8, 32, 8)] == [4, 32, 3]
+
+    # La geometria se lee de la cabecera, no de los argumentos
+    device = DiskDevice(image=str(path))
+    assert (device.sectors, device.sector_words) == (32, 4)
+    assert device.read_sectors(30, 2) == [1, 2, 3, 4, 5, 6, 0, 0]
+    assert device.read_sector(3) == [9, 0, 0, 0]
+    assert device.read_sector(4) == [0, 0, 0, 0]
+    device.close()
+
+
+def test_image_rejects_other_files(tmp_path):
+    path = tmp_path / "disk.img"
+    path.write_bytes(b"no es un disco" * 4)
+    with pytest.raises(ValueError):
+        DiskDevice(image=str(path))
+
+
+def program(source):
+    return link([("<dma>", assemble(source))]).text_image()
+
+
+@pytest.mark.parametrize("backend", ["array", "list"])
+@pytest.mark.parametrize("blocks", [False, True])
+def test_dma_read_over_cached_code(device, backend, blocks):
+    ram = RAM(positions=64, backend=backend)
+    reg = Registers()
+    cpu = CPU(ram, reg, Alu(reg, FPU(reg)))
+    run = cpu.run_blocks if blocks else cpu.run
+
+    old = program("LDINT R1, 5\nINC R1\nHLT")
+    new = program("LDINT R1, 40\nDEC R1\nDEC R1\nHLT")
+    ram.load_block(0, old)
+    reg.SP = 63
+    run()
+    assert reg.general["R1"] == 6
+
+    device.write_sectors(2, new)
+    assert device.dma_read(2, ram, 0, len(new)) == len(new)
+    assert device.status == DiskDevice.STATUS_OK
+    assert ram.read_block(0, len(new)) == new
+    reg.PC = 0
+    run()
+    assert reg.general["R1"] == 38
+
+
+@pytest.mark.parametrize("backend", ["array", "list"])
+def test_dma_write_round_trip(device, backend):
+    ram = RAM(positions=64, backend=backend)
+    ram.load_block(10, range(1, 11))
+    assert device.dma_write(1, ram, 10, 10) == 3
+    assert device.read_sectors(1, 3) == list(range(1, 11)) + [0, 0]
+    assert device.dma_read(1, ram, 40, 6) == 6
+    assert ram.read_block(40, 7) == [1, 2, 3, 4, 5, 6, 0]
+
+
+def test_dma_out_of_range_sets_status(device):
+    ram = RAM(positions=64)
+    assert device.dma_write(0, ram, 60, 8) == 0
+    assert device.status == DiskDevice.STATUS_NOT_FOUND
+    assert "out of range" in device.last_error
+    assert device.dma_write(7, ram, 0, 8) == 0
+    assert device.status == DiskDevice.STATUS_NOT_FOUND
+    assert device.dma_read(0, ram, -1, 4) == 0
+    assert device.last_error
+    assert device.dma_write(0, ram, 0, 4) == 1
+    assert device.status == DiskDevice.STATUS_OK
+    assert device.last_error is None
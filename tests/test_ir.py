@@ -0,0 +1,74 @@
+"""Representacion intermedia del compilador (spl/ir.py)."""
+import pytest
+
+from spl.assembly import Assembler
+from spl.compiler import CodeGenerator, Parser
+from spl.ir import Func, Instr, Label, build_cfg, simplify_cfg
+
+from spl_programs import SAMPLES, random_program
+
+
+def lower(source, optimize):
+    return CodeGenerator(optimize=optimize).lower(Parser().parse(source))
+
+
+SOURCES = [source for source, _ in SAMPLES.values()] + [random_program(seed) for seed in range(40)]
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("index", range(len(SOURCES)))
+def test_build_matches_assembled_text(index, optimize, capsys):
+    """``Program.build`` produce el mismo objeto que ensamblar ``to_asm()``."""
+    program = lower(SOURCES[index], optimize)
+    expected = Assembler(readable=False).assemble_text(program.to_asm()).encode()
+    assert program.build().encode() == expected
+    assert capsys.readouterr().out == ""
+
+
+def test_cfg_successors():
+    instrs = [
+        Instr("LDINT", "R1", 0),
+        Instr.label("loop"),
+        Instr("INC", "R1"),
+        Instr("COMP", "R1", "R2"),
+        Instr("JMPN", Label("loop")),
+        Instr("JMP", Func("f")),
+        Instr.label("dead"),
+        Instr("HLT"),
+    ]
+    blocks = build_cfg(instrs)
+    assert [b.labels for b in blocks] == [[], ["loop"], [], ["dead"]]
+    assert [s.index for s in blocks[1].succs] == [1, 2]
+    # JMP a una funcion es una llamada: no tiene sucesores en la seccion
+    assert blocks[2].succs == []
+
+
+def test_simplify_threads_jumps_and_drops_dead_code():
+    instrs = [
+        Instr("COMP", "R1", "R2"),
+        Instr("JMPZ", Label("a")),
+        Instr("JMP", Label("b")),
+        Instr.label("a"),
+        Instr("JMP", Label("c")),
+        Instr.label("b"),
+        Instr("INC", "R1"),
+        Instr.label("c"),
+        Instr("HLT"),
+        Instr("INC", "R2"),
+    ]
+    out = simplify_cfg(instrs)
+    assert Instr("INC", "R2") not in out
+    # JMPZ a -> JMP c se encadena y el salto sobre JMP b se invierte
+    assert out[:2] == [Instr("COMP", "R1", "R2"), Instr("JMPZ", Label("c"))]
+
+
+def test_simplify_keeps_functions_and_data_labels():
+    instrs = [
+        Instr("LDINT", "RC", Label("ret")),
+        Instr("JMP", Func("f")),
+        Instr.label("ret"),
+        Instr("HLT"),
+        Instr.label("f"),
+        Instr("POP", "PC"),
+    ]
+    assert simplify_cfg(instrs, keep={"f"}) == instrs
@@ -0,0 +1,70 @@
+"""Lineas y columnas de ``Lexer.analyze`` (busqueda binaria sobre los
+inicios de linea) y copias independientes del lexer compartido."""
+from spl.lexic_analizer import Lexer
+
+SOURCE = """int x = 1;
+# comentario
+float y = 2.5;
+
+while (x < 10) {
+\tx += 1;   # fin
+}"""
+
+OTHER = "bool b = true;\n\n  int z = b + 3;\n"
+
+
+def linear_columns(data: str) -> list[tuple[int, int]]:
+    """(linea, columna) de cada token con la busqueda hacia atras del
+    salto de linea que se usaba antes de ``_line_starts``."""
+    lexer = Lexer().lexer
+    lexer.input(data)
+    return [(tok.lineno, tok.lexpos - (data.rfind("\n", 0, tok.lexpos) + 1) + 1)
+            for tok in lexer]
+
+
+def positions(tokens) -> list[tuple[int, int]]:
+    return [(t.line, t.column) for t in tokens]
+
+
+def test_positions():
+    tokens, _ = Lexer().analyze(SOURCE)
+    assert positions(tokens) == linear_columns(SOURCE)
+    by_line = {}
+    for token in tokens:
+        by_line.setdefault(token.line, []).append((token.value, token.column))
+    assert sorted(by_line) == [1, 3, 5, 6, 7]
+    assert by_line[1] == [("int", 1), ("x", 5), ("=", 7), (1, 9), (";", 10)]
+    assert by_line[5] == [("while", 1), ("(", 7), ("x", 8), ("<", 10), (10, 12),
+                          (")", 14), ("{", 16)]
+    # El tabulador cuenta como una columna; el ultimo token no tiene "\n"
+    assert by_line[6] == [("x", 2), ("+=", 4), (1, 7), (";", 8)]
+    assert by_line[7] == [("}", 1)]
+    assert tokens[-1]["column"] == 1 and tokens[-1]["type"] == "RBRACE"
+
+
+def test_instances_do_not_share_state():
+    first, second = Lexer(), Lexer()
+    assert first.lexer is not second.lexer
+    tokens, _ = first.analyze(SOURCE)
+    # ``second`` empieza en la linea 1 y con sus propios inicios de linea
+    # aunque ``first`` ya avanzo sobre otra entrada
+    other, _ = second.analyze(OTHER)
+    assert positions(other) == linear_columns(OTHER)
+    assert other[0].line == 1 and other[-1].line == 3
+    assert first._line_starts != second._line_starts
+
+    # Intercalado token a token: cada instancia sigue su propia entrada
+    first.lexer.input(SOURCE)
+    first.lexer.lineno = 1
+    second.lexer.input(OTHER)
+    second.lexer.lineno = 1
+    seen = {SOURCE: [], OTHER: []}
+    while True:
+        pulled = [(lexer, lexer.lexer.token()) for lexer in (first, second)]
+        pulled = [(lexer, tok) for lexer, tok in pulled if tok is not None]
+        if not pulled:
+            break
+        for lexer, tok in pulled:
+            seen[lexer.lexer.lexdata].append((tok.lineno, lexer.find_column(tok)))
+    assert seen[SOURCE] == positions(tokens)
+    assert seen[OTHER] == positions(other)
@@ -0,0 +1,33 @@
+"""El plegado de constantes y la mirilla (spl/optimizer.py) no cambian
+el resultado de los programas."""
+import pytest
+
+from pc.cpu import StopReason
+from spl.compiler import CodeGenerator, Parser
+
+from spl_programs import SAMPLES, global_values, random_program, run_both
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_samples(name):
+    source, expected = SAMPLES[name]
+    for run in run_both(source):
+        assert run.result.reason == StopReason.HLT
+        assert global_values(run) == expected
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_random_programs(seed):
+    plain, optimized = run_both(random_program(seed))
+    if plain.result.reason != StopReason.HLT:
+        pytest.skip("el programa no termina dentro del presupuesto")
+    assert optimized.result.reason == StopReason.HLT
+    assert global_values(optimized) == global_values(plain)
+    assert optimized.result.cycles <= plain.result.cycles
+
+
+def test_constant_folding():
+    ast = Parser().parse("int r; r = 2 * 3 + 10 / 2 - 1;")
+    text = CodeGenerator(optimize=True).generate(ast)
+    assert "LDINT R5, 10" in text
+    assert "MUL" not in text and "DIV" not in text
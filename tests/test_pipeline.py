@@ -0,0 +1,55 @@
+"""Compilar, enlazar y ejecutar en memoria (spl/pipeline.py)."""
+import pytest
+
+from pc.cpu import StopReason
+from spl.linker_loader import LinkerLoader
+from spl.pipeline import assemble, compile_source, link, run_source
+
+LOOP = """
+int r;
+int a;
+a = 7;
+r = 0;
+while (a > 0) {
+    r = r + a;
+    a = a - 1;
+}
+"""
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_globals_after_loop(optimize):
+    run = run_source(LOOP, optimize=optimize)
+    assert run.result.reason == StopReason.HLT
+    assert run.read("global_r") == 28
+    assert run.read("global_a") == 0
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_globals_written_by_function(optimize):
+    source = LOOP.replace("a = 7;", "void main() { a = 7; }\nmain();")
+    run = run_source(source, optimize=optimize)
+    assert run.read("global_r") == 28
+
+
+def test_data_follows_text_and_hlt():
+    """Las variables globales viven despues del texto y su HLT, no sobre
+    el codigo."""
+    for base in (0, 100):
+        linker = link([("<spl>", assemble(compile_source(LOOP)))], base)
+        data_start = base + len(linker.text_image())
+        assert linker.data_start(base) == data_start
+        assert linker.labels["global_r\\0"] == data_start
+        assert linker.labels["global_a\\0"] == data_start + 1
+
+
+def test_builder_and_encoded_object_link_the_same():
+    builder = assemble(compile_source(LOOP))
+    direct = link([("<spl>", builder)])
+    encoded = LinkerLoader(verbose=False)
+    encoded.load_object_data("<spl>", builder.encode())
+    encoded.resolve()
+    encoded.resolve_data()
+    assert direct.labels == encoded.labels
+    assert direct.text == encoded.text
+    assert direct.data == encoded.data
@@ -0,0 +1,32 @@
+"""Nombres de las lextab de PLY (spl/plytab.py)."""
+import subprocess
+import sys
+
+from conftest import ROOT
+from spl.plytab import lextab_name
+
+
+def rules(regex):
+    def t_NUMBER(t):
+        return t
+    t_NUMBER.__doc__ = regex
+    return {"tokens": ("NUMBER",), "t_NUMBER": t_NUMBER, "t_ignore": " ", "otro": 1}
+
+
+def test_name_follows_rules():
+    name = lextab_name("demo", rules(r"\d+"))
+    assert name.startswith("demo_") and name.endswith("_lextab")
+    assert lextab_name("demo", rules(r"\d+")) == name
+    assert lextab_name("demo", rules(r"[0-9]+")) != name
+    assert lextab_name("demo", {**rules(r"\d+"), "otro": 2}) == name
+    assert lextab_name("demo", {**rules(r"\d+"), "t_ignore": " \t"}) != name
+
+
+def test_name_is_stable_across_processes():
+    code = "import spl.assembly as a; from spl.plytab import lextab_name; print(lextab_name('assembly', vars(a)))"
+    names = {
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                       env={"PYTHONHASHSEED": seed}, check=True).stdout
+        for seed in ("1", "2")
+    }
+    assert len(names) == 1
@@ -0,0 +1,74 @@
+"""Preprocesador de assembly (spl/preprocessor.py)."""
+import os
+
+from spl.preprocessor import Preprocessor
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_define_applies_to_the_whole_file():
+    output, _ = Preprocessor().preprocess("use N\n%define N 3\nLDINT RA, N")
+    assert output == "use 3 LDINT RA , 3"
+
+
+def test_last_define_wins():
+    output, _ = Preprocessor().preprocess("%define N 1\nA N\n%define N 2")
+    assert output == "A 2"
+
+
+def test_define_reaches_included_text(tmp_path):
+    inc = write(tmp_path / "inc.asm", "LDINT RA, N\n")
+    output, loaded = Preprocessor().preprocess(f"%include {inc}\n%define N 4")
+    assert output == "LDINT RA , 4"
+    assert loaded == {inc: (0, 3)}
+
+
+def test_nested_includes_and_dependencies(tmp_path):
+    inner = write(tmp_path / "inner.asm", "%define K 9\nINC R1\n", 1_000_000_000)
+    outer = write(tmp_path / "outer.asm", f"%include {inner}\nLDINT R1, K\n", 2_000_000_000)
+    pre = Preprocessor()
+    output, loaded = pre.preprocess(f"%include {outer}\nHLT", "main.asm")
+    assert output == "INC R1 LDINT R1 , 9 HLT"
+    assert set(loaded) == {inner, outer}
+    assert pre.graph["main.asm"] == [outer]
+    assert pre.graph[outer] == [inner]
+    assert pre.dependencies("main.asm") == {outer, inner}
+    # main.asm no existe en disco: cuentan solo sus includes
+    assert pre.latest_mtime("main.asm") == 2_000_000_000
+    os.utime(inner, ns=(3_000_000_000, 3_000_000_000))
+    assert pre.latest_mtime("main.asm") == 3_000_000_000
+
+
+def test_include_cache_is_keyed_by_mtime(tmp_path):
+    inc = write(tmp_path / "inc.asm", "NOP\n", 1_000_000_000)
+    pre = Preprocessor()
+    source = f"%include {inc}"
+    assert pre.preprocess(source)[0] == "NOP"
+    # Mismo mtime: se usa la copia en memoria sin leer el archivo
+    write(tmp_path / "inc.asm", "HLT\n", 1_000_000_000)
+    assert pre.preprocess(source)[0] == "NOP"
+    # Cambia el mtime: se vuelve a leer
+    write(tmp_path / "inc.asm", "HLT\n", 2_000_000_000)
+    assert pre.preprocess(source)[0] == "HLT"
+    assert pre.cache[inc] == (2_000_000_000, "HLT\n")
+
+
+def test_circular_include_is_reported(tmp_path, capsys):
+    a = tmp_path / "a.asm"
+    b = write(tmp_path / "b.asm", f"%include {a}\nINC R2\n")
+    write(a, f"%include {b}\nINC R1\n")
+    output, _ = Preprocessor().preprocess(f"%include {a}")
+    assert output == "INC R2 INC R1"
+    assert "include circular" in capsys.readouterr().out
+
+
+def test_missing_include_is_reported(tmp_path, capsys):
+    output, loaded = Preprocessor().preprocess(f"%include {tmp_path / 'no.asm'}\nHLT")
+    assert output == "HLT"
+    assert loaded == {}
+    assert "no se pudo abrir" in capsys.readouterr().out
@@ -0,0 +1,78 @@
+"""Perfilador de la CPU (pc/profiler.py y ``CPU.run_profiled``)."""
+import os
+
+from pc.cpu import StopReason
+from pc.profiler import NO_SYMBOL, Profiler
+from spl.pipeline import assemble, link, load
+
+from conftest import ROOT
+
+LOOP = """
+LDINT R1, 3
+{loop}
+DEC R1
+JMPNZ loop
+HLT
+"""
+
+MAIN = """
+{main}
+LDINT R1, 1
+LDINT RE, ret
+PUSH RE
+JMP vec_new
+{ret}
+POP RE
+HLT
+"""
+
+
+def profile(sources):
+    linker = link([(name, assemble(text, name)) for name, text in sources])
+    cpu, _, _ = load(linker)
+    profiler = Profiler.from_linker(linker)
+    result = cpu.run_profiled(profiler, max_cycles=100000)
+    assert result.reason is StopReason.HLT
+    assert profiler.instructions == result.cycles
+    return profiler, linker
+
+
+def test_counts_without_root_label(tmp_path):
+    # Los opcodes se nombran por su handler en la CPU (LDINT -> LOAD_IMM)
+    profiler, _ = profile([("loop.asm", LOOP)])
+    assert dict(profiler.opcode_counts) == {"LOAD_IMM": 1, "DEC": 3, "JMPNZ": 3, "HLT": 1}
+    assert dict(profiler.pc_counts) == {0: 1, 1: 3, 2: 3, 3: 1}
+    assert profiler.label_counts() == {NO_SYMBOL: (1, 0), "loop": (7, 0)}
+    assert profiler.describe(0) == "0x0000"
+    assert profiler.describe(2) == "loop+1"
+    assert profiler.collapsed() == [f"{NO_SYMBOL} 8"]
+
+    report = profiler.report()
+    assert "Instrucciones ejecutadas: 8" in report
+    assert "0x0002 loop+1" in report
+
+    path = tmp_path / "out.folded"
+    profiler.write_collapsed(str(path))
+    assert path.read_text(encoding="utf-8") == f"{NO_SYMBOL} 8\n"
+
+
+def test_shadow_stack_follows_calls(tmp_path):
+    sources = [("main.asm", MAIN)]
+    for name in ("vector.asm", "heap.asm"):
+        with open(os.path.join(ROOT, "programs", "data_structures", name)) as f:
+            sources.append((name, f.read()))
+    profiler, linker = profile(sources)
+
+    stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed())
+    assert set(stacks) == {"main", "main;vec_new", "main;vec_new;malloc"}
+    assert sum(map(int, stacks.values())) == profiler.instructions
+    # main: 4 instrucciones antes de la llamada y POP + HLT despues (JMPR
+    # cierra el marco de vec_new)
+    assert stacks["main"] == "6"
+    assert profiler.opcode_counts["HLT"] == 1
+    assert profiler.opcode_counts["JMPR"] == 3      # vec_new y dos malloc
+
+    vec_new = linker.text_labels["vec_new\\0"]
+    assert profiler.describe(vec_new + 1) == "vec_new+1"
+    counts = profiler.label_counts()
+    assert (counts["main"][0], counts["ret"][0]) == (4, 2)
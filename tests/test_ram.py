@@ -0,0 +1,29 @@
+"""Backends de almacenamiento de la RAM (pc/ram.py)."""
+import pytest
+
+from pc.ram import RAM
+
+
+def test_default_backend_is_64_bit_array():
+    ram = RAM()
+    assert ram.backend == "array"
+    with ram.memoryview() as view:
+        assert view.format == "Q"
+        assert view.itemsize == 8
+
+
+@pytest.mark.parametrize("word_size, itemsize", [("8", 1), ("16", 2), ("32", 4), ("64", 8)])
+def test_array_itemsize_matches_word(word_size, itemsize):
+    with RAM(word_size, 4).memoryview() as view:
+        assert view.itemsize == itemsize
+
+
+@pytest.mark.parametrize("word_size", ["8", "16", "32", "64"])
+def test_backends_agree(word_size):
+    rams = [RAM(word_size, 16, backend=backend) for backend in ("list", "array")]
+    for ram in rams:
+        ram.request(-1, 3, 1)
+        ram.load_block(5, [1, -2, 1 << 70])
+        ram.request(7, 99, 1)
+    assert rams[0].read_block(0, 16) == rams[1].read_block(0, 16)
+    assert [rams[0].request(0, i, 0) for i in range(16)] == [rams[1].request(0, i, 0) for i in range(16)]
@@ -0,0 +1,77 @@
+"""Asignacion de registros de las funciones de SPL (spl/regalloc.py)."""
+import itertools
+
+import pytest
+
+from pc.cpu import StopReason
+from spl.compiler import Parser
+from spl.regalloc import PARAM_REGISTERS, POOL, allocate_registers, parallel_moves
+
+from spl_programs import global_values, random_program, run_both
+
+
+def simulate(moves, values):
+    values = dict(values)
+    for dst, src in moves:
+        values[dst] = values[src]
+    return values
+
+
+@pytest.mark.parametrize("moves", [
+    {"R1": "R2", "R2": "R3"},
+    {"R1": "R2", "R2": "R1"},
+    {"R1": "R2", "R2": "R3", "R3": "R1"},
+    {"R1": "R1", "R4": "R2"},
+    {"R2": "R1", "R3": "R1", "R1": "R3"},
+])
+def test_parallel_moves(moves):
+    start = {reg: reg for reg in ("R1", "R2", "R3", "R4", "RA")}
+    end = simulate(parallel_moves(moves, "RA"), start)
+    for dst, src in moves.items():
+        assert end[dst] == src
+
+
+def functions(source):
+    """Nodos ``FUNC_DEF`` del programa, por nombre."""
+    _, [(_, body)] = Parser().parse(source)
+    return {node[2]: node for node in body if node[0] == "FUNC_DEF"}
+
+
+def test_loop_variables_get_registers():
+    func = functions("""
+int loop(int n) {
+    int total = 0;
+    for (int i = 0; i < n; i++) { total = total + i; }
+    return total;
+}
+""")["loop"]
+    assigned = allocate_registers(func)
+    assert len(assigned) == 3
+    assert len(set(assigned.values())) == 3
+    assert set(assigned.values()) <= set(POOL) | set(PARAM_REGISTERS)
+
+
+def test_variables_live_across_calls_stay_on_stack():
+    func = functions("""
+int g(int x) { return x; }
+int f(int n) {
+    int kept = n * 2;
+    int y = g(n);
+    return kept + y;
+}
+""")["f"]
+    params = func[3]
+    assigned = allocate_registers(func)
+    # ``n`` y ``kept`` se usan despues de la llamada
+    assert id(params[0]) not in assigned
+    assert all(reg in POOL for reg in assigned.values())
+    assert len(assigned) <= 1
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_register_pressure(seed):
+    """Con mas locales que registros el resultado no cambia."""
+    plain, optimized = run_both(random_program(1000 + seed, locals_range=(5, 9)))
+    if plain.result.reason != StopReason.HLT:
+        pytest.skip("el programa no termina dentro del presupuesto")
+    assert global_values(optimized) == global_values(plain)
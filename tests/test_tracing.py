@@ -0,0 +1,39 @@
+"""Diagnosticos de la CPU (pc/tracing.py)."""
+import pytest
+
+from pc.alu import Alu
+from pc.cpu import CPU, HLT_WORD
+from pc.fpu import FPU
+from pc.ram import RAM
+from pc.register import Registers
+from pc.tracing import RingBufferSink, Tracer, TraceLevel
+
+UNKNOWN = 0x0FFF
+
+
+def machine(tracer=None):
+    ram = RAM(positions=16)
+    ram.load_block(0, [UNKNOWN, HLT_WORD])
+    reg = Registers()
+    reg.SP = 15
+    return CPU(ram, reg, Alu(reg, FPU(reg)), tracer)
+
+
+@pytest.mark.parametrize("blocks", [False, True])
+def test_default_tracer_warns_on_stderr(blocks, capsys):
+    cpu = machine()
+    (cpu.run_blocks if blocks else cpu.run)(max_cycles=10)
+    captured = capsys.readouterr()
+    assert captured.err == "  [WARN] Instruccion no reconocida: 0x0000000000000FFF\n"
+    assert captured.out == ""
+
+
+def test_tracer_off_is_silent(capsys):
+    machine(Tracer(TraceLevel.OFF)).run(max_cycles=10)
+    assert capsys.readouterr() == ("", "")
+
+
+def test_explicit_sink_receives_warning():
+    sink = RingBufferSink()
+    machine(Tracer(TraceLevel.WARN, sink)).run(max_cycles=10)
+    assert [(event.kind, event.pc) for event in sink] == [("warn", 0)]